@@ -0,0 +1,9 @@
+import warnings
+from src.batch import main
+
+BASE_DIR = 'app_data'
+"""Каталог с файлом settings.json и файлом error.csv."""
+
+if __name__ == '__main__':
+	warnings.filterwarnings('ignore')
+	main(BASE_DIR)
@@ -0,0 +1,10 @@
+import sys
+import warnings
+from src.benchmark import main
+
+BASE_DIR = 'app_data'
+"""Каталог для сохранения результатов замеров."""
+
+if __name__ == '__main__':
+	warnings.filterwarnings('ignore')
+	sys.exit(main(BASE_DIR))
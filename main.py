@@ -2,7 +2,7 @@ import warnings
 from src.app_window import App
 
 BASE_DIR = 'app_data'
-"""Каталог для сохранения файлов settings.json и error.txt.""" 
+"""Каталог для сохранения файла settings.json, логов ухода траекторий и кэша.""" 
 
 if __name__ == '__main__':
 	warnings.filterwarnings('ignore')
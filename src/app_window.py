@@ -1,13 +1,27 @@
+import time
 import tkinter as tk
-from threading import Timer
+from threading import Thread
 from tkinter.ttk import Progressbar
+from tkinter.messagebox import askyesno, showwarning
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from src.settings import Settings
-from src.controls import Data, VerticalNavigationToolbar2Tk
+from src.engine import Params
+from src.controls import Data, VerticalNavigationToolbar2Tk, as_range, get_params, get_settings
 from src.calculations import NX, RX, RX_XX_NX, XX, XX_NX, Calculator
+from src.cache import ResultCache
+from src.formulas import load_formulas
+from src.basins import compute_basins
+from src.events import EventChannel, Flag
+from src.profiler import Profiler
+from src.jobs import JOB_WORKERS, JobQueue
+from src.jobs_window import JobsWindow
 from src.help_window import Help
+from src.escape_window import EscapeMap
+from src.period_window import PeriodMap
+from src.basin_window import BasinMap
+from src.zoom import ZoomRefiner
 from src.plots import *
 
 
@@ -33,13 +47,29 @@ class App(tk.Tk):
 		self.geometry('1280x720+{}+{}'.format(w, h))
 		self.state('zoomed')
 		self.settings = Settings(save_dir)
+		# Кэш результатов вычисления (размер в памяти задаётся в МБ)
+		self.cache = ResultCache(save_dir, self.settings.get('cache_size', 256) * 2**20)
+		self.protocol('WM_DELETE_WINDOW', self.on_close)
+		# Пользовательские формулы (с ошибками не отображаются)
+		formulas, errors = load_formulas(self.settings.get('formulas', []))
+		if errors:
+			showwarning('Ошибки в формулах', 'Формулы не загружены:\n' + '\n'.join(errors))
 		# Установка значений по умолчанию
 		self.data = Data(is_f1=True, is_f2=True,
 			settings=self.settings['defaults'][0],
 			delay=self.settings['delay_time'],
-			charts_num=RX_XX_NX)
+			charts_num=RX_XX_NX, formulas=formulas)
 		self.anim = None # Для хранения объекта анимации
-		self.is_calc = tk.BooleanVar() # Для возможности завершения вычисления
+		self.refiner = None # Для уточнения бифуркационной диаграммы при масштабировании
+		self.is_calc = Flag() # Для возможности завершения вычисления (из любого потока)
+		self.is_basins = Flag() # Для прекращения расчёта карты бассейнов
+		self.events = EventChannel(self) # События из потока вычисления
+		self.profiler = None # Учёт времени текущего запуска
+		self.run_params = None # Параметры текущего запуска
+		# Очередь фоновых вычислений (не блокирует форму)
+		self.jobs = JobQueue(self.events, save_dir, self.cache,
+			self.settings.get('job_workers', JOB_WORKERS))
+		self.jobs_window = None
 		self.pb = { # Информация для прогресс-бара
 			'value': tk.IntVar(), # Текущее значение
 			'max': tk.IntVar(), # Максимальное значение
@@ -80,6 +110,10 @@ class App(tk.Tk):
 		self.c1.pack(anchor = tk.W)
 		self.c2 = tk.Checkbutton(self.formula, text='2) x[n+1]=1-rx[n]^2+y[n]\ny[n+1]=bx[n]', variable = self.data.is_f2, justify = tk.LEFT)
 		self.c2.pack(anchor = tk.W)
+		for d in formulas:
+			label = d.get('label', f'{d["name"]}) x[n+1]={d["x"]}')
+			tk.Checkbutton(self.formula, text = label, variable = self.data.formulas[d['name']],
+				justify = tk.LEFT).pack(anchor = tk.W)
 		# Параметры для функции
 		self.params = tk.Frame(self.menu)
 		self.params.grid(row = 1, sticky="nw", pady = 5)
@@ -116,8 +150,23 @@ class App(tk.Tk):
 		self.x0f.pack(anchor = tk.W)
 		self.x0l = tk.Label(self.x0f, text='x[0] = ', justify = tk.LEFT)
 		self.x0l.pack(side = tk.LEFT)
-		self.x0 = tk.Entry(self.x0f, textvariable = self.data.f.x0, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
-		self.x0.pack(side = tk.LEFT)
+		self.x0b = tk.Entry(self.x0f, textvariable = self.data.f.x0.begin, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.x0b.pack(side = tk.LEFT)
+		self.x0e = tk.Entry(self.x0f, textvariable = self.data.f.x0.end, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.x0e.pack(side = tk.LEFT)
+		self.x0s = tk.Entry(self.x0f, textvariable = self.data.f.x0.step, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.x0s.pack(side = tk.LEFT)
+		# Начальное значение x[-1] (если не задано, то равно x[0])
+		self.xpf = tk.Frame(self.params)
+		self.xpf.pack(anchor = tk.W)
+		self.xpc = tk.Checkbutton(self.xpf, text = 'x[-1]=', variable = self.data.f.is_x_prev, padx = 0)
+		self.xpc.pack(side = tk.LEFT)
+		self.xpb = tk.Entry(self.xpf, textvariable = self.data.f.x_prev.begin, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.xpb.pack(side = tk.LEFT)
+		self.xpe = tk.Entry(self.xpf, textvariable = self.data.f.x_prev.end, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.xpe.pack(side = tk.LEFT)
+		self.xps = tk.Entry(self.xpf, textvariable = self.data.f.x_prev.step, width = TXT_WIDTH, validate='key', validatecommand = vcmdf)
+		self.xps.pack(side = tk.LEFT)
 		# Установка шагов итерации
 		self.nf = tk.Frame(self.params)
 		self.nf.pack(anchor = tk.W)
@@ -184,6 +233,17 @@ class App(tk.Tk):
 		self.b2 = tk.Button(self.menu_btns, textvariable = self.b2_text, command = lambda: self.pause())
 		self.b2.configure(state = tk.DISABLED)
 		self.b2.pack(fill = tk.X, pady = 1)
+		# Кнопка отображения карты периодов последнего вычисления
+		self.b4 = tk.Button(self.menu_btns, text="Карта периодов", command = lambda: self.show_periods())
+		self.b4.configure(state = tk.DISABLED)
+		self.b4.pack(fill = tk.X, pady = 1)
+		# Кнопка расчёта карты бассейнов притяжения по параметрам формы
+		self.b6_text = tk.StringVar(value = 'Бассейны притяжения')
+		self.b6 = tk.Button(self.menu_btns, textvariable = self.b6_text, command = lambda: self.show_basins())
+		self.b6.pack(fill = tk.X, pady = 1)
+		# Кнопка открытия очереди фоновых вычислений
+		self.b5 = tk.Button(self.menu_btns, text="Очередь вычислений", command = lambda: self.show_jobs())
+		self.b5.pack(fill = tk.X, pady = 1)
 		self.b3 = tk.Button(self.menu_btns, text="Справка", command = lambda: Help(self).grab_set())
 		self.b3.pack(fill = tk.X, pady = 1)
 		self.st = tk.Label(self.menu_btns, textvariable = self.pb['status'])
@@ -214,12 +274,40 @@ class App(tk.Tk):
 		if self.pb['is_draw']:
 			if hasattr(self, 'anim'):
 				self.anim.del_new_points() # Убрать точки, показывающих процесс отрисовки
+				self.connect_refiner()
 				del self.anim # Удаление объекта анимации
 			self.pb['status'].set('Завершено')
 		else:
 			self.pb['status'].set('Прекращено')
 		self.pb['value'].set(0)
+		t = time.perf_counter()
 		self.canvas.draw()
+		if self.profiler is not None:
+			self.profiler.add('canvas_draw', time.perf_counter() - t)
+			self.save_profile()
+
+	def save_profile(self):
+		"""Сохраняет отчёт о времени выполнения запуска и выводит его кратко в строку состояния."""
+		self.profiler.save(self.save_dir, self.run_params)
+		summary = self.profiler.summary()
+		if summary:
+			self.pb['status'].set(self.pb['status'].get() + '\n' + summary)
+		self.profiler = None
+
+	def connect_refiner(self):
+		"""Подключает уточнение бифуркационной диаграммы при изменении её границ."""
+		if not self.settings['RX'].get('refine', True):
+			return
+		for plot in self.anim.axes:
+			if isinstance(plot, PlotRX):
+				self.refiner = ZoomRefiner(self, plot.axis, self.calc.params, self.settings['RX'],
+					self.settings.get('formulas', []), plot.images)
+
+	def disconnect_refiner(self):
+		"""Прекращает уточнение бифуркационной диаграммы."""
+		if self.refiner is not None:
+			self.refiner.disconnect()
+			self.refiner = None
 
 	def run_anim(self, res):
 		"""Запускает анимацию после выполнения вычислений."""
@@ -228,6 +316,8 @@ class App(tk.Tk):
 		self.pb['value'].set(0)
 		self.pb['max'].set(self.data.f.n_draw.get())
 		self.b2.configure(state = tk.NORMAL)
+		self.calc = res
+		self.b4.configure(state = tk.NORMAL)
 		self.anim = SubplotAnimation(self.fig, self.data, res, self.pb, self.end_anim, self.settings)
 
 	def end_anim(self):
@@ -236,35 +326,178 @@ class App(tk.Tk):
 		self.b2_text.set('Пауза')
 		self.set_state(tk.NORMAL)
 		self.b2.configure(state = tk.DISABLED)
-		Timer(0.5, self.del_anim).start() # Обновление графика через 0.5 сек (легенды)
+		self.after(500, self.del_anim) # Обновление графика через 0.5 сек (легенды)
+
+	def read_params(self, workers: int = 1, save_dir: str = None) -> Params:
+		"""
+		Возвращает параметры расчёта с формы или сообщает об ошибке в них
+		(например, о недопустимой точности в шаблоне).
+
+		Args:
+			workers (int): Количество процессов для вычисления (0 - по числу ядер)
+			save_dir (str): Каталог для хранения траекторий в файлах
+
+		Returns:
+			Params: Параметры вычисления (None - параметры недопустимы)
+		"""
+		try:
+			return self.data.get_params(workers, save_dir)
+		except (ValueError, KeyError, TypeError) as e:
+			showwarning('Ошибка в параметрах', f'Недопустимые параметры вычисления: {e}')
+			return None
 
 	def draw(self):
 		"""Действия после нажатия кнопки Отобразить/Завершить."""
 		# Запуск вычислений
 		if self.b1_text.get() == 'Отобразить':
+			# Параметры проверяются до блокировки формы
+			params = self.read_params(self.settings.get('workers', 1), self.save_dir)
+			if params is None:
+				return
 			# Подготовка прогресс-бара
 			self.pb['value'].set(0)
 			self.pb['status'].set('Инициализация')
 			self.pb['is_draw'] = False
+			self.disconnect_refiner()
 			# Установка подписей и состояния
 			self.b1_text.set('Завершить вычисление')
 			self.set_state(tk.DISABLED)
 			# Запуск вычисления
 			self.is_calc.set(True)
-			Calculator(self.data, self.pb, self.is_calc,
-			  	self.save_dir, self.run_anim)
+			self.run_params = params
+			if self.settings.get('profile', True):
+				self.profiler = Profiler(self.settings.get('tracemalloc', False),
+					self.settings.get('profile_kernels', False))
+			try:
+				Calculator(self.run_params, self.save_dir,
+					self.run_anim, self.pb, self.is_calc, self.data.charts_num.get(),
+					self.show_error, self.cache, self.settings.get('pipeline', True), self.events,
+					self.profiler)
+			except (ValueError, KeyError, OSError) as e:
+				# Вычисление не запущено: форма разблокируется
+				self.is_calc.set(False)
+				self.profiler = None
+				self.end_anim()
+				showwarning('Ошибка вычисления', f'Вычисление не запущено: {e}')
 		# Принудительное прекращение вычислений
 		elif self.is_calc.get():
 			self.is_calc.set(False)
 			# Если нет никаких точек для отрисовки
 			if not self.pb['is_draw']:
 				self.end_anim()
+			# Анимация, запущенная до завершения вычисления, прекращается вместе с ним
+			elif hasattr(self, 'anim') and self.anim is not None and self.anim.event_source is not None:
+				self.anim.pause()
+				self.end_anim()
 		# Принудительное прекращение анимирования
 		else:
 			if hasattr(self, 'anim') and self.anim.event_source is not None:
 				self.anim.pause() # то останавливаем
 			self.end_anim()
 
+	def show_error(self, res, fn: str):
+		"""
+		Оповещает об уходе траекторий в бесконечность.
+
+		Args:
+			res (Result): Результаты вычисления
+			fn (str): Имя файла с сохранённым логом
+		"""
+		result = askyesno('Подтверждение операции', f'В ходе вычислений {len(res.log)} траекторий ушли в бесконечность.\nПоказать карту времени ухода?')
+		if result:
+			EscapeMap(self, res, fn, self.settings['fontsize'])
+
+	def show_periods(self):
+		"""Открывает окно с картой периодов последнего вычисления."""
+		if hasattr(self, 'calc'):
+			PeriodMap(self, self.calc.result, self.calc.max_period, self.settings['fontsize'])
+
+	def show_basins(self):
+		"""Запускает расчёт карты бассейнов притяжения по параметрам формы (или прекращает его)."""
+		if self.b6_text.get() != 'Бассейны притяжения':
+			self.is_basins.set(False)
+			return
+		params = self.read_params(self.settings.get('basin_workers', 0))
+		if params is None:
+			return
+		self.is_basins.set(True)
+		self.b6_text.set('Бассейны: запуск (прекратить)')
+		Thread(target = self.run_basins, args = (params,), daemon = True).start()
+
+	def run_basins(self, params):
+		"""
+		Рассчитывает карту бассейнов притяжения (в отдельном потоке).
+
+		Args:
+			params (Params): Параметры вычисления
+		"""
+		res = None
+		try:
+			res = compute_basins(params, lambda phase, i, total: self.events.post(
+					self.b6_text.set, f'Бассейны: {i + 1}/{total} (прекратить)'),
+				lambda: not self.is_basins.get())
+		finally:
+			self.events.post(self.end_basins, res)
+
+	def end_basins(self, res):
+		"""Открывает окно с рассчитанной картой бассейнов притяжения (в основном потоке)."""
+		self.b6_text.set('Бассейны притяжения')
+		if res is not None and not res.is_cancelled:
+			BasinMap(self, res, self.settings['fontsize'])
+
+	def show_jobs(self):
+		"""Открывает окно очереди фоновых вычислений."""
+		if self.jobs_window is not None and self.jobs_window.winfo_exists():
+			self.jobs_window.lift()
+		else:
+			self.jobs_window = JobsWindow(self, self.jobs)
+
+	def get_job_params(self, settings: dict = None) -> tuple:
+		"""
+		Возвращает название и параметры фонового вычисления.
+
+		Args:
+			settings (dict): Шаблон из раздела defaults (None - параметры формы)
+
+		Returns:
+			tuple: (название, Params)
+		"""
+		workers = self.settings.get('workers', 1)
+		if settings is not None:
+			return settings['name'], get_params(settings, workers, self.save_dir, self.data.definitions)
+		params = self.data.get_params(workers, self.save_dir)
+		x0 = as_range(params.x0)
+		name = f'r = {params.r[0]:g}..{params.r[1]:g}; b = {params.b[0]:g}..{params.b[1]:g}; x[0] = {x0[0]:g}..{x0[1]:g}'
+		return name, params
+
+	def open_job(self, job):
+		"""
+		Отрисовывает результаты фонового вычисления (параметры переносятся на форму).
+
+		Args:
+			job (Job): Завершённое задание
+		"""
+		# Текущие вычисление или анимация не прерываются
+		if self.b1_text.get() != 'Отобразить':
+			self.pb['status'].set('Сначала завершите текущую отрисовку')
+			return
+		self.data.set_formula(get_settings(job.params))
+		self.pb['value'].set(0)
+		self.pb['is_draw'] = True
+		self.disconnect_refiner()
+		self.set_state(tk.DISABLED)
+		self.run_params = job.params
+		self.run_anim(job.calc)
+
+	def on_close(self):
+		"""Сохраняет кэш результатов и закрывает приложение."""
+		self.is_calc.set(False)
+		self.is_basins.set(False)
+		self.jobs.cancel_all()
+		self.disconnect_refiner()
+		self.cache.flush()
+		self.destroy()
+
 	def pause(self):
 		"""Действия после нажатия кнопки Пауза/Продолжить."""
 		if hasattr(self, 'anim'):
@@ -298,8 +531,10 @@ class App(tk.Tk):
 		# Блокировка и разблокировка в зависимости от количества пустых полей
 		if len(self.empty_els) > 0:
 			self.b1.configure(state = tk.DISABLED)
+			self.b6.configure(state = tk.DISABLED)
 		else:
 			self.b1.configure(state = tk.NORMAL)
+			self.b6.configure(state = tk.NORMAL)
 
 	def validate_int(self, value, el):
 		"""
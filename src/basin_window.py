@@ -0,0 +1,54 @@
+import numpy as np
+import tkinter as tk
+from matplotlib import colormaps
+from matplotlib.colors import BoundaryNorm, ListedColormap
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from src.basins import BASIN_ESCAPED, BASIN_UNKNOWN, Basins
+
+MAX_TICKS = 20
+"""Наибольшее количество подписанных аттракторов на шкале цветов."""
+
+
+class BasinMap(tk.Toplevel):
+	"""Окно с картой бассейнов притяжения по начальным значениям."""
+	def __init__(self, parent, res: Basins, fontsize: int):
+		"""
+		Окно с картой бассейнов притяжения по начальным значениям.
+
+		Attributes:
+			parent: Родительское окно
+			res (Basins): Карта бассейнов притяжения
+			fontsize (int): Размер заголовка и подписей на осях графика
+		"""
+		super().__init__(parent)
+		self.geometry('900x600')
+		self.title('Бассейны притяжения')
+		tk.Label(self, text = 'Белый - уход в бесконечность, чёрный - цикл не найден '
+			'(хаос или период больше max_period); цвет - аттрактор (p - период, x - наименьшее значение цикла)').pack(anchor = tk.W)
+		fig = Figure()
+		fig.subplots_adjust(left = 0.07, bottom = 0.1, right = 0.95, top = 0.9, wspace = 0.4)
+		for k, name in enumerate(res.names):
+			axis = fig.add_subplot(1, len(res.names), k + 1)
+			table, (xl, xv), (yl, yv) = res.plane(name)
+			attractors = res.attractors[name]
+			# Отдельный цвет для каждого аттрактора, уход и хаос - белый и чёрный
+			colors = colormaps['tab20'](np.arange(max(len(attractors), 1)) % 20)
+			cmap = ListedColormap(np.vstack([[[1, 1, 1, 1], [0, 0, 0, 1]], colors]))
+			bounds = np.arange(BASIN_ESCAPED, len(attractors) + 2) - 0.5
+			norm = BoundaryNorm(bounds, cmap.N)
+			# Строки - значения второй оси, столбцы - первой
+			img = axis.imshow(table.T, origin = 'lower', extent = [xv.min(), xv.max(), yv.min(), yv.max()],
+				aspect = 'auto', interpolation = 'nearest', cmap = cmap, norm = norm)
+			ticks = np.arange(BASIN_ESCAPED, min(len(attractors), MAX_TICKS) + 1)
+			cbar = fig.colorbar(img, ax = axis, ticks = ticks)
+			labels = {BASIN_ESCAPED: 'уход', BASIN_UNKNOWN: 'нет цикла'}
+			labels.update({i + 1: f'p={p}, x={x:.4g}' for i, (p, x, count) in enumerate(attractors)})
+			cbar.ax.set_yticklabels([labels[t] for t in ticks], fontsize = fontsize)
+			axis.set_title(f'{name}: аттракторов {len(attractors)}', fontsize = fontsize)
+			axis.set_xlabel(xl, fontsize = fontsize)
+			axis.set_ylabel(yl, fontsize = fontsize)
+		canvas = FigureCanvasTkAgg(fig, master = self)
+		canvas.draw()
+		canvas.get_tk_widget().pack(fill = tk.BOTH, expand = 1)
@@ -0,0 +1,271 @@
+import copy
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.engine import PHASE_DRAW, Params, Engine, grid_axes, grid_plane
+from src.parallel import cpu_count
+from src.periods import PERIOD_CHAOS, PERIOD_ESCAPED, detect_periods
+
+BASIN_TILE = 2**16
+"""Количество точек сетки в одной части (плитке) карты бассейнов."""
+
+ATTRACTOR_TOL = 1e-4
+"""Наибольшее отличие наименьших значений циклов одного аттрактора."""
+
+BASIN_ESCAPED = PERIOD_ESCAPED
+"""Номер бассейна для траекторий, ушедших в бесконечность."""
+
+BASIN_UNKNOWN = PERIOD_CHAOS
+"""Номер бассейна для траекторий без найденного цикла (хаос или длинный период)."""
+
+
+def tile_params(params: Params) -> Params:
+	"""
+	Возвращает параметры расчёта плитки: после установления рассчитывается
+	только окно 2 * max_period итераций для определения цикла.
+
+	Args:
+		params (Params): Параметры карты бассейнов
+
+	Returns:
+		Params: Параметры вычисления плитки
+	"""
+	p = copy.copy(params)
+	p.n_draw = 2 * p.max_period
+	p.lyapunov = False
+	p.storage_dir = None
+	p.workers = 1
+	return p
+
+
+def minimal_periods(rows: np.array, codes: np.array, tol: float = ATTRACTOR_TOL) -> np.array:
+	"""
+	Сводит найденные периоды к наименьшим: цикл, ещё не установившийся
+	с точностью detect_periods, может определиться как кратный своему
+	периоду (например, 16 вместо 8). Период p заменяется наименьшим
+	делителем q, для которого значения за последние p итераций
+	повторяются через q итераций с точностью tol.
+
+	Args:
+		rows (np.array): Таблица траектории (номер строки n, точка сетки)
+		codes (np.array): Коды периодов (см. src.periods)
+		tol (float): Допустимое отклонение значений цикла
+
+	Returns:
+		np.array: Коды периодов с наименьшими периодами
+	"""
+	codes = codes.copy()
+	for p in np.unique(codes[codes > 1]):
+		cols = np.flatnonzero(codes == p)
+		window = rows[-p:, cols]
+		for q in range(1, p):
+			if p % q != 0 or cols.size == 0:
+				continue
+			fit = np.abs(window[q:] - window[:-q]).max(axis = 0) < tol
+			codes[cols[fit]] = q
+			cols, window = cols[~fit], window[:, ~fit]
+	return codes
+
+
+def classify(rows: np.array, max_period: int) -> tuple:
+	"""
+	Определяет цикл каждой траектории по окну последних итераций.
+
+	Args:
+		rows (np.array): Таблица траектории (номер строки n, точка сетки)
+		max_period (int): Наибольший проверяемый период
+
+	Returns:
+		tuple: (коды периодов (см. src.periods, сведённые к наименьшим),
+			наименьшее значение x[n] за цикл - NaN, если цикл не найден)
+	"""
+	codes = minimal_periods(rows, detect_periods(rows, max_period))
+	keys = np.full(codes.size, np.nan)
+	for p in np.unique(codes[codes > 0]):
+		cols = codes == p
+		keys[cols] = rows[-p:, cols].min(axis = 0)
+	return codes, keys
+
+
+def run_tile(params: Params, start: int, stop: int) -> tuple:
+	"""
+	Рассчитывает плитку карты бассейнов (в дочернем процессе).
+	Траектории плитки не возвращаются - только итоги по каждой точке.
+
+	Args:
+		params (Params): Параметры вычисления плитки (см. tile_params)
+		start, stop (int): Диапазон точек сетки
+
+	Returns:
+		tuple: (start, stop, {имя функции: (коды периодов, значения циклов, номера итераций ухода)})
+	"""
+	res = Engine(params, start, stop).run()
+	tiles = {}
+	for name in res.names:
+		codes, keys = classify(res.rows(name)[:res.n_done + 2], params.max_period)
+		tiles[name] = (codes, keys, res.escape_time(name))
+	return start, stop, tiles
+
+
+def label_attractors(codes: np.array, keys: np.array, tol: float = ATTRACTOR_TOL) -> tuple:
+	"""
+	Нумерует аттракторы: циклы одного периода, наименьшие значения
+	которых отличаются не больше tol, относятся к одному аттрактору.
+
+	Args:
+		codes (np.array): Коды периодов для каждой точки сетки
+		keys (np.array): Наименьшие значения x[n] за цикл
+		tol (float): Наибольшее отличие значений циклов одного аттрактора
+
+	Returns:
+		tuple: (номера бассейнов: 1.. - аттракторы, BASIN_UNKNOWN, BASIN_ESCAPED;
+			список аттракторов (период, наименьшее значение цикла, количество точек))
+	"""
+	labels = np.where(codes == PERIOD_ESCAPED, BASIN_ESCAPED, BASIN_UNKNOWN).astype(np.int32)
+	attractors = []
+	for p in np.unique(codes[codes > 0]):
+		cols = np.flatnonzero(codes == p)
+		order = np.argsort(keys[cols])
+		cols = cols[order]
+		k = keys[cols]
+		# Новый аттрактор начинается там, где значения отличаются больше tol
+		group = np.concatenate([[0], np.cumsum(np.diff(k) > tol)])
+		labels[cols] = len(attractors) + 1 + group
+		counts = np.bincount(group)
+		for g, count in enumerate(counts):
+			attractors.append((int(p), float(k[group == g][0]), int(count)))
+	return labels, attractors
+
+
+class Basins:
+	"""
+	Карта бассейнов притяжения: для каждой точки сетки начальных
+	значений (и коэффициентов) - номер аттрактора, к которому сходится траектория.
+
+	Attributes:
+		names (list): Имена рассчитанных функций
+		axes (dict): Значения по осям сетки (см. src.engine.grid_axes)
+		shape (tuple): Размеры сетки
+		labels (dict): Номера бассейнов для каждой функции (см. label_attractors)
+		escape (dict): Номера итераций ухода в бесконечность (-1 - не ушла)
+		attractors (dict): Аттракторы каждой функции (период, наименьшее
+			значение цикла, количество точек)
+		is_cancelled (bool): Было ли вычисление прервано до расчёта всех плиток
+	"""
+
+	def __init__(self, names: list, axes: dict):
+		"""
+		Резервирует место для итогов по точкам сетки.
+
+		Args:
+			names (list): Имена рассчитываемых функций
+			axes (dict): Значения по осям сетки
+		"""
+		self.names = names
+		self.axes = axes
+		self.shape = tuple(values.size for values in axes.values())
+		size = int(np.prod(self.shape))
+		self.labels = {name: np.full(size, BASIN_UNKNOWN, dtype = np.int32) for name in names}
+		self.escape = {name: np.full(size, -1, dtype = int) for name in names}
+		self.attractors = {name: [] for name in names}
+		self.is_cancelled = False
+
+	def plane(self, name: str) -> tuple:
+		"""
+		Возвращает карту бассейнов функции для отрисовки (см. src.engine.grid_plane).
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			tuple: (таблица номеров бассейнов, (подпись, значения) оси 1, (подпись, значения) оси 2)
+		"""
+		return grid_plane(self.labels[name], self.axes)
+
+	def save(self, fn: str):
+		"""
+		Сохраняет карту в сжатый файл .npz: basin_<имя> и escape_<имя> по форме сетки,
+		attractors_<имя> - строки (период, наименьшее значение цикла, количество точек).
+
+		Args:
+			fn (str): Имя файла
+		"""
+		arrays = {'axes': np.array(list(self.axes), dtype = str)}
+		for k, values in enumerate(self.axes.values()):
+			arrays[f'axis_{k}'] = values
+		for name in self.names:
+			arrays['basin_' + name] = self.labels[name].reshape(self.shape)
+			arrays['escape_' + name] = self.escape[name].reshape(self.shape)
+			arrays['attractors_' + name] = np.array(self.attractors[name], dtype = float).reshape(-1, 3)
+		np.savez_compressed(fn, **arrays)
+
+
+def iterate_tiles(params: Params, bounds: list, workers: int, cancel):
+	"""
+	Рассчитывает плитки и возвращает их итоги по мере завершения.
+
+	Args:
+		params (Params): Параметры вычисления плитки
+		bounds (list): Диапазоны точек сетки плиток (start, stop)
+		workers (int): Количество процессов
+		cancel (method): Возвращает True для прекращения вычислений
+	"""
+	if workers == 1:
+		for start, stop in bounds:
+			if cancel is not None and cancel():
+				return
+			yield run_tile(params, start, stop)
+		return
+	with ProcessPoolExecutor(max_workers = workers) as pool:
+		pending = {pool.submit(run_tile, params, start, stop) for start, stop in bounds}
+		while pending:
+			finished, pending = wait(pending, timeout = 0.1, return_when = FIRST_COMPLETED)
+			for future in finished:
+				yield future.result()
+			if cancel is not None and cancel():
+				pool.shutdown(wait = False, cancel_futures = True)
+				return
+
+
+def compute_basins(params: Params, progress = None, cancel = None) -> Basins:
+	"""
+	Рассчитывает карту бассейнов притяжения.
+
+	Сетка (r, b, x[0], x[-1]) делится на плитки по BASIN_TILE точек,
+	которые рассчитываются в params.workers процессах (0 - по числу ядер).
+	После n_iter итераций установления по окну 2 * max_period итераций
+	определяется цикл каждой траектории, а траектории плитки сразу
+	отбрасываются, поэтому объём памяти не зависит от n_iter и растёт
+	только с размером сетки (для 1000 x 1000 - десятки МБ).
+
+	Args:
+		params (Params): Параметры вычисления (x0 и x_prev - диапазоны начальных значений)
+		progress (method): Вызывается после каждой плитки
+			с аргументами (номер этапа, номер плитки, количество плиток)
+		cancel (method): Возвращает True для прекращения вычислений
+
+	Returns:
+		Basins: Карта бассейнов притяжения
+	"""
+	axes = grid_axes(params)
+	res = Basins(params.names(), axes)
+	size = int(np.prod(res.shape))
+	edges = list(range(0, size, BASIN_TILE)) + [size]
+	bounds = list(zip(edges[:-1], edges[1:]))
+	workers = params.workers if params.workers > 0 else cpu_count()
+	workers = min(workers, len(bounds))
+	codes = {name: np.full(size, PERIOD_CHAOS, dtype = np.int16) for name in res.names}
+	keys = {name: np.full(size, np.nan) for name in res.names}
+	done = 0
+	for start, stop, tiles in iterate_tiles(tile_params(params), bounds, workers, cancel):
+		for name, (tile_codes, tile_keys, escape) in tiles.items():
+			codes[name][start:stop] = tile_codes
+			keys[name][start:stop] = tile_keys
+			res.escape[name][start:stop] = escape
+		done += 1
+		if progress is not None:
+			progress(PHASE_DRAW, done - 1, len(bounds))
+	res.is_cancelled = done < len(bounds)
+	for name in res.names:
+		res.labels[name], res.attractors[name] = label_attractors(codes[name], keys[name])
+	return res
@@ -0,0 +1,204 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from src.settings import Settings
+from src.engine import PRECISIONS, Params, Result
+from src.parallel import create_engine
+from src.storage import STORAGE_DIR
+from src.basins import compute_basins
+
+
+def create_parser() -> argparse.ArgumentParser:
+	"""Формирует разбор аргументов командной строки."""
+	parser = argparse.ArgumentParser(
+		description = 'Расчёт отображения Эно без графического интерфейса.')
+	parser.add_argument('-p', '--preset', default = '0',
+		help = 'Номер или название шаблона из раздела defaults файла settings.json')
+	parser.add_argument('-l', '--list', action = 'store_true',
+		help = 'Вывести список шаблонов и завершить работу')
+	parser.add_argument('--f1', dest = 'f1', action = 'store_true', default = None,
+		help = 'Рассчитывать функцию №1')
+	parser.add_argument('--no-f1', dest = 'f1', action = 'store_false',
+		help = 'Не рассчитывать функцию №1')
+	parser.add_argument('--f2', dest = 'f2', action = 'store_true', default = None,
+		help = 'Рассчитывать функцию №2')
+	parser.add_argument('--no-f2', dest = 'f2', action = 'store_false',
+		help = 'Не рассчитывать функцию №2')
+	parser.add_argument('--formula', action = 'append', default = None, metavar = 'NAME',
+		help = 'Рассчитывать пользовательскую формулу из раздела formulas (можно несколько раз)')
+	parser.add_argument('-r', nargs = 3, type = float, metavar = ('BEGIN', 'END', 'STEP'),
+		help = 'Диапазон коэффициента r')
+	parser.add_argument('-b', nargs = 3, type = float, metavar = ('BEGIN', 'END', 'STEP'),
+		help = 'Диапазон коэффициента b')
+	parser.add_argument('--x0', nargs = '+', type = float, metavar = 'X',
+		help = 'Начальное значение x[0] или диапазон BEGIN END STEP')
+	parser.add_argument('--x-prev', nargs = '+', type = float, metavar = 'X',
+		help = 'Начальное значение x[-1] или диапазон BEGIN END STEP (по умолчанию равно x[0])')
+	parser.add_argument('--basins', action = 'store_true',
+		help = 'Рассчитать карту бассейнов притяжения вместо траекторий (плитками во всех процессах)')
+	parser.add_argument('--n-iter', type = int,
+		help = 'Количество итераций для достижения устойчивого значения')
+	parser.add_argument('--n-draw', type = int,
+		help = 'Количество итераций для отрисовки графиков')
+	parser.add_argument('--tol', type = float,
+		help = 'Точность проверки сходимости на этапе установления (0 - без проверки)')
+	parser.add_argument('--check-every', type = int,
+		help = 'Через сколько итераций проверять сходимость')
+	parser.add_argument('--max-period', type = int,
+		help = 'Наибольший период для карты периодов')
+	parser.add_argument('--lyapunov', action = 'store_true', default = None,
+		help = 'Рассчитывать старший показатель Ляпунова')
+	parser.add_argument('--memmap', action = 'store_true', default = None,
+		help = 'Хранить траектории в файлах np.memmap (для сеток, не помещающихся в память)')
+	parser.add_argument('--precision', choices = list(PRECISIONS),
+		help = 'Точность вычисления и хранения траекторий')
+	parser.add_argument('-j', '--workers', type = int,
+		help = 'Количество процессов для вычисления (0 - по числу ядер)')
+	parser.add_argument('-o', '--output', default = 'result.npz',
+		help = 'Файл для сохранения траекторий (.npz)')
+	parser.add_argument('--log', default = None,
+		help = 'Файл для сохранения лога ухода траекторий в бесконечность (.csv или .npz)')
+	return parser
+
+
+def find_preset(defaults: list, preset: str) -> dict:
+	"""
+	Находит шаблон по номеру или названию.
+
+	Args:
+		defaults (list): Список шаблонов из settings.json
+		preset (str): Номер или название шаблона
+
+	Returns:
+		dict: Найденный шаблон
+	"""
+	if preset.isdigit():
+		return defaults[int(preset)]
+	for d in defaults:
+		if d['name'] == preset:
+			return d
+	raise KeyError(f'Шаблон "{preset}" не найден')
+
+
+def get_params(args: argparse.Namespace, settings: Settings, save_dir: str) -> Params:
+	"""
+	Формирует параметры расчёта из шаблона с учётом аргументов командной строки.
+
+	Args:
+		args (argparse.Namespace): Аргументы командной строки
+		settings (Settings): Глобальные настройки приложения
+		save_dir (str): Каталог для хранения траекторий в файлах
+
+	Returns:
+		Params: Параметры вычисления
+	"""
+	d = dict(find_preset(settings['defaults'], args.preset))
+	for key, value in (('f1', args.f1), ('f2', args.f2),
+			('formulas', args.formula), ('r', args.r),
+			('b', args.b), ('x0', args.x0), ('x_prev', args.x_prev),
+			('n_iter', args.n_iter),
+			('n_draw', args.n_draw), ('workers', args.workers),
+			('tol', args.tol), ('check_every', args.check_every),
+			('max_period', args.max_period), ('lyapunov', args.lyapunov),
+			('memmap', args.memmap), ('precision', args.precision)):
+		if value is not None:
+			d[key] = value
+	# Начальные значения: одно число или диапазон
+	for key in ('x0', 'x_prev'):
+		value = d.get(key)
+		if isinstance(value, list) and len(value) == 1:
+			d[key] = value[0]
+		elif isinstance(value, list) and len(value) != 3:
+			raise ValueError(f'{key}: нужно одно значение или диапазон BEGIN END STEP')
+	if d.get('memmap'):
+		d['storage_dir'] = os.path.join(save_dir, STORAGE_DIR)
+	return Params.from_settings(d, settings.get('formulas', []))
+
+
+def save_result(fn: str, res: Result, max_period: int):
+	"""
+	Сохраняет траектории в файл .npz.
+
+	Строки массивов x_<имя> (x_f1, x_f2, x_lozi, ...) соответствуют номерам n,
+	а столбцы - точкам сетки (r, b и начальные значения, если они заданы
+	диапазонами; значения по осям сетки - в axis_0, axis_1, ..., подписи осей - в axes).
+	Массивы escape_<имя>
+	содержат номер итерации ухода в бесконечность (-1 - не ушла),
+	а period_<имя> - коды периодов (см. src.periods).
+	При расчёте показателя Ляпунова он сохраняется в lyap_<имя>.
+
+	Args:
+		fn (str): Имя файла
+		res (Result): Результаты вычисления
+		max_period (int): Наибольший период для карты периодов
+	"""
+	arrays = {'r': res.r, 'b': res.b, 'n': res.arr_n, 'axes': np.array(list(res.axes), dtype = str)}
+	for k, values in enumerate(res.axes.values()):
+		arrays[f'axis_{k}'] = values
+	for name in res.names:
+		arrays['x_' + name] = res.rows(name)
+		arrays['escape_' + name] = res.escape_time(name)
+		arrays['period_' + name] = res.periods(name, max_period)
+		if name in res.lsum:
+			arrays['lyap_' + name] = res.lyapunov(name)
+	np.savez(fn, **arrays)
+
+
+def save_basins(fn: str, params: Params):
+	"""
+	Рассчитывает карту бассейнов притяжения и сохраняет её в файл .npz (см. Basins.save).
+
+	Args:
+		fn (str): Имя файла
+		params (Params): Параметры вычисления
+	"""
+	start = time.perf_counter()
+	res = compute_basins(params)
+	elapsed = time.perf_counter() - start
+	res.save(fn)
+	print(f'Точек сетки: {int(np.prod(res.shape))} ({" x ".join(str(n) for n in res.shape)})')
+	for name in res.names:
+		print(f'{name}: аттракторов {len(res.attractors[name])}, '
+			f'ушло в бесконечность {int((res.escape[name] >= 0).sum())}')
+	print(f'Время: {elapsed:.3f} с')
+	print(f'Результат сохранён: {os.path.abspath(fn)}')
+
+
+def main(save_dir: str, argv: list = None):
+	"""
+	Выполняет расчёт по параметрам командной строки.
+
+	Args:
+		save_dir (str): Каталог с файлом settings.json
+		argv (list): Аргументы командной строки
+	"""
+	args = create_parser().parse_args(argv)
+	settings = Settings(save_dir)
+	if args.list:
+		for i, d in enumerate(settings['defaults']):
+			print(f'{i}: {d["name"]}')
+		return
+	params = get_params(args, settings, save_dir)
+	if args.basins:
+		# Плитки карты бассейнов по умолчанию рассчитываются на всех ядрах
+		if args.workers is None:
+			params.workers = 0
+		save_basins(args.output, params)
+		return
+	start = time.perf_counter()
+	res = create_engine(params).run()
+	elapsed = time.perf_counter() - start
+	save_result(args.output, res, params.max_period)
+	# Оценка производительности
+	n_points = (params.n_iter + 1 + params.n_draw) * res.Nbr * len(res.names)
+	print(f'Точек сетки (r, b): {res.Nbr}')
+	print(f'Вычислено значений: {n_points}')
+	print(f'Время: {elapsed:.3f} с')
+	print(f'Производительность: {n_points / max(elapsed, 1e-9):.4e} значений/с')
+	print(f'Результат сохранён: {os.path.abspath(args.output)}')
+	if len(res.log) > 0:
+		fn = args.log if args.log is not None else os.path.join(save_dir, 'error.csv')
+		res.save_log(fn)
+		print(f'Траекторий ушло в бесконечность: {len(res.log)}, лог сохранён: {fn}')
@@ -0,0 +1,386 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from src.settings import SETTINGS
+from src.engine import Params, Engine
+from src.basins import compute_basins
+from src.profiler import Profiler, machine_info, peak_rss
+
+BENCHMARK_DIR = 'benchmarks'
+"""Подкаталог save_dir для результатов замеров."""
+
+GRID_SIZES = [10**3, 10**4, 10**5, 10**6]
+"""Количество точек сетки (r, b) синтетических замеров."""
+
+GRID_DRAWS = [100, 1000, 10**4]
+"""Количество итераций для отрисовки синтетических замеров."""
+
+GRID_B = 10
+"""Количество значений b синтетической сетки."""
+
+GRID_ITER = 100
+"""Количество итераций установления синтетических замеров."""
+
+QUICK_LIMIT = 10**4
+"""Наибольшее количество точек сетки и итераций отрисовки в быстром режиме."""
+
+PLOT_FRAMES = 200
+"""Количество кадров замеров отрисовки."""
+
+PLOT_PARAMS = [True, True, [0, 4, 0.004], [0.3, 0.3, 1], 0.4, 1000]
+"""Параметры вычисления для замеров отрисовки (без n_draw)."""
+
+BASIN_SIDES = [100, 1000]
+"""Количество значений x[0] и x[-1] замеров карты бассейнов (сетка side x side)."""
+
+BASIN_ITER = 200
+"""Количество итераций установления замеров карты бассейнов."""
+
+PHASES = ['phase_iter', 'phase_draw']
+"""Этапы вычисления, для которых сохраняются замеры."""
+
+
+class Value:
+	"""
+	Значение с интерфейсом переменной Tk (для графиков без окна).
+
+	Attributes:
+		value: Значение
+	"""
+
+	def __init__(self, value):
+		"""Создаёт значение."""
+		self.value = value
+
+	def get(self):
+		"""Возвращает значение."""
+		return self.value
+
+	def set(self, value):
+		"""Изменяет значение."""
+		self.value = value
+
+
+class PlotData:
+	"""
+	Исходные данные графиков без формы (аналог Data).
+
+	Attributes:
+		is_f1, is_f2 (Value): Отображать ли функции №1 и №2?
+		f (PlotData): Параметры функции (f.n_draw)
+		n_draw (Value): Количество итераций для отрисовки
+		charts_num (Value): Номер комбинации графиков
+		delay (Value): Длина задержки отрисовки, мс
+	"""
+
+	def __init__(self, params: Params, charts_num: int):
+		"""
+		Создаёт данные по параметрам вычисления.
+
+		Args:
+			params (Params): Параметры вычисления
+			charts_num (int): Номер комбинации графиков
+		"""
+		self.is_f1 = Value(params.is_f1)
+		self.is_f2 = Value(params.is_f2)
+		self.n_draw = Value(params.n_draw)
+		self.f = self
+		self.charts_num = Value(charts_num)
+		self.delay = Value(1)
+
+
+def grid_params(size: int, n_draw: int) -> Params:
+	"""
+	Формирует параметры синтетического замера: GRID_B значений b
+	и size / GRID_B значений r (логистическая часть и хаотическая область).
+
+	Args:
+		size (int): Количество точек сетки (r, b)
+		n_draw (int): Количество итераций для отрисовки
+
+	Returns:
+		Params: Параметры вычисления
+	"""
+	nr = size // GRID_B
+	r_step = 1.5 / nr
+	b_step = 0.3 / (GRID_B - 1)
+	return Params(True, True, [2.5, 2.5 + r_step * (nr - 1), r_step],
+		[0, b_step * (GRID_B - 1), b_step], 0.4, GRID_ITER, n_draw)
+
+
+def run_engine(name: str, params: Params, trace_memory: bool) -> dict:
+	"""
+	Выполняет вычисление и возвращает замеры по этапам (в отдельном процессе).
+
+	Args:
+		name (str): Название замера
+		params (Params): Параметры вычисления
+		trace_memory (bool): Измерять ли объём выделенной памяти (tracemalloc)
+
+	Returns:
+		dict: Замеры: время, итерации, значения в секунду и память каждого этапа
+	"""
+	profiler = Profiler(trace_memory, kernels = False)
+	engine = Engine(params)
+	engine.profiler = profiler
+	start = time.perf_counter()
+	res = engine.run()
+	total = time.perf_counter() - start
+	profiler.stop_memory()
+	funcs = len(res.names)
+	phases = {}
+	for phase in PHASES:
+		s = profiler.sections.get(phase)
+		if s is None:
+			continue
+		values = s['items'] * res.Nbr * funcs
+		phases[phase] = {
+			'time': s['time'],
+			'iterations': s['items'],
+			'values': values,
+			'values_per_s': values / s['time'] if s['time'] > 0 else None,
+			'peak_rss': s['peak_rss'],
+			'allocated_peak': s.get('allocated_peak')
+		}
+	return {'name': name, 'kind': 'engine', 'params': vars(params), 'points': res.Nbr,
+		'time': total, 'trajectory_bytes': res.nbytes(), 'escaped': len(res.log),
+		'phases': phases, 'peak_rss': peak_rss()}
+
+
+def basin_params(side: int) -> Params:
+	"""
+	Формирует параметры замера карты бассейнов: сетка side x side
+	начальных значений x[0] и x[-1] при r = 1.05, b = 0.3 на всех ядрах.
+
+	Args:
+		side (int): Количество значений по каждой оси
+
+	Returns:
+		Params: Параметры вычисления
+	"""
+	step = 3 / (side - 1)
+	return Params(True, True, [1.05, 1.05, 0.1], [0.3, 0.3, 0.1], [-1.5, 1.5, step],
+		BASIN_ITER, 0, workers = 0, x_prev = [-1.5, 1.5, step])
+
+
+def run_basins(name: str, params: Params) -> dict:
+	"""
+	Измеряет время расчёта карты бассейнов (в отдельном процессе).
+
+	Args:
+		name (str): Название замера
+		params (Params): Параметры вычисления
+
+	Returns:
+		dict: Замеры: время, точек сетки в секунду, количество аттракторов
+	"""
+	start = time.perf_counter()
+	res = compute_basins(params)
+	elapsed = time.perf_counter() - start
+	points = int(np.prod(res.shape))
+	return {'name': name, 'kind': 'basins', 'params': vars(params), 'points': points,
+		'time': elapsed, 'points_per_s': points * len(res.names) / elapsed if elapsed > 0 else None,
+		'attractors': {name: len(a) for name, a in res.attractors.items()}, 'peak_rss': peak_rss()}
+
+
+def run_plot(name: str, charts_num: int, params: Params) -> dict:
+	"""
+	Измеряет время отрисовки кадров графика на Agg (в отдельном процессе).
+
+	Args:
+		name (str): Название замера
+		charts_num (int): Номер комбинации графиков
+		params (Params): Параметры вычисления
+
+	Returns:
+		dict: Замеры: время кадра, точек в секунду, время полной перерисовки
+	"""
+	from matplotlib.figure import Figure
+	from matplotlib.backends.backend_agg import FigureCanvasAgg
+	from src.calculations import Calculator
+	from src.plots import SubplotAnimation
+	# Лог ошибок вычисления не нужен
+	tmp = tempfile.TemporaryDirectory()
+	res = Calculator(params, tmp.name)
+	fig = Figure(figsize = (12.8, 7.2))
+	FigureCanvasAgg(fig)
+	fig.canvas.draw()
+	pb = {'value': Value(0)}
+	anim = SubplotAnimation(fig, PlotData(params, charts_num), res, pb, lambda: None, SETTINGS)
+	anim._init_draw()
+	fig.canvas.draw()
+	frames = 0
+	start = time.perf_counter()
+	for i in anim.new_frame_seq():
+		anim._draw_next_frame(i, True)
+		frames += 1
+	elapsed = time.perf_counter() - start
+	anim.del_new_points()
+	t = time.perf_counter()
+	fig.canvas.draw()
+	draw_time = time.perf_counter() - t
+	tmp.cleanup()
+	points = params.n_draw * res.Nbr * len(params.names())
+	return {'name': name, 'kind': 'plot', 'params': vars(params), 'points': res.Nbr,
+		'time': elapsed, 'frames': frames, 'frame_time': elapsed / max(frames, 1),
+		'points_per_s': points / elapsed if elapsed > 0 else None,
+		'canvas_draw': draw_time, 'peak_rss': peak_rss()}
+
+
+def create_parser() -> argparse.ArgumentParser:
+	"""Формирует разбор аргументов командной строки."""
+	parser = argparse.ArgumentParser(
+		description = 'Замеры производительности вычисления и отрисовки.')
+	parser.add_argument('--quick', action = 'store_true',
+		help = f'Синтетические сетки и отрисовка не больше {QUICK_LIMIT} точек и итераций')
+	parser.add_argument('--no-presets', action = 'store_true',
+		help = 'Не выполнять замеры по шаблонам из defaults')
+	parser.add_argument('--no-grids', action = 'store_true',
+		help = 'Не выполнять замеры на синтетических сетках')
+	parser.add_argument('--no-plots', action = 'store_true',
+		help = 'Не выполнять замеры отрисовки графиков')
+	parser.add_argument('--no-basins', action = 'store_true',
+		help = 'Не выполнять замеры карты бассейнов притяжения')
+	parser.add_argument('--memory', action = 'store_true',
+		help = 'Измерять объём выделенной памяти по этапам (tracemalloc, замедляет вычисление)')
+	parser.add_argument('--max-bytes', type = int, default = 512,
+		help = 'Наибольший объём траекторий синтетического замера, МБ (больше - пропускается)')
+	parser.add_argument('-o', '--output', default = None,
+		help = 'Файл для сохранения результатов (.json, по умолчанию - в подкаталоге benchmarks)')
+	parser.add_argument('--compare', default = None,
+		help = 'Файл с результатами предыдущего запуска для сравнения')
+	parser.add_argument('--threshold', type = float, default = 0.1,
+		help = 'Допустимое относительное замедление при сравнении')
+	return parser
+
+
+def create_cases(args: argparse.Namespace) -> list:
+	"""
+	Формирует список замеров.
+
+	Args:
+		args (argparse.Namespace): Аргументы командной строки
+
+	Returns:
+		list: Функции замеров и их аргументы
+	"""
+	from src.calculations import NX, RX, XX
+	cases = []
+	if not args.no_presets:
+		for d in SETTINGS['defaults']:
+			cases.append((run_engine, (f'preset: {d["name"]}', Params.from_settings(d, SETTINGS['formulas']), args.memory)))
+	if not args.no_grids:
+		for size in GRID_SIZES:
+			for n_draw in GRID_DRAWS:
+				if args.quick and (size > QUICK_LIMIT or n_draw > QUICK_LIMIT // 10):
+					continue
+				params = grid_params(size, n_draw)
+				# Объём траекторий двух функций
+				if 2 * 8 * size * (n_draw + 2) > args.max_bytes * 2**20:
+					continue
+				cases.append((run_engine, (f'grid: {size} x {n_draw}', params, args.memory)))
+	if not args.no_plots:
+		n_draw = PLOT_FRAMES // 4 if args.quick else PLOT_FRAMES
+		for key, charts_num in (('RX', RX), ('XX', XX), ('NX', NX)):
+			cases.append((run_plot, (f'plot: {key}', charts_num, Params(*PLOT_PARAMS, n_draw))))
+	if not args.no_basins:
+		for side in BASIN_SIDES:
+			if args.quick and side * side > QUICK_LIMIT:
+				continue
+			cases.append((run_basins, (f'basins: {side} x {side}', basin_params(side))))
+	return cases
+
+
+def compare(results: dict, fn: str, threshold: float) -> list:
+	"""
+	Сравнивает результаты с предыдущим запуском.
+
+	Сравнивается скорость каждого этапа вычисления (значений в секунду)
+	и отрисовки (точек в секунду) и карты бассейнов (точек сетки в секунду)
+	для замеров с одинаковым названием.
+
+	Args:
+		results (dict): Результаты текущего запуска
+		fn (str): Файл с результатами предыдущего запуска
+		threshold (float): Допустимое относительное замедление
+
+	Returns:
+		list: Строки с замедлениями больше допустимого
+	"""
+	with open(fn, 'r', encoding = 'utf-8') as f:
+		prev_results = json.load(f)
+	if prev_results.get('memory') != results['memory']:
+		print('Внимание: замеры выполнены с разной настройкой --memory')
+	old = {case['name']: case for case in prev_results['cases']}
+	slow = []
+	for case in results['cases']:
+		prev = old.get(case['name'])
+		if prev is None:
+			continue
+		pairs = [(phase, case['phases'][phase]['values_per_s'], prev['phases'][phase]['values_per_s'])
+			for phase in case.get('phases', {}) if phase in prev.get('phases', {})]
+		if case['kind'] == 'plot':
+			pairs.append(('frames', case['points_per_s'], prev['points_per_s']))
+		elif case['kind'] == 'basins':
+			pairs.append(('basins', case['points_per_s'], prev['points_per_s']))
+		for phase, new, was in pairs:
+			if not new or not was:
+				continue
+			ratio = new / was
+			line = f'{case["name"]} [{phase}]: {ratio:.2f}x'
+			print(line)
+			if ratio < 1 - threshold:
+				slow.append(line)
+	return slow
+
+
+def main(save_dir: str, argv: list = None) -> int:
+	"""
+	Выполняет замеры и сохраняет результаты в файл JSON.
+
+	Каждый замер выполняется в новом процессе, поэтому пиковый объём
+	памяти процесса относится только к нему.
+
+	Args:
+		save_dir (str): Каталог для сохранения результатов
+		argv (list): Аргументы командной строки
+
+	Returns:
+		int: Код завершения (1 - есть замедление относительно --compare)
+	"""
+	args = create_parser().parse_args(argv)
+	results = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'machine': machine_info(),
+		'memory': args.memory, 'cases': []}
+	with ProcessPoolExecutor(max_workers = 1, max_tasks_per_child = 1) as pool:
+		for func, case_args in create_cases(args):
+			case = pool.submit(func, *case_args).result()
+			results['cases'].append(case)
+			if case['kind'] == 'engine':
+				speed = ', '.join(f'{phase} {s["values_per_s"]:.3e} знач./с'
+					for phase, s in case['phases'].items() if s['values_per_s'])
+			elif case['kind'] == 'basins':
+				speed = f'{case["points_per_s"]:.3e} точек/с, аттракторов {case["attractors"]}'
+			else:
+				speed = f'кадр {case["frame_time"] * 1000:.1f} мс, {case["points_per_s"]:.3e} точек/с'
+			print(f'{case["name"]}: {case["time"]:.3f} с ({speed})')
+	fn = args.output
+	if fn is None:
+		path = os.path.join(save_dir, BENCHMARK_DIR)
+		os.makedirs(path, exist_ok = True)
+		fn = os.path.join(path, time.strftime('%Y%m%d_%H%M%S') + '.json')
+	with open(fn, 'w', encoding = 'utf-8') as f:
+		json.dump(results, f, ensure_ascii = False, indent = 2)
+	print(f'Результаты сохранены: {os.path.abspath(fn)}')
+	if args.compare is not None:
+		slow = compare(results, args.compare, args.threshold)
+		if slow:
+			print(f'Замедление больше {args.threshold:.0%}:')
+			for line in slow:
+				print(line)
+			return 1
+	return 0
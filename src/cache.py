@@ -0,0 +1,297 @@
+import os
+import copy
+import json
+import hashlib
+import tempfile
+from threading import Lock
+from collections import OrderedDict
+
+from src.engine import Params, Result
+from src.checkpoint import Checkpoint
+
+CACHE_DIR = 'cache'
+"""Подкаталог save_dir для файлов кэша."""
+
+CHECKPOINT_DIR = 'checkpoints'
+"""Подкаталог save_dir для контрольных точек после этапа установления."""
+
+INDEX_FILE = 'index.json'
+"""Файл в каталоге кэша с ключами EXTEND_FIELDS и n_draw сохранённых результатов."""
+
+KEY_FIELDS = ['is_f1', 'is_f2', 'formulas', 'r', 'b', 'x0', 'x_prev', 'n_iter', 'n_draw',
+	'tol', 'check_every', 'lyapunov', 'precision']
+"""Параметры вычисления, от которых зависит результат."""
+
+EXTEND_FIELDS = [key for key in KEY_FIELDS if key != 'n_draw']
+"""Параметры, совпадение которых позволяет продолжить рассчитанную траекторию."""
+
+CHECKPOINT_FIELDS = ['is_f1', 'is_f2', 'formulas', 'r', 'b', 'x0', 'x_prev', 'tol',
+	'check_every', 'precision']
+"""Параметры, от которых зависит состояние траекторий после этапа установления."""
+
+
+def save_file(fn: str, save):
+	"""
+	Сохраняет файл через временный файл с уникальным именем в том же каталоге,
+	чтобы не оставить неполный файл и не смешать запись одновременных заданий.
+
+	Args:
+		fn (str): Имя файла (расширение временного файла то же, от него
+			может зависеть формат записи)
+		save (method): Сохраняет данные в файл с заданным именем
+	"""
+	fd, tmp = tempfile.mkstemp(dir = os.path.dirname(fn), suffix = os.path.splitext(fn)[1])
+	os.close(fd)
+	try:
+		save(tmp)
+		os.replace(tmp, fn)
+	except BaseException:
+		os.remove(tmp)
+		raise
+
+
+def params_key(params: Params, fields: list = KEY_FIELDS) -> str:
+	"""
+	Формирует ключ кэша по параметрам вычисления.
+
+	Args:
+		params (Params): Параметры вычисления
+		fields (list): Учитываемые параметры
+
+	Returns:
+		str: Хэш значений параметров из fields
+	"""
+	values = {key: getattr(params, key) for key in fields}
+	# Без пользовательских формул и x[-1] ключ совпадает с ключами прежних версий
+	if not values.get('formulas', True):
+		del values['formulas']
+	if 'x_prev' in values and values['x_prev'] is None:
+		del values['x_prev']
+	text = json.dumps(values, sort_keys = True)
+	return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+	"""
+	Двухуровневый кэш результатов вычисления.
+
+	Последние результаты хранятся в памяти (LRU с ограничением по объёму),
+	а вытесненные из памяти сохраняются в сжатые файлы .npz в каталоге save_dir.
+
+	Attributes:
+		path (str): Каталог для файлов кэша
+		max_bytes (int): Наибольший объём результатов в памяти
+		items (OrderedDict): Результаты в памяти (от давно использованных к недавним)
+		size (int): Текущий объём результатов в памяти
+		bases (dict): Ключи EXTEND_FIELDS и n_draw результатов в памяти
+		disk (dict): Ключи EXTEND_FIELDS и n_draw результатов в файлах
+		lock (Lock): Блокировка для доступа из потока вычисления
+		checkpoints (CheckpointStore): Контрольные точки после этапа установления
+	"""
+
+	def __init__(self, save_dir: str, max_bytes: int):
+		"""
+		Создаёт кэш.
+
+		Args:
+			save_dir (str): Каталог для сохранения файлов
+			max_bytes (int): Наибольший объём результатов в памяти
+		"""
+		self.path = os.path.join(save_dir, CACHE_DIR)
+		self.max_bytes = max_bytes
+		self.items = OrderedDict()
+		self.size = 0
+		self.bases = {}
+		self.disk = self.load_index()
+		self.lock = Lock()
+		self.checkpoints = CheckpointStore(save_dir)
+
+	def file_name(self, key: str) -> str:
+		"""Возвращает имя файла кэша для ключа."""
+		return os.path.join(self.path, key + '.npz')
+
+	def load_index(self) -> dict:
+		"""Загружает указатель результатов в файлах (пустой, если его нет или он повреждён)."""
+		try:
+			with open(os.path.join(self.path, INDEX_FILE), encoding = 'utf-8') as f:
+				return {key: tuple(value) for key, value in json.load(f).items()}
+		except (OSError, ValueError, AttributeError, TypeError):
+			return {}
+
+	def save_index(self):
+		"""Сохраняет указатель результатов в файлах."""
+		def save(fn):
+			with open(fn, 'w', encoding = 'utf-8') as f:
+				json.dump(self.disk, f)
+		save_file(os.path.join(self.path, INDEX_FILE), save)
+
+	def get(self, params: Params) -> Result:
+		"""
+		Ищет результат вычисления с заданными параметрами.
+
+		Args:
+			params (Params): Параметры вычисления
+
+		Returns:
+			Result: Результаты вычисления (None - нет в кэше)
+		"""
+		key = params_key(params)
+		with self.lock:
+			if key in self.items:
+				self.items.move_to_end(key)
+				return self.items[key]
+		fn = self.file_name(key)
+		if not os.path.exists(fn):
+			return None
+		try:
+			res = Result.load(fn)
+		except (OSError, ValueError, KeyError):
+			return None # Повреждённый файл вычисляется заново
+		with self.lock:
+			self.insert(key, res, params)
+		return res
+
+	def find_shorter(self, params: Params) -> Result:
+		"""
+		Ищет в памяти и в файлах результат с теми же параметрами,
+		но меньшим n_draw (для продолжения траектории).
+
+		Args:
+			params (Params): Параметры вычисления
+
+		Returns:
+			Result: Результат с наибольшим n_draw (None - нет подходящего)
+		"""
+		base = params_key(params, EXTEND_FIELDS)
+		with self.lock:
+			found = [(n_draw, key) for key, (b, n_draw) in {**self.disk, **self.bases}.items()
+				if b == base and n_draw < params.n_draw]
+			# От наибольшего n_draw к меньшим (файлы могут быть удалены или повреждены)
+			for n_draw, key in sorted(found, reverse = True):
+				if key in self.items:
+					self.items.move_to_end(key)
+					return self.items[key]
+				try:
+					res = Result.load(self.file_name(key))
+				except (OSError, ValueError, KeyError):
+					continue
+				prev = copy.copy(params)
+				prev.n_draw = n_draw
+				self.insert(key, res, prev)
+				return res
+			return None
+
+	def put(self, params: Params, res: Result):
+		"""
+		Добавляет результат вычисления в кэш.
+
+		Args:
+			params (Params): Параметры вычисления
+			res (Result): Результаты вычисления
+		"""
+		with self.lock:
+			self.insert(params_key(params), res, params)
+
+	def insert(self, key: str, res: Result, params: Params):
+		"""Добавляет результат в память, вытесняя давно использованные на диск."""
+		if key in self.items:
+			self.size -= self.items.pop(key).nbytes()
+		self.items[key] = res
+		self.bases[key] = (params_key(params, EXTEND_FIELDS), params.n_draw)
+		self.size += res.nbytes()
+		while self.size > self.max_bytes and self.items:
+			old_key, old = self.items.popitem(last = False)
+			base = self.bases.pop(old_key)
+			self.size -= old.nbytes()
+			self.spill(old_key, old, base)
+
+	def spill(self, key: str, res: Result, base: tuple):
+		"""
+		Сохраняет результат в файл, если его там ещё нет, и добавляет его в указатель.
+
+		Args:
+			key (str): Ключ результата
+			res (Result): Результаты вычисления
+			base (tuple): Ключ EXTEND_FIELDS и n_draw результата
+		"""
+		fn = self.file_name(key)
+		if not os.path.exists(fn):
+			os.makedirs(self.path, exist_ok = True)
+			save_file(fn, res.save)
+		if self.disk.get(key) != base:
+			# Указатель мог быть дополнен другим экземпляром приложения
+			self.disk = {**self.load_index(), **self.disk, key: base}
+			self.save_index()
+
+	def flush(self):
+		"""Сохраняет все результаты из памяти в файлы (например, при закрытии приложения)."""
+		with self.lock:
+			for key, res in self.items.items():
+				self.spill(key, res, self.bases[key])
+
+
+class CheckpointStore:
+	"""
+	Хранит контрольные точки (состояние после этапа установления) в файлах .npz.
+
+	Для каждого сочетания функций, сетки и x0 хранится контрольная точка
+	с наибольшим количеством итераций установления.
+
+	Attributes:
+		path (str): Каталог для файлов контрольных точек
+		lock (Lock): Блокировка для одновременных заданий
+	"""
+
+	def __init__(self, save_dir: str):
+		"""
+		Создаёт хранилище контрольных точек.
+
+		Args:
+			save_dir (str): Каталог для сохранения файлов
+		"""
+		self.path = os.path.join(save_dir, CHECKPOINT_DIR)
+		self.lock = Lock()
+
+	def file_name(self, params: Params) -> str:
+		"""Возвращает имя файла контрольной точки для параметров вычисления."""
+		return os.path.join(self.path, params_key(params, CHECKPOINT_FIELDS) + '.npz')
+
+	def get(self, params: Params) -> Checkpoint:
+		"""
+		Ищет контрольную точку, с которой можно продолжить вычисление.
+
+		Args:
+			params (Params): Параметры вычисления
+
+		Returns:
+			Checkpoint: Контрольная точка не более чем после n_iter итераций
+				(None - нет подходящей)
+		"""
+		fn = self.file_name(params)
+		if not os.path.exists(fn):
+			return None
+		try:
+			cp = Checkpoint.load(fn)
+		except (OSError, ValueError, KeyError):
+			return None
+		return cp if cp.n_iter <= params.n_iter else None
+
+	def put(self, params: Params, cp: Checkpoint):
+		"""
+		Сохраняет контрольную точку, если сохранённая ранее
+		получена после меньшего количества итераций.
+
+		Args:
+			params (Params): Параметры вычисления
+			cp (Checkpoint): Контрольная точка
+		"""
+		os.makedirs(self.path, exist_ok = True)
+		fn = self.file_name(params)
+		with self.lock:
+			if os.path.exists(fn):
+				try:
+					if Checkpoint.read_n_iter(fn) >= cp.n_iter:
+						return
+				except (OSError, ValueError, KeyError):
+					pass # Повреждённый файл перезаписывается
+			save_file(fn, cp.save)
@@ -1,10 +1,14 @@
 import os
+import time
 import numpy as np
-import tkinter as tk
 from threading import Thread
-from tkinter.messagebox import askyesno
 
-from src.controls import Data
+from src.engine import PHASE_ITER, PHASE_DRAW, Params, Result
+from src.parallel import create_engine
+from src.cache import ResultCache, params_key, save_file
+from src.coords import GridCoords
+from src.events import PROGRESS_INTERVAL, EventChannel
+from src.profiler import Profiler
 
 # Перечисление доступных графиков
 RX_XX_NX = 0 # Все графики
@@ -13,318 +17,430 @@ RX = 2		# Бифуркационная диаграмма (x[n] от r)
 XX = 3		# Фазовый портрет (x[n+1] от x[n])
 NX = 4		# График зависимостей (x[n], x[n+1] от n)
 
+# Подписи этапов вычисления
+PHASE_STATUS = {
+	PHASE_ITER: 'Достижение устойчивых значений (1/3)',
+	PHASE_DRAW: 'Расчёт значений для отрисовки (2/3)'
+}
 
-class CalcData:
+LOG_DIR = 'logs'
+"""Подкаталог save_dir для логов ухода траекторий в бесконечность."""
+
+STREAM_ROWS = 64
+"""
+Сколько итераций отрисовки рассчитать до запуска анимации при отрисовке
+по мере расчёта (по ним оцениваются начальные границы графиков,
+которые затем расширяются по отрисовываемым точкам, см. Calculator.extend_lim).
+"""
+
+
+class Calculator:
 	"""
-	Хранит вспомогательные данные для расчётов.
+	Связывает вычисление (Engine) с компонентами UI и графиками.
 
 	Attributes:
-		error (str): Хранит значения, при которых произошла ошибка (лог)
-		i (int): Значение текущей операции
+		pb (dict): Компоненты для отображения информации о прогрессе вычисления
+		is_calc (Flag): Флаг для преждевременного прекращения работы
+		events (EventChannel): Канал событий для основного потока
+		profiler (Profiler): Учёт времени вычисления и отрисовки (None - без учёта)
+		progress_func (method): Функция прогресса в потоке вычисления (если pb не задан)
+		next_func (method): Функция, запускаемая после завершения вычисления
+		names (list): Имена рассчитываемых функций (f1, f2 и пользовательские формулы)
+		n_iter (int): Количество итераций для вычисления.
+		n_draw (int): Количество итераций для отрисовки.
+		max_period (int): Наибольший период для карты периодов
+		is_lyap (bool): Рассчитывается ли старший показатель Ляпунова?
+		error_func (method): Функция оповещения об уходе траекторий в бесконечность
+		stream (bool): Запускать ли анимацию до завершения вычисления?
+		streamed (bool): Была ли анимация запущена до завершения вычисления?
+		producing (bool): Выполняется ли вычисление?
+		params (Params): Параметры вычисления
+		cache (ResultCache): Кэш результатов вычисления
+		engine (Engine): Объект, выполняющий вычисление
+		result (Result): Результаты вычисления
+		phase (int): Номер текущего этапа вычисления
+		started (tuple): Время и номер итерации начала текущего этапа
+		shown (float): Время последнего события прогресса
+		coords (GridCoords): Координаты n, r, b элементов траектории
+		n, rn (GridAxis): Координаты n и r элементов траектории
 	"""
 
-	def __init__(self, save_dir: str):
-		"""Инициализирует хранилище функций для расчётов.
-		
-		Args:
+	def __init__(self, params: Params, save_dir: str, next_func = None,
+			pb: dict = None, is_calc = None, charts_num: int = RX_XX_NX,
+			error_func = None, cache: ResultCache = None, stream: bool = False,
+			events: EventChannel = None, profiler: Profiler = None,
+			progress_func = None):
+		"""
+		Связывает вычисление (Engine) с компонентами UI и графиками.
+
+		Если pb и is_calc не заданы, то вычисление выполняется
+		в текущем потоке без обновления прогресса. Иначе вычисление выполняется
+		в отдельном потоке, а прогресс, next_func и error_func передаются
+		в основной поток через канал событий.
+
+		Attributes:
+			params (Params): Параметры для вычисления
 			save_dir (str): Каталог для сохранения файлов
+			next_func (method): Функция, запускаемая после завершения вычисления
+			pb (dict): Компоненты для отображения информации о прогрессе вычисления
+			is_calc (Flag): Флаг для преждевременного прекращения работы
+			charts_num (int): Номер комбинации графиков для отображения
+			error_func (method): Функция оповещения об уходе траекторий
+				в бесконечность (вызывается с результатами и именем файла лога)
+			cache (ResultCache): Кэш результатов вычисления (None - без кэша)
+			stream (bool): Запускать ли next_func, как только рассчитаны первые
+				STREAM_ROWS итераций отрисовки (вычисление продолжается в том же потоке;
+				не используется для показателя Ляпунова, который нужен сразу по всей траектории)
+			events (EventChannel): Канал событий для основного потока
+				(None - обработчики вызываются в потоке вычисления)
+			profiler (Profiler): Учёт времени вычисления и отрисовки (None - без учёта)
+			progress_func (method): Функция прогресса (этап, итерация, количество итераций),
+				вызываемая в потоке вычисления, если pb не задан (например, для фоновых вычислений)
 		"""
+		# Какие функции рассчитывать
+		self.names = params.names()
+		# Количество итераций
+		self.n_iter = params.n_iter
+		self.n_draw = params.n_draw
+		self.max_period = params.max_period
+		self.is_lyap = params.lyapunov
+		# Сохранение функции, которая должна запустится следующей
+		self.next_func = next_func
+		self.is_calc = is_calc
+		self.pb = pb
+		self.events = events
+		self.profiler = profiler
+		self.progress_func = progress_func
 		self.save_dir = save_dir
-		self.error = ''
-		self.i = 0
+		self.charts_num = charts_num
+		self.error_func = error_func
+		self.stream = stream and not params.lyapunov
+		self.streamed = False
+		self.producing = False
+		self.phase = 0
+		self.started = (0, 0)
+		self.shown = 0
+		self.params = params
+		self.cache = cache
+		self.engine = create_engine(params)
+		self.engine.profiler = profiler
+		self.Nbr = self.engine.Nbr
+		self.r = self.engine.r
+		self.b = self.engine.b
+		# Создание объекта для вычислений
+		if self.pb is None:
+			self.run()
+		elif self.is_calc.get():
+			thread = Thread(target = self.run)
+			thread.start()
+
+	def is_cancelled(self) -> bool:
+		"""Было ли запрошено принудительное прекращение вычислений?"""
+		return self.is_calc is not None and not self.is_calc.get()
 
-	def run(self, f, name: str, x0: np.array, x1: np.array,
-	    r: np.array, b: np.array) -> np.array:
+	def notify(self, func, *args):
 		"""
-		Запускает расчёт функции с проверкой на уход результатов в бесконечность.
+		Вызывает обработчик в основном потоке (через канал событий, если он задан).
 
 		Args:
-			f (method): Функция расчёта
-			name (str): Имя функции
-			x0 (np.array): Предыдущее значения x[n-1]
-			x1 (np.array): Текущее значения x[n]
-			r, b (np.array): Коэффициенты функции
-		
-		Returns:
-			np.array: Новые значения x[n+1]
+			func (method): Обработчик (None - ничего не выполняется)
+			args: Аргументы обработчика
 		"""
-		res = f(x0, x1, r, b)
-		if np.isinf(res).any():
-			j = abs(res) == np.inf
-			for x0j, x1j, rj, bj in zip(x0, x1, r, b):
-				self.error += '%s: i = %d\tx0 = %.4e\t\tx1 = %.4e\tr = %.4f\t\tb = %.4f\n' % (name, self.i, x0j, x1j, rj, bj)
-			res[j] = 0
-		return res
+		if func is None:
+			return
+		if self.events is None:
+			func(*args)
+		else:
+			self.events.post(func, *args)
 
-	def f1(self, x0: np.array, x1: np.array,
-			r: np.array, b: np.array) -> np.array:
+	def on_progress(self, phase: int, i: int, total: int):
 		"""
-		Формула из методического указания:  
-		x[n+1] = rx[n](1 - x[n]) - bx[n-1]
+		Передаёт прогресс вычисления в основной поток (в потоке вычисления).
+
+		События передаются не чаще, чем раз в PROGRESS_INTERVAL секунд
+		(кроме смены этапа и его последнего шага) вместе со скоростью
+		вычисления и оставшимся временем этапа.
 
 		Args:
-			f (method): Функция расчёта
-			name (str): Имя функции
-			x0 (np.array): Предыдущее значения x[n-1]
-			x1 (np.array): Текущее значения x[n]
-			r, b (np.array): Коэффициенты функции
-		
-		Returns:
-			np.array: Новые значения x[n+1]
+			phase (int): Номер этапа вычисления
+			i (int): Номер итерации
+			total (int): Количество итераций этапа
 		"""
-		lf1 = lambda x0, x1, r, b: r*x1*(1 - x1) - b * x0
-		return self.run(lf1, 'f1', x0, x1, r, b)
+		now = time.perf_counter()
+		if phase != self.phase:
+			self.phase = phase
+			self.started = (now, i)
+			if phase == PHASE_DRAW:
+				self.pb['is_draw'] = True
+		elif now - self.shown < PROGRESS_INTERVAL and i < total - 1:
+			return
+		self.shown = now
+		# Скорость в итерациях в секунду (прогресс может считаться
+		# в частях сетки, поэтому пересчитывается через долю этапа)
+		t0, i0 = self.started
+		length = self.n_iter + 1 if phase == PHASE_ITER else self.n_draw
+		speed = (i - i0) / total * length / (now - t0) if now > t0 else 0
+		eta = (total - 1 - i) / total * length / speed if speed > 0 else None
+		self.notify(self.show_progress, phase, i, total, speed, eta, self.streamed)
 
-	def f2(self, x0: np.array, x1: np.array,
-			r: np.array, b: np.array) -> np.array:
+	def show_progress(self, phase: int, i: int, total: int, speed: float,
+			eta: float, streamed: bool):
 		"""
-		Формула из стороннего источника:  
-		x[n+1] = 1 - rx[n]^2 + y[n]  
-		y[n+1] = bx[n]
-		
+		Отображает прогресс вычисления (в основном потоке).
+
 		Args:
-			f (method): Функция расчёта
-			name (str): Имя функции
-			x0 (np.array): Предыдущее значения x[n-1]
-			x1 (np.array): Текущее значения x[n]
-			r, b (np.array): Коэффициенты функции
-		
-		Returns:
-			np.array: Новые значения x[n+1]
+			phase (int): Номер этапа вычисления
+			i (int): Номер итерации
+			total (int): Количество итераций этапа
+			speed (float): Скорость вычисления, итераций в секунду
+			eta (float): Оставшееся время этапа, с (None - неизвестно)
+			streamed (bool): Запущена ли уже анимация?
 		"""
-		lf2 = lambda x0, x1, r, b: 1 - r * x1**2 + b * x0
-		return self.run(lf2, 'f2', x0, x1, r, b)
-	
-	def show_error(self):
-		"""Оповещает об обнаруженных ошибках вычисления."""
-		if self.error != '':
-			result = askyesno('Подтверждение операции', 'В ходе вычислений были получены исключения.\nОткрыть блокнот c данными параметрами?')
-			if result:
-				fn = os.path.join(self.save_dir, 'error.txt')
-				with open(fn, 'w', encoding='utf-8') as f:
-					f.write(self.error)
-				# Открытие в блокноте
-				os.system(f'notepad.exe {fn}')
-	
-	def inc(self):
-		"""Увеличение индекса текущего вычисления."""
-		self.i += 1
+		rate = ''
+		if speed > 0:
+			rate = f'\n{speed:.0f} ит./с'
+			if eta is not None:
+				rate += f', осталось {eta:.0f} с'
+		# Прогресс-бар уже показывает ход анимации
+		if streamed:
+			self.pb['status'].set(f'Анимирование графика (3/3)\nрассчитано {i + 1} из {total}{rate}')
+			return
+		self.pb['status'].set(PHASE_STATUS[phase] + rate)
+		if self.pb['max'].get() != total:
+			self.pb['max'].set(total)
+		self.pb['value'].set(i)
 
+	def on_draw(self, res: Result):
+		"""
+		Запускает отрисовку, как только рассчитаны первые STREAM_ROWS итераций
+		(анимация берёт точки по мере расчёта, см. ready).
 
-class Calculator:
-	"""
-	Управляет процессом вычисления значений.
+		Args:
+			res (Result): Рассчитываемые результаты
+		"""
+		if self.streamed or res.n_done < min(res.n_draw, STREAM_ROWS):
+			return
+		self.streamed = True
+		self.result = res
+		self.set_result(res)
+		self.notify(self.next_func, self)
 
-	Attributes:
-		data (Data): Параметры для вычисления
-		pb (dict): Компоненты для отображения информации о прогрессе вычисления
-		is_calc (tk.BooleanVar): Флаг для преждевременного прекращения работы
-		next_func (method): Функция, запускаемая после завершения вычисления
-		is_f1 (bool): Рассчитывать ли функцию №1?
-		is_f2 (bool): Рассчитывать ли функцию №2?
-		n_iter (int): Количество итераций для вычисления.
-		n_draw (int): Количество итераций для отрисовки.
-	"""
+	def compute(self, progress) -> Result:
+		"""
+		Выполняет вычисление, по возможности продолжая ранее рассчитанное:
+		траекторию с меньшим n_draw из кэша или состояние после этапа
+		установления из контрольной точки.
+
+		Args:
+			progress (method): Функция отображения прогресса
+
+		Returns:
+			Result: Результаты вычисления
+		"""
+		if self.cache is None:
+			return self.engine.run(progress, self.is_cancelled)
+		prev = self.cache.find_shorter(self.params)
+		if prev is not None:
+			return self.engine.extend(prev, progress, self.is_cancelled)
+		cp = self.cache.checkpoints.get(self.params)
+		self.engine.checkpoint = cp
+		res = self.engine.run(progress, self.is_cancelled)
+		# Сохранение контрольной точки, если этап установления был рассчитан
+		if not res.is_cancelled and not self.is_cancelled() and (cp is None or cp.n_iter < self.params.n_iter):
+			self.cache.checkpoints.put(self.params, res.checkpoint())
+		return res
+
+	def run(self):
+		"""Запускает процесс вычисления."""
+		progress = self.progress_func if self.pb is None else self.on_progress
+		# Результат с теми же параметрами сразу передаётся на отрисовку
+		self.result = self.cache.get(self.params) if self.cache is not None else None
+		if self.result is None:
+			if self.stream:
+				self.engine.on_draw = self.on_draw
+			self.producing = True
+			t = time.perf_counter()
+			try:
+				self.result = self.compute(progress)
+			finally:
+				self.producing = False
+			if self.profiler is not None:
+				self.profiler.add('compute', time.perf_counter() - t, self.result.n_done)
+				self.profiler.set('trajectory_bytes', self.result.nbytes())
+			if self.result.is_cancelled: # Прекращено до расчёта точек
+				return
+			# В кэш попадают только полностью рассчитанные результаты в памяти
+			if self.cache is not None and not self.is_cancelled() and self.params.storage_dir is None:
+				self.cache.put(self.params, self.result)
+		elif self.pb is not None:
+			self.pb['is_draw'] = True
+		if self.streamed and self.pb is not None:
+			self.notify(self.pb['status'].set, 'Анимирование графика (3/3)')
+		self.report(self.result)
+		if not self.streamed:
+			self.set_result(self.result)
+		# Запуск следующей функции
+		if self.is_calc is not None:
+			self.is_calc.set(False)
+		if not self.streamed:
+			self.notify(self.next_func, self)
 
-	def __init__(self, data: Data, pb: dict, is_calc: tk.BooleanVar,
-			save_dir: str, next_func):
+	def report(self, res: Result):
 		"""
-		Управляет процессом вычисления значений.
+		Сохраняет лог ухода траекторий в бесконечность в подкаталог LOG_DIR
+		(имя файла - ключ параметров вычисления) и оповещает о нём.
 
-		Attributes:
-			data (Data): Параметры для вычисления
-			pb (dict): Компоненты для отображения информации о прогрессе вычисления
-			is_calc (tk.BooleanVar): Флаг для преждевременного прекращения работы
-			save_dir (str): Каталог для сохранения файлов
-			next_func (method): Функция, запускаемая после завершения вычисления
+		Args:
+			res (Result): Результаты вычисления
 		"""
-		# Флаги, какие функции рассчитывать
-		self.is_f1 = data.is_f1.get()
-		self.is_f2 = data.is_f2.get()
-		# Количество итераций
-		self.n_iter = data.f.n_iter.get()
-		self.n_draw = data.f.n_draw.get()
-		# Сохранение функции, которая должна запустится следующей
-		self.next_func = next_func
-		self.is_calc = is_calc
-		self.pb = pb
-		# Подготовка параметров для функций
-		r = data.f.r
-		b = data.f.b
-		arr_n = np.arange(self.n_iter + 1, self.n_iter + self.n_draw + 1, 1)
-		arr_r = np.arange(r.begin.get(), r.end.get()+0.000001, r.step.get())
-		arr_b = np.arange(b.begin.get(), b.end.get()+0.000001, b.step.get())
-		if arr_r.size == 0:
-			arr_r = np.array([r.begin.get()])
-		if arr_b.size == 0:
-			arr_b = np.array([b.begin.get()])
-		self.Nbr = arr_r.size * arr_b.size
-		self.Nbrn = (arr_n.size + 2) * self.Nbr # +1 для x[i+2], i = n - 1
-		# Дублирование
-		# n1 n1 n1 n1 n1 n1
-		# r1 r1 r1 r2 r2 r2
-		# b1 b2 b3 b1 b2 b3
-		self.n = np.repeat(arr_n, self.Nbr)
-		self.r = np.repeat(arr_r, arr_b.size)
-		self.b = np.array([])
-		for _ in range(arr_r.size):
-			self.b = np.hstack([self.b, arr_b])
-		# Если строится бифуркационная диаграмма
-		if data.charts_num.get() == RX_XX_NX or data.charts_num.get() == RX:
-			self.rn = np.array([])
-			for _ in range(arr_n.size):
-				self.rn = np.hstack([self.rn, self.r])
-		# Резервирование места для x[n] и x[n-1]
-		if self.is_f1:
-			self.x_f1 = np.zeros(self.Nbrn)
-			self.x0_f1 = np.zeros(self.Nbr) + data.f.x0.get() # Инициализация X[0]
-			self.x1_f1 = self.x0_f1.copy()
-		if self.is_f2:
-			self.x_f2 = np.zeros(self.Nbrn)
-			self.x0_f2 = np.zeros(self.Nbr) + data.f.x0.get() # Инициализация X[0]
-			self.x1_f2 = self.x0_f2.copy()
-		calc = CalcData(save_dir)
-		# Создание объекта для вычислений
-		if self.is_calc.get():
-			thread = Thread(target = self.run, args=(calc, ))
-			thread.start()
+		if len(res.log) > 0:
+			# У каждого набора параметров свой лог: одновременные
+			# задания не перезаписывают логи друг друга
+			path = os.path.join(self.save_dir, LOG_DIR)
+			os.makedirs(path, exist_ok = True)
+			fn = os.path.join(path, params_key(self.params) + '.csv')
+			save_file(fn, res.save_log)
+			self.notify(self.error_func, res, fn)
+
+	def ready(self) -> int:
+		"""Количество итераций, точки которых уже можно отрисовать."""
+		return min(self.result.n_done + 1, self.n_draw)
 
-	def run(self, calc: CalcData):
+	def set_result(self, res: Result):
 		"""
-		Запускает процесс вычисления.
+		Подготавливает результаты вычисления для отрисовки графиков.
 
-		Attributes:
-			calc (CalcData): Параметры и данные для вычисления
+		Args:
+			res (Result): Результаты вычисления (могут быть ещё не рассчитаны полностью)
 		"""
-		# Получение устойчивых предельных значений
-		if self.is_f1 or self.is_f2:
-			self.pb['status'].set('Достижение устойчивых значений (1/3)')
-			self.pb['value'].set(0)
-			self.pb['max'].set(self.n_iter + 1)
-			# Итерации без вывода
-			for i in range(self.pb['max'].get()):
-				if self.is_calc.get() == False: # Для принудительного прекращения вычислений
-					return
-				if self.is_f1:
-					temp = self.x1_f1
-					self.x1_f1 = calc.f1(self.x0_f1, self.x1_f1, self.r, self.b)
-					self.x0_f1 = temp
-				if self.is_f2:
-					temp = self.x1_f2
-					self.x1_f2 = calc.f2(self.x0_f2, self.x1_f2, self.r, self.b)
-					self.x0_f2 = temp
-				calc.inc() # Актуальный номер для отчёта об ошибке
-				self.pb['value'].set(i)
-			# Инициализация индексов (N0 x[n-1] N1 x[n] N2 x[n+1] N3)
-			self.init_N()
-			# Установка начальных значений
-			if self.is_f1:
-				self.x_f1[self.N0:self.N1] = self.x0_f1 # x[n-1]
-				self.x_f1[self.N1:self.N2] = self.x1_f1 # x[n]
-			if self.is_f2:
-				self.x_f2[self.N0:self.N1] = self.x0_f2 # x[n-1]
-				self.x_f2[self.N1:self.N2] = self.x1_f2 # x[n]
-			# Расчёт значений для вывода на график
-			self.pb['status'].set('Расчёт значений для отрисовки (2/3)')
-			self.pb['value'].set(0)
-			self.pb['max'].set(self.n_draw)
-			self.pb['is_draw'] = True
-			for i in range(self.n_draw):
-				if self.is_calc.get() == False: # Для принудительного прекращения вычислений
-					break
-				if self.is_f1:
-					x0 = self.x_f1[self.N0:self.N1]
-					x1 = self.x_f1[self.N1:self.N2]
-					self.x_f1[self.N2:self.N3] = calc.f1(x0, x1, self.r, self.b)
-				if self.is_f2:
-					x0 = self.x_f2[self.N0:self.N1]
-					x1 = self.x_f2[self.N1:self.N2]
-					self.x_f2[self.N2:self.N3] = calc.f2(x0, x1, self.r, self.b)
-				calc.inc() # Актуальный номер для отчёта об ошибке
-				self.pb['value'].set(i)
-				self.next_N() # Сдвиг индексов
-			# Сброс индексов для последовательного отображения
-			self.init_N()
-		calc.show_error()
-		# Определение границ графика
-		self.x_lim = np.array([])
-		# Определение границ графика
-		if self.is_f1 and self.is_f2:
-			self.x_lim = [np.amin([self.x_f1, self.x_f2]), np.amax([self.x_f1, self.x_f2])]
-		elif self.is_f1:
-			self.x_lim = [np.amin(self.x_f1), np.amax(self.x_f1)]
-		elif self.is_f2:
-			self.x_lim = [np.amin(self.x_f2), np.amax(self.x_f2)]
+		self.x = {name: res.x[name] for name in res.names}
+		# Показатели Ляпунова для каждой точки сетки
+		if self.is_lyap:
+			self.lyap = {name: res.lyapunov(name) for name in res.names}
+		# Координаты элементов траектории рассчитываются по запросу
+		# n1 n1 n1 n1 n1 n1
+		# r1 r1 r1 r2 r2 r2
+		self.coords = GridCoords(res.arr_n, self.r, self.b, res.dtype)
+		self.n = self.coords.n
+		self.rn = self.coords.r
+		# Сброс индексов для последовательного отображения
+		self.init_N()
+		# Определение границ графика по рассчитанным строкам
+		# (по каждой функции отдельно, без объединения массивов;
+		# значения приводятся к float, чтобы сравнение не зависело от точности)
+		t = time.perf_counter()
+		x_all = [res.rows(name)[:res.n_done + 2] for name in res.names]
+		if x_all:
+			self.x_lim = [float(min(np.nanmin(x) for x in x_all)),
+				float(max(np.nanmax(x) for x in x_all))]
 		else:
 			self.x_lim = [1, 1]
+		# Если все траектории ушли в бесконечность
+		if np.isnan(self.x_lim).any():
+			self.x_lim = [0, 0]
 		# Попытка исправить проблему с axis
 		if self.x_lim[0] < -1.5E300:
 			self.x_lim[0] = -1.5E300
 		if self.x_lim[1] > 1.5E300:
 			self.x_lim[1] = 1.5E300
-		self.n_lim = [self.n[0], self.n[self.n.size - 1]]
+		if self.profiler is not None:
+			self.profiler.add('x_lim', time.perf_counter() - t, sum(x.size for x in x_all))
+		self.n_lim = [res.arr_n[0], res.arr_n[max(res.n_draw - 1, 0)]]
 		self.r_lim = [self.r[0], self.r[self.r.size - 1]]
-		# Запуск следующей функции
-		self.is_calc.set(False)
-		self.next_func(self)
+
+	def extend_lim(self, start: int, stop: int) -> bool:
+		"""
+		Расширяет границы графиков по строкам траектории кадра, если анимация
+		запущена до завершения вычисления (границы определены по первым итерациям).
+
+		Args:
+			start, stop (int): Диапазон строк траектории кадра
+
+		Returns:
+			bool: Изменились ли границы?
+		"""
+		if not self.streamed or stop <= start:
+			return False
+		t = time.perf_counter()
+		x_new = [self.result.rows(name)[start:stop] for name in self.names]
+		# fmin и fmax пропускают NaN (ушедшие траектории)
+		low = np.fmin.reduce([np.fmin.reduce(x, axis = None) for x in x_new])
+		high = np.fmax.reduce([np.fmax.reduce(x, axis = None) for x in x_new])
+		low = max(float(np.fmin(self.x_lim[0], low)), -1.5E300)
+		high = min(float(np.fmax(self.x_lim[1], high)), 1.5E300)
+		if self.profiler is not None:
+			self.profiler.add('x_lim', time.perf_counter() - t, sum(x.size for x in x_new))
+		if low >= self.x_lim[0] and high <= self.x_lim[1]:
+			return False
+		self.x_lim = [low, high]
+		return True
 
 	def init_N(self):
 		"""
 		Инициализация индексов по диапазонам
 		N0 x[n-1] N1 x[n] N2 x[n+1] N3
 		"""
-		self.N0 = 0
-		self.N1 = self.Nbr
+		self.set_frame(0)
+
+	def set_frame(self, start: int, count: int = 1):
+		"""
+		Установка индексов на кадр из нескольких итераций
+		(Nnew - начало точек кадра, N0 - начало точек последней итерации кадра).
+
+		Args:
+			start (int): Номер первой итерации кадра
+			count (int): Количество итераций в кадре
+		"""
+		self.Nnew = start * self.Nbr
+		self.N1 = (start + count) * self.Nbr
+		self.N0 = self.N1 - self.Nbr
 		self.N2 = self.N1 + self.Nbr
 		self.N3 = self.N2 + self.Nbr
 
 	def next_N(self):
 		""" Увеличение индексов на заданный шаг."""
-		self.N0 += self.Nbr
-		self.N1 += self.Nbr
-		self.N2 += self.Nbr
-		self.N3 += self.Nbr
+		self.set_frame(self.N1 // self.Nbr)
 
 	def get_n(self):
 		"""Получение фрагмента данных n."""
 		return self.n[:self.N1]
 
-	def get_xn_f1(self):
-		"""Получение фрагмента данных x[n] для функции №1."""
-		return self.x_f1[:self.N1]
+	def get_xn(self, name: str):
+		"""Получение фрагмента данных x[n] для функции name."""
+		return self.x[name][:self.N1]
 
-	def get_xn1_f1(self):
-		"""Получение фрагмента данных x[n+1] для функции №1."""
-		return self.x_f1[self.Nbr:self.N2]
-
-	def get_xn_f2(self):
-		"""Получение фрагмента данных x[n] для функции №2."""
-		return self.x_f2[:self.N1]
-
-	def get_xn1_f2(self):
-		"""Получение фрагмента данных x[n+1] для функции №2."""
-		return self.x_f2[self.Nbr:self.N2]
+	def get_xn1(self, name: str):
+		"""Получение фрагмента данных x[n+1] для функции name."""
+		return self.x[name][self.Nbr:self.N2]
 
 	def get_r(self):
 		"""Получение фрагмента данных r."""
 		return self.rn[:self.N1]
 
-	def last_xn_f1(self):
-		"""Получение последних данных x[n] для функции №1."""
-		return self.x_f1[self.N0:self.N1]
-
-	def last_xn1_f1(self):
-		"""Получение последних данных x[n+1] для функции №1."""
-		return self.x_f1[self.N1:self.N2]
+	def last_xn(self, name: str):
+		"""Получение последних данных x[n] для функции name."""
+		return self.x[name][self.N0:self.N1]
 
-	def last_xn_f2(self):
-		"""Получение последних данных x[n] для функции №2."""
-		return self.x_f2[self.N0:self.N1]
-
-	def last_xn1_f2(self):
-		"""Получение фрагмента данных x[n+1] для функции №2."""
-		return self.x_f2[self.N1:self.N2]
+	def last_xn1(self, name: str):
+		"""Получение последних данных x[n+1] для функции name."""
+		return self.x[name][self.N1:self.N2]
 
 	def last_r(self):
 		"""Получение последних данных r."""
-		return self.rn[self.N0:self.N1]
\ No newline at end of file
+		return self.rn[self.N0:self.N1]
+
+	def new_n(self, overlap: int = 0):
+		"""Получение данных n текущего кадра (и overlap последних точек предыдущего)."""
+		return self.n[max(self.Nnew - overlap, 0):self.N1]
+
+	def new_xn(self, name: str, overlap: int = 0):
+		"""Получение данных x[n] текущего кадра для функции name (и overlap последних точек предыдущего)."""
+		return self.x[name][max(self.Nnew - overlap, 0):self.N1]
+
+	def new_xn1(self, name: str, overlap: int = 0):
+		"""Получение данных x[n+1] текущего кадра для функции name (и overlap последних точек предыдущего)."""
+		return self.x[name][max(self.Nnew - overlap, 0) + self.Nbr:self.N2]
+
+	def new_r(self):
+		"""Получение данных r текущего кадра."""
+		return self.rn[self.Nnew:self.N1]
@@ -0,0 +1,95 @@
+import numpy as np
+
+from src.divergence import DivergenceLog
+
+
+class Checkpoint:
+	"""
+	Хранит состояние траекторий после этапа установления устойчивого режима.
+
+	Attributes:
+		n_iter (int): Количество выполненных итераций установления
+		x0, x1 (dict): Значения x[n-1] и x[n] для каждой функции
+			(NaN - траектория ушла в бесконечность)
+		log (DivergenceLog): События ухода в бесконечность на этапе установления
+	"""
+
+	def __init__(self, n_iter: int, x0: dict, x1: dict, log: DivergenceLog):
+		"""
+		Хранит состояние траекторий после этапа установления устойчивого режима.
+
+		Args:
+			n_iter (int): Количество выполненных итераций установления
+			x0, x1 (dict): Значения x[n-1] и x[n] для каждой функции
+			log (DivergenceLog): События ухода в бесконечность на этапе установления
+		"""
+		self.n_iter = n_iter
+		self.x0 = x0
+		self.x1 = x1
+		self.log = log
+
+	def slice(self, start: int, stop: int) -> 'Checkpoint':
+		"""
+		Возвращает состояние части сетки (для расчёта в отдельном процессе).
+
+		Args:
+			start, stop (int): Диапазон точек сетки
+
+		Returns:
+			Checkpoint: Состояние точек сетки с номерами от start до stop
+		"""
+		log = DivergenceLog()
+		events = self.log.events()
+		events = events[(events['idx'] >= start) & (events['idx'] < stop)]
+		if events.size > 0:
+			events['idx'] -= start
+			log.chunks.append(events)
+		return Checkpoint(self.n_iter,
+			{name: x[start:stop] for name, x in self.x0.items()},
+			{name: x[start:stop] for name, x in self.x1.items()}, log)
+
+	def save(self, fn: str):
+		"""
+		Сохраняет состояние в сжатый файл .npz.
+
+		Args:
+			fn (str): Имя файла
+		"""
+		arrays = {'n_iter': np.array(self.n_iter), 'log': self.log.events()}
+		for name in self.x0:
+			arrays['x0_' + name] = self.x0[name]
+			arrays['x1_' + name] = self.x1[name]
+		np.savez_compressed(fn, **arrays)
+
+	@staticmethod
+	def read_n_iter(fn: str) -> int:
+		"""
+		Читает из файла только количество итераций (без загрузки состояния).
+
+		Args:
+			fn (str): Имя файла
+
+		Returns:
+			int: Количество выполненных итераций установления
+		"""
+		with np.load(fn) as f:
+			return int(f['n_iter'])
+
+	@staticmethod
+	def load(fn: str) -> 'Checkpoint':
+		"""
+		Загружает состояние, сохранённое методом save.
+
+		Args:
+			fn (str): Имя файла
+
+		Returns:
+			Checkpoint: Состояние траекторий
+		"""
+		with np.load(fn) as f:
+			names = [key[3:] for key in f.files if key.startswith('x0_')]
+			log = DivergenceLog()
+			if f['log'].size > 0:
+				log.chunks.append(f['log'])
+			return Checkpoint(int(f['n_iter']), {name: f['x0_' + name] for name in names},
+				{name: f['x1_' + name] for name in names}, log)
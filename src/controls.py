@@ -1,6 +1,77 @@
+import os
 import tkinter as tk
 from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
 
+from src.engine import Params
+from src.storage import STORAGE_DIR
+
+
+OPTION_KEYS = ['tol', 'check_every', 'max_period', 'lyapunov', 'memmap', 'precision']
+"""Дополнительные параметры шаблона, передаваемые в расчёт без отображения в UI."""
+
+
+def get_options(settings: dict) -> dict:
+	"""Извлекает дополнительные параметры из словаря настроек шаблона."""
+	return {key: settings[key] for key in OPTION_KEYS if key in settings}
+
+
+def get_params(settings: dict, workers: int = 1, save_dir: str = None,
+		formulas: list = None) -> Params:
+	"""
+	Возвращает параметры расчёта по словарю настроек шаблона.
+
+	Args:
+		settings (dict): Словарь настроек (как в разделе defaults)
+		workers (int): Количество процессов для вычисления (0 - по числу ядер)
+		save_dir (str): Каталог для хранения траекторий в файлах,
+			если в шаблоне указан параметр memmap
+		formulas (list): Описания пользовательских формул (раздел formulas)
+
+	Returns:
+		Params: Параметры вычисления
+	"""
+	settings = dict(settings, workers = workers)
+	if settings.get('memmap') and save_dir is not None:
+		settings['storage_dir'] = os.path.join(save_dir, STORAGE_DIR)
+	return Params.from_settings(settings, formulas)
+
+
+def as_range(value) -> list:
+	"""Возвращает диапазон [начало, конец, шаг] для числа или диапазона (для UI)."""
+	if isinstance(value, (list, tuple)):
+		return list(value)
+	return [value, value, 0.1]
+
+
+def get_settings(params: Params) -> dict:
+	"""
+	Возвращает словарь настроек шаблона по параметрам расчёта
+	(обратное к get_params, для отображения параметров в UI).
+
+	Args:
+		params (Params): Параметры вычисления
+
+	Returns:
+		dict: Словарь настроек (как в разделе defaults)
+	"""
+	return {
+		'f1': params.is_f1,
+		'f2': params.is_f2,
+		'formulas': list(params.formulas),
+		'r': list(params.r),
+		'b': list(params.b),
+		'x0': params.x0,
+		'x_prev': params.x_prev,
+		'n_iter': params.n_iter,
+		'n_draw': params.n_draw,
+		'tol': params.tol,
+		'check_every': params.check_every,
+		'max_period': params.max_period,
+		'lyapunov': params.lyapunov,
+		'memmap': params.storage_dir is not None,
+		'precision': params.precision
+	}
+
 
 class Range():
 	"""
@@ -23,6 +94,16 @@ class Range():
 		self.end = tk.DoubleVar(value = settings[1])
 		self.step = tk.DoubleVar(value = settings[2])
 
+	def set(self, settings: list):
+		"""Устанавливает значения диапазона из списка."""
+		self.begin.set(settings[0])
+		self.end.set(settings[1])
+		self.step.set(settings[2])
+
+	def get(self) -> list:
+		"""Возвращает значения диапазона списком."""
+		return [self.begin.get(), self.end.get(), self.step.get()]
+
 
 class Formula():
 	"""
@@ -30,9 +111,12 @@ class Formula():
 
 	Attributes:
 		r, b (Range): Коэффициенты функций
-		x0 (tk.DoubleVar): Начальное значение x[n]
+		x0 (Range): Начальное значение x[0] (диапазон - для перебора начальных значений)
+		is_x_prev (tk.BooleanVar): Задавать ли x[-1] отдельно (иначе x[-1] = x[0])?
+		x_prev (Range): Начальное значение x[-1]
 		n_iter (tk.IntVar): Количество итераций для установления устойчивого режима
 		n_draw (tk.IntVar): Количество итераций для отрисовки графика
+		options (dict): Дополнительные параметры шаблона, не отображаемые в UI
 	"""
 	def __init__(self, settings: dict):
 		"""
@@ -43,9 +127,13 @@ class Formula():
 		"""
 		self.r = Range(settings['r'])
 		self.b = Range(settings['b'])
-		self.x0 = tk.DoubleVar(value = settings['x0'])
+		self.x0 = Range(as_range(settings['x0']))
+		x_prev = settings.get('x_prev')
+		self.is_x_prev = tk.BooleanVar(value = x_prev is not None)
+		self.x_prev = Range(as_range(settings['x0'] if x_prev is None else x_prev))
 		self.n_iter = tk.IntVar(value = settings['n_iter'])
 		self.n_draw = tk.IntVar(value = settings['n_draw'])
+		self.options = get_options(settings)
 
 
 class Data():
@@ -55,12 +143,14 @@ class Data():
 	Attributes:
 		is_f1 (tk.BooleanVar): Рассчитывать ли функцию №1?
 		is_f2 (tk.BooleanVar): Рассчитывать ли функцию №2?
+		formulas (dict): Рассчитывать ли пользовательские формулы (имя -> tk.BooleanVar)
+		definitions (list): Описания пользовательских формул (раздел formulas)
 		f (Formula): Настройки параметров функции
 		delay (tk.IntVar): Время на задержку отрисовки (мс)
 		charts_num (tk.IntVar): Номер комбинации графиков для отображения
 	"""
 	def __init__(self, is_f1: bool, is_f2: bool, settings: dict,
-			delay: int, charts_num: int):
+			delay: int, charts_num: int, formulas: list = None):
 		"""
 		Устанавливает значения параметров в UI по-умолчанию.
 
@@ -70,9 +160,14 @@ class Data():
 			settings (dict): Настройки параметров функции
 			delay (tk.IntVar): Время на задержку отрисовки (мс)
 			charts_num (tk.IntVar): Номер комбинации графиков для отображения
+			formulas (list): Описания пользовательских формул без ошибок
 		"""
 		self.is_f1 = tk.BooleanVar(value = is_f1)
 		self.is_f2 = tk.BooleanVar(value = is_f2)
+		self.definitions = formulas or []
+		enabled = settings.get('formulas', [])
+		self.formulas = {d['name']: tk.BooleanVar(value = d['name'] in enabled)
+			for d in self.definitions}
 		self.f = Formula(settings)
 		self.delay = tk.IntVar(value = delay)
 		self.charts_num = tk.IntVar(value = charts_num)
@@ -86,15 +181,44 @@ class Data():
 		"""
 		self.is_f1.set(settings['f1'])
 		self.is_f2.set(settings['f2'])
-		self.f.r.begin.set(settings['r'][0])
-		self.f.r.end.set(settings['r'][1])
-		self.f.r.step.set(settings['r'][2])
-		self.f.b.begin.set(settings['b'][0])
-		self.f.b.end.set(settings['b'][1])
-		self.f.b.step.set(settings['b'][2])
-		self.f.x0.set(settings['x0'])
+		enabled = settings.get('formulas', [])
+		for name, var in self.formulas.items():
+			var.set(name in enabled)
+		self.f.r.set(settings['r'])
+		self.f.b.set(settings['b'])
+		self.f.x0.set(as_range(settings['x0']))
+		x_prev = settings.get('x_prev')
+		self.f.is_x_prev.set(x_prev is not None)
+		self.f.x_prev.set(as_range(settings['x0'] if x_prev is None else x_prev))
 		self.f.n_iter.set(settings['n_iter'])
 		self.f.n_draw.set(settings['n_draw'])
+		self.f.options = get_options(settings)
+
+	def get_params(self, workers: int = 1, save_dir: str = None) -> Params:
+		"""
+		Возвращает текущие значения параметров расчёта без привязки к UI.
+
+		Args:
+			workers (int): Количество процессов для вычисления (0 - по числу ядер)
+			save_dir (str): Каталог для хранения траекторий в файлах,
+				если в шаблоне указан параметр memmap
+
+		Returns:
+			Params: Параметры вычисления
+		"""
+		settings = dict(self.f.options)
+		settings.update({
+			'f1': self.is_f1.get(),
+			'f2': self.is_f2.get(),
+			'formulas': [name for name, var in self.formulas.items() if var.get()],
+			'r': self.f.r.get(),
+			'b': self.f.b.get(),
+			'x0': self.f.x0.get(),
+			'x_prev': self.f.x_prev.get() if self.f.is_x_prev.get() else None,
+			'n_iter': self.f.n_iter.get(),
+			'n_draw': self.f.n_draw.get()
+		})
+		return get_params(settings, workers, save_dir, self.definitions)
 
 
 class VerticalNavigationToolbar2Tk(NavigationToolbar2Tk):
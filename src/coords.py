@@ -0,0 +1,112 @@
+import numpy as np
+
+
+class GridAxis:
+	"""
+	Ленивое представление координаты (n, r или b) для плоских индексов
+	траектории: элемент i таблицы (номер строки, точка сетки) имеет
+	координату values[i // Nbr] (по строкам) или values[i % Nbr] (по точкам сетки).
+
+	Значения рассчитываются по запросу. Запрошенное начало массива
+	сохраняется в буфере, который растёт не менее чем вдвое, поэтому
+	последовательные срезы при анимации не пересчитываются заново.
+
+	Attributes:
+		values (np.array): Значения координаты по строкам или по точкам сетки
+		Nbr (int): Количество точек сетки (r, b)
+		size (int): Количество элементов таблицы
+		by_row (bool): Зависит ли координата от номера строки?
+		buffer (np.array): Рассчитанное начало массива координат
+	"""
+
+	def __init__(self, values: np.array, Nbr: int, rows: int, by_row: bool, dtype = None):
+		"""
+		Создаёт представление без выделения памяти под все элементы.
+
+		Args:
+			values (np.array): Значения координаты по строкам или по точкам сетки
+			Nbr (int): Количество точек сетки (r, b)
+			rows (int): Количество строк таблицы
+			by_row (bool): Зависит ли координата от номера строки?
+			dtype: Тип значений (по умолчанию - тип values)
+		"""
+		self.values = np.asarray(values, dtype = dtype)
+		self.Nbr = Nbr
+		self.size = rows * Nbr
+		self.by_row = by_row
+		self.buffer = self.values[:0]
+
+	def __len__(self) -> int:
+		"""Возвращает количество элементов таблицы."""
+		return self.size
+
+	def take(self, idx: np.array) -> np.array:
+		"""
+		Возвращает координаты для массива плоских индексов.
+
+		Args:
+			idx (np.array): Плоские индексы элементов таблицы
+
+		Returns:
+			np.array: Координаты
+		"""
+		if self.by_row:
+			return self.values[idx // self.Nbr]
+		return self.values[idx % self.Nbr]
+
+	def grow(self, stop: int):
+		"""Рассчитывает начало массива координат до индекса stop (не включительно)."""
+		done = self.buffer.size
+		if stop <= done:
+			return
+		stop = min(self.size, max(stop, 2 * done))
+		buffer = np.empty(stop, dtype = self.values.dtype)
+		buffer[:done] = self.buffer
+		buffer[done:] = self.take(np.arange(done, stop))
+		self.buffer = buffer
+
+	def __getitem__(self, key):
+		"""
+		Возвращает координату по индексу или срезу.
+
+		Срез с шагом 1 возвращается как часть буфера (без копирования).
+		"""
+		if isinstance(key, slice):
+			start, stop, step = key.indices(self.size)
+			if step == 1:
+				self.grow(stop)
+				return self.buffer[start:max(start, stop)]
+			return self.take(np.arange(start, stop, step))
+		if np.ndim(key) == 0:
+			key = int(key)
+			if key < 0:
+				key += self.size
+			if not 0 <= key < self.size:
+				raise IndexError('Индекс вне таблицы')
+			return self.take(key)
+		return self.take(np.asarray(key))
+
+
+class GridCoords:
+	"""
+	Координаты n, r и b для элементов плоской таблицы траектории.
+
+	Attributes:
+		n (GridAxis): Номера итераций (по строкам)
+		r, b (GridAxis): Коэффициенты (по точкам сетки)
+	"""
+
+	def __init__(self, arr_n: np.array, r: np.array, b: np.array, dtype = None):
+		"""
+		Создаёт координаты без выделения памяти под все элементы таблицы.
+
+		Args:
+			arr_n (np.array): Номера n для каждой строки таблицы
+			r, b (np.array): Коэффициенты для каждой точки сетки
+			dtype: Тип значений r и b (по умолчанию - тип r и b)
+		"""
+		Nbr = r.size
+		rows = arr_n.size
+		self.n = GridAxis(arr_n, Nbr, rows, True)
+		self.r = GridAxis(r, Nbr, rows, False, dtype)
+		self.b = GridAxis(b, Nbr, rows, False, dtype)
@@ -0,0 +1,85 @@
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
+
+
+class DensityImage:
+	"""
+	Изображение плотности точек графика (двумерная гистограмма).
+
+	Точки накапливаются в счётчиках пикселей области графика, а изображение
+	обновляется на месте, поэтому стоимость перерисовки зависит только
+	от размера области графика, а не от количества точек.
+
+	Attributes:
+		image (matplotlib.image.AxesImage): Изображение на графике
+		nx, ny (int): Размеры гистограммы (по пикселям области графика)
+		x_lim, y_lim (tuple): Границы гистограммы
+		counts (np.array): Количество точек в каждом пикселе
+	"""
+
+	def __init__(self, axis, color):
+		"""
+		Создаёт пустое изображение по текущим границам графика.
+
+		Args:
+			axis (matplotlib.pyplot.Axis): Объект для отображения графика
+			color: Цвет точек (плотность задаёт его прозрачность)
+		"""
+		bbox = axis.get_window_extent()
+		self.nx = max(int(bbox.width), 1)
+		self.ny = max(int(bbox.height), 1)
+		self.x_lim = axis.get_xlim()
+		self.y_lim = axis.get_ylim()
+		self.counts = np.zeros(self.nx * self.ny, dtype = np.int64)
+		rgb = to_rgba(color)[:3]
+		cmap = LinearSegmentedColormap.from_list('density', [(*rgb, 0), (*rgb, 1)])
+		self.image = axis.imshow(np.zeros((self.ny, self.nx)), origin = 'lower',
+			extent = [*self.x_lim, *self.y_lim], aspect = 'auto', cmap = cmap,
+			vmin = 0, vmax = 1, interpolation = 'nearest')
+		# imshow не должен менять границы графика
+		axis.set_xlim(self.x_lim)
+		axis.set_ylim(self.y_lim)
+
+	def is_stale(self, axis) -> bool:
+		"""Изменились ли границы или размер графика после накопления точек?"""
+		bbox = axis.get_window_extent()
+		return (tuple(axis.get_xlim()) != tuple(self.x_lim) or tuple(axis.get_ylim()) != tuple(self.y_lim)
+			or max(int(bbox.width), 1) != self.nx or max(int(bbox.height), 1) != self.ny)
+
+	def reset(self, axis):
+		"""
+		Сбрасывает накопленные точки и переносит изображение
+		на текущие границы и размер графика (после их изменения).
+
+		Args:
+			axis (matplotlib.pyplot.Axis): Объект для отображения графика
+		"""
+		bbox = axis.get_window_extent()
+		self.nx = max(int(bbox.width), 1)
+		self.ny = max(int(bbox.height), 1)
+		self.x_lim = axis.get_xlim()
+		self.y_lim = axis.get_ylim()
+		self.counts = np.zeros(self.nx * self.ny, dtype = np.int64)
+		self.image.set_data(np.zeros((self.ny, self.nx)))
+		self.image.set_extent([*self.x_lim, *self.y_lim])
+		axis.set_xlim(self.x_lim)
+		axis.set_ylim(self.y_lim)
+
+	def add(self, x: np.array, y: np.array):
+		"""
+		Добавляет точки и обновляет изображение (логарифмическая шкала плотности).
+
+		Args:
+			x, y (np.array): Координаты точек
+		"""
+		ix = (x - self.x_lim[0]) * (self.nx / (self.x_lim[1] - self.x_lim[0]))
+		iy = (y - self.y_lim[0]) * (self.ny / (self.y_lim[1] - self.y_lim[0]))
+		# Точки вне графика и NaN (ушедшие траектории) не учитываются
+		mask = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+		idx = iy[mask].astype(np.int64) * self.nx + ix[mask].astype(np.int64)
+		self.counts += np.bincount(idx, minlength = self.counts.size)
+		density = np.log1p(self.counts)
+		top = density.max()
+		if top > 0:
+			density /= top
+		self.image.set_data(density.reshape(self.ny, self.nx))
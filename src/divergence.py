@@ -0,0 +1,114 @@
+import numpy as np
+
+EVENT_DTYPE = np.dtype([
+	('func', 'U16'),	# Имя функции
+	('i', np.int64),	# Номер итерации, на которой произошёл уход
+	('idx', np.int64),	# Номер точки сетки (r, b)
+	('x0', np.float64),	# Последнее конечное значение x[n-1]
+	('x1', np.float64)	# Последнее конечное значение x[n]
+])
+"""Структура записи об уходе траектории в бесконечность."""
+
+
+class DivergenceLog:
+	"""
+	Хранит события ухода траекторий в бесконечность.
+
+	События добавляются блоками (массивами), поэтому запись
+	не требует форматирования строк во время вычисления.
+
+	Attributes:
+		chunks (list): Блоки событий (массивы EVENT_DTYPE)
+	"""
+
+	def __init__(self):
+		"""Инициализирует пустой лог."""
+		self.chunks = []
+
+	def __len__(self) -> int:
+		"""Возвращает количество событий."""
+		return sum(chunk.size for chunk in self.chunks)
+
+	def add(self, name: str, i: np.array, idx: np.array,
+			x0: np.array, x1: np.array):
+		"""
+		Добавляет блок событий.
+
+		Args:
+			name (str): Имя функции
+			i (np.array): Номера итераций, на которых произошёл уход
+			idx (np.array): Номера точек сетки
+			x0 (np.array): Последние конечные значения x[n-1]
+			x1 (np.array): Последние конечные значения x[n]
+		"""
+		chunk = np.empty(len(idx), dtype = EVENT_DTYPE)
+		chunk['func'] = name
+		chunk['i'] = i
+		chunk['idx'] = idx
+		chunk['x0'] = x0
+		chunk['x1'] = x1
+		self.chunks.append(chunk)
+
+	def merge(self, other: 'DivergenceLog', offset: int = 0):
+		"""
+		Добавляет события другого лога (например, части сетки).
+
+		Args:
+			other (DivergenceLog): Добавляемый лог
+			offset (int): Смещение номеров точек сетки
+		"""
+		for chunk in other.chunks:
+			chunk = chunk.copy()
+			chunk['idx'] += offset
+			self.chunks.append(chunk)
+
+	def events(self) -> np.array:
+		"""Возвращает все события одним массивом, упорядоченным по функции и номеру точки."""
+		if not self.chunks:
+			return np.empty(0, dtype = EVENT_DTYPE)
+		events = np.concatenate(self.chunks)
+		return events[np.lexsort((events['idx'], events['func']))]
+
+	def escape_time(self, name: str, size: int) -> np.array:
+		"""
+		Возвращает номера итераций ухода в бесконечность для каждой точки сетки.
+
+		Args:
+			name (str): Имя функции
+			size (int): Количество точек сетки
+
+		Returns:
+			np.array: Номера итераций (-1 - точка не ушла в бесконечность)
+		"""
+		res = np.full(size, -1, dtype = np.int64)
+		for chunk in self.chunks:
+			chunk = chunk[chunk['func'] == name]
+			res[chunk['idx']] = chunk['i']
+		return res
+
+	def save_csv(self, fn: str, r: np.array, b: np.array):
+		"""
+		Сохраняет события в файл CSV.
+
+		Args:
+			fn (str): Имя файла
+			r, b (np.array): Коэффициенты для каждой точки сетки
+		"""
+		events = self.events()
+		with open(fn, 'w', encoding='utf-8') as f:
+			f.write('func,i,idx,r,b,x0,x1\n')
+			for e in events:
+				f.write('%s,%d,%d,%.6g,%.6g,%.4e,%.4e\n' % (e['func'], e['i'],
+					e['idx'], r[e['idx']], b[e['idx']], e['x0'], e['x1']))
+
+	def save_npz(self, fn: str, r: np.array, b: np.array):
+		"""
+		Сохраняет события в файл .npz (поля событий и коэффициенты r, b).
+
+		Args:
+			fn (str): Имя файла
+			r, b (np.array): Коэффициенты для каждой точки сетки
+		"""
+		events = self.events()
+		np.savez_compressed(fn, r = r, b = b,
+			**{key: events[key] for key in EVENT_DTYPE.names})
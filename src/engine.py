@@ -0,0 +1,1033 @@
+import time
+import numpy as np
+
+from src.kernels import KERNELS, TANGENTS
+from src.formulas import compile_formula, formula_specs
+from src.divergence import DivergenceLog
+from src.periods import detect_periods
+from src.storage import Storage
+from src.checkpoint import Checkpoint
+
+# Номера этапов вычисления
+PHASE_ITER = 1 # Достижение устойчивых значений
+PHASE_DRAW = 2 # Расчёт значений для отрисовки
+
+BLOCK_SIZE = 16
+"""Количество итераций, выполняемых между проверками прогресса, отмены
+и ухода траекторий в бесконечность."""
+
+MAX_CYCLE = 8
+"""Максимальный период цикла, при котором траектория считается сошедшейся."""
+
+HISTORY = MAX_CYCLE + 2
+"""Количество последних значений x[n], по которым проверяется сходимость."""
+
+PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+"""Допустимые значения точности вычисления."""
+
+
+def initial_value(value):
+	"""
+	Приводит начальное значение к числу или диапазону [начало, конец, шаг]
+	(диапазон с совпадающими началом и концом - к числу).
+
+	Args:
+		value (float | list): Число или диапазон (None - значение не задано)
+
+	Returns:
+		float | list: Число или диапазон
+	"""
+	if value is None:
+		return None
+	if np.ndim(value) == 0:
+		return float(value)
+	value = [float(v) for v in value]
+	return value[0] if value[0] == value[1] else value
+
+
+def grid_values(value) -> np.array:
+	"""
+	Возвращает значения по оси сетки.
+
+	Args:
+		value (float | list): Число или диапазон [начало, конец, шаг]
+
+	Returns:
+		np.array: Значения (для пустого диапазона - его начало)
+	"""
+	if np.ndim(value) == 0:
+		return np.array([float(value)])
+	values = np.arange(value[0], value[1]+0.000001, value[2])
+	if values.size == 0:
+		values = np.array([float(value[0])])
+	return values
+
+
+def grid_axes(params: 'Params') -> dict:
+	"""
+	Возвращает оси сетки: r, b и начальные значения x[0] и x[-1],
+	если они заданы диапазонами. Точки сетки нумеруются по осям
+	в этом порядке (последняя ось меняется быстрее всех).
+
+	Args:
+		params (Params): Параметры вычисления
+
+	Returns:
+		dict: Значения по каждой оси (подпись -> np.array)
+	"""
+	axes = {'r': grid_values(params.r), 'b': grid_values(params.b)}
+	if np.ndim(params.x0) > 0:
+		axes['x[0]'] = grid_values(params.x0)
+	if np.ndim(params.x_prev) > 0:
+		axes['x[-1]'] = grid_values(params.x_prev)
+	return axes
+
+
+def grid_plane(values: np.array, axes: dict) -> tuple:
+	"""
+	Возвращает срез значений по точкам сетки для карты: по первым двум осям
+	с несколькими значениями (по остальным осям - первое значение).
+
+	Args:
+		values (np.array): Значения для каждой точки сетки
+		axes (dict): Оси сетки (см. grid_axes)
+
+	Returns:
+		tuple: (таблица (ось 1, ось 2), (подпись, значения) оси 1, (подпись, значения) оси 2)
+	"""
+	labels = list(axes)
+	shape = tuple(axes[label].size for label in labels)
+	varying = [k for k, n in enumerate(shape) if n > 1]
+	chosen = sorted((varying + [k for k in range(len(shape)) if k not in varying])[:2])
+	index = tuple(slice(None) if k in chosen else 0 for k in range(len(shape)))
+	table = values.reshape(shape)[index]
+	a, b = (labels[k] for k in chosen)
+	return table, (a, axes[a]), (b, axes[b])
+
+
+class Params:
+	"""
+	Хранит параметры вычисления без привязки к UI.
+
+	Attributes:
+		is_f1 (bool): Рассчитывать ли функцию №1?
+		is_f2 (bool): Рассчитывать ли функцию №2?
+		r, b (list): Диапазоны коэффициентов [начало, конец, шаг]
+		x0 (float | list): Начальное значение x[0] или его диапазон
+		n_iter (int): Количество итераций для установления устойчивого режима
+		n_draw (int): Количество итераций для отрисовки графика
+		workers (int): Количество процессов для вычисления (0 - по числу ядер)
+		tol (float): Точность проверки сходимости на этапе установления (0 - без проверки)
+		check_every (int): Через сколько итераций проверять сходимость
+		max_period (int): Наибольший период для карты периодов
+		lyapunov (bool): Рассчитывать ли старший показатель Ляпунова?
+		storage_dir (str): Каталог для хранения траекторий в файлах np.memmap
+			(None - в оперативной памяти)
+		precision (str): Точность вычисления ('float64' или 'float32')
+		formulas (dict): Рассчитываемые пользовательские формулы
+			(имя -> {'x': формула x[n+1], 'y': формула y[n+1] или None})
+		x_prev (float | list): Начальное значение x[-1] или его диапазон
+			(None - совпадает с x[0])
+	"""
+
+	def __init__(self, is_f1: bool, is_f2: bool, r: list, b: list,
+			x0: float, n_iter: int, n_draw: int, workers: int = 1,
+			tol: float = 0, check_every: int = 64, max_period: int = 16,
+			lyapunov: bool = False, storage_dir: str = None,
+			precision: str = 'float64', formulas: dict = None, x_prev: float = None):
+		"""
+		Хранит параметры вычисления без привязки к UI.
+
+		Args:
+			is_f1 (bool): Рассчитывать ли функцию №1?
+			is_f2 (bool): Рассчитывать ли функцию №2?
+			r, b (list): Диапазоны коэффициентов [начало, конец, шаг]
+			x0 (float | list): Начальное значение x[0] или его диапазон
+			n_iter (int): Количество итераций для установления устойчивого режима
+			n_draw (int): Количество итераций для отрисовки графика
+			workers (int): Количество процессов для вычисления (0 - по числу ядер)
+			tol (float): Точность проверки сходимости на этапе установления (0 - без проверки)
+			check_every (int): Через сколько итераций проверять сходимость
+			max_period (int): Наибольший период для карты периодов
+			lyapunov (bool): Рассчитывать ли старший показатель Ляпунова?
+			storage_dir (str): Каталог для хранения траекторий в файлах np.memmap
+				(None - в оперативной памяти)
+			precision (str): Точность вычисления ('float64' или 'float32')
+			formulas (dict): Рассчитываемые пользовательские формулы
+				(имя -> {'x': формула x[n+1], 'y': формула y[n+1] или None})
+			x_prev (float | list): Начальное значение x[-1] или его диапазон
+				(None - совпадает с x[0])
+		"""
+		if precision not in PRECISIONS:
+			raise ValueError(f'Неизвестная точность вычисления: {precision}')
+		self.formulas = {name: {'x': f['x'], 'y': f.get('y')}
+			for name, f in (formulas or {}).items()}
+		# Проверка формул (ядра кэшируются и используются при вычислении)
+		for f in self.formulas.values():
+			compile_formula(f['x'], f['y'])
+		self.is_f1 = bool(is_f1)
+		self.is_f2 = bool(is_f2)
+		self.r = [float(v) for v in r]
+		self.b = [float(v) for v in b]
+		self.x0 = initial_value(x0)
+		self.x_prev = initial_value(x_prev)
+		self.n_iter = int(n_iter)
+		self.n_draw = int(n_draw)
+		self.workers = int(workers)
+		self.tol = float(tol)
+		self.check_every = max(int(check_every), 1)
+		self.max_period = max(int(max_period), 1)
+		self.lyapunov = bool(lyapunov)
+		self.storage_dir = storage_dir
+		self.precision = precision
+
+	@staticmethod
+	def from_settings(settings: dict, formulas: list = None) -> 'Params':
+		"""
+		Создаёт параметры по записи из раздела defaults файла settings.json.
+
+		Args:
+			settings (dict): Словарь настроек (formulas - имена включённых
+				пользовательских формул)
+			formulas (list): Описания пользовательских формул (раздел formulas)
+
+		Returns:
+			Params: Параметры вычисления
+		"""
+		return Params(settings['f1'], settings['f2'], settings['r'],
+			settings['b'], settings['x0'], settings['n_iter'],
+			settings['n_draw'], settings.get('workers', 1),
+			settings.get('tol', 0), settings.get('check_every', 64),
+			settings.get('max_period', 16), settings.get('lyapunov', False),
+			settings.get('storage_dir'), settings.get('precision', 'float64'),
+			formula_specs(settings.get('formulas', []), formulas or []),
+			settings.get('x_prev'))
+
+	def dtype(self) -> np.dtype:
+		"""Возвращает тип значений для вычисления и хранения траекторий."""
+		return np.dtype(PRECISIONS[self.precision])
+
+	def names(self) -> list:
+		"""Возвращает имена функций, которые нужно рассчитать."""
+		names = []
+		if self.is_f1:
+			names.append('f1')
+		if self.is_f2:
+			names.append('f2')
+		names.extend(self.formulas)
+		return names
+
+	def kernels(self, name: str) -> tuple:
+		"""
+		Возвращает ядра расчёта шага функции.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			tuple: (ядро шага, ядро касательного отображения)
+		"""
+		if name in KERNELS:
+			return KERNELS[name], TANGENTS[name]
+		f = self.formulas[name]
+		return compile_formula(f['x'], f['y'])
+
+
+class Stepper:
+	"""
+	Выполняет итерации функции в заранее выделенных буферах.
+
+	Траектории, ушедшие в бесконечность, исключаются из расчёта:
+	буферы сжимаются до активных точек сетки, а в таблице траектории
+	ушедшие точки отмечаются значением NaN. Аналогично на этапе
+	установления исключаются (замораживаются) сошедшиеся траектории.
+
+	На этапе отрисовки вместе с траекторией может рассчитываться касательное
+	отображение: вектор возмущения (w[n-1], w[n]) нормируется после каждого
+	блока итераций, а логарифмы норм накапливаются в lsum.
+
+	Attributes:
+		name (str): Имя функции
+		kernel (method): Ядро расчёта шага (см. src.kernels, src.formulas)
+		tangent (method): Ядро расчёта шага касательного отображения
+		kernel_temps, tangent_temps (int): Количество дополнительных массивов
+			ядер шага и касательного отображения (для пользовательских формул)
+		log (DivergenceLog): Лог ухода траекторий в бесконечность
+		i (int): Номер текущей итерации
+		idx (np.array): Номера активных точек сетки
+		is_full (bool): Активны ли все точки сетки?
+		escaped (np.array): Маска ушедших в бесконечность точек сетки
+		frozen (np.array): Маска сошедшихся точек сетки
+		f0, f1 (np.array): Значения x[n-1] и x[n] сошедшихся точек сетки
+		r_all, b_all (np.array): Коэффициенты функции для всех точек сетки
+		r, b (np.array): Коэффициенты функции для активных точек
+		x0, x1 (np.array): Значения x[n-1] и x[n] для активных точек
+		hist (np.array): Последние значения x[n] для проверки сходимости
+		lsum (np.array): Суммы логарифмов растяжения возмущения для всех
+			точек сетки (None - показатель Ляпунова не рассчитывается)
+		w0, w1 (np.array): Возмущения w[n-1] и w[n] для активных точек
+		x2, s0, s1, w2, tmp (np.array): Вспомогательные массивы
+		work (list): Дополнительные вспомогательные массивы ядер (общие для обоих ядер)
+		kernel_work, tangent_work (list): Массивы work, передаваемые каждому ядру
+		ok (np.array): Вспомогательный массив для проверки результатов
+		dtype (np.dtype): Тип значений (совпадает с типом r)
+	"""
+
+	def __init__(self, name: str, r: np.array, b: np.array, x0,
+			log: DivergenceLog, track: bool = False, lsum: np.array = None,
+			kernels: tuple = None, x_prev = None):
+		"""
+		Выделяет буферы и задаёт начальные значения x[0] = x0 и x[-1] = x_prev.
+
+		Args:
+			name (str): Имя функции
+			r, b (np.array): Коэффициенты функции (их тип задаёт точность вычисления)
+			x0 (float | np.array): Начальное значение x[0] (общее или для каждой точки сетки)
+			log (DivergenceLog): Лог ухода траекторий в бесконечность
+			track (bool): Проверять ли сходимость траекторий?
+			lsum (np.array): Массив для накопления логарифмов растяжения
+				возмущения (None - показатель Ляпунова не рассчитывается)
+			kernels (tuple): Ядра шага и касательного отображения
+				(по умолчанию - встроенные ядра функции name)
+			x_prev (float | np.array): Начальное значение x[-1] (None - равно x0)
+		"""
+		self.name = name
+		self.kernel, self.tangent = kernels if kernels is not None else (KERNELS[name], TANGENTS[name])
+		self.kernel_temps = getattr(self.kernel, 'temps', 0)
+		self.tangent_temps = getattr(self.tangent, 'temps', 0)
+		self.log = log
+		self.i = 0
+		self.idx = np.arange(r.size)
+		self.is_full = True
+		self.escaped = np.zeros(r.size, dtype = bool)
+		self.frozen = np.zeros(r.size, dtype = bool)
+		self.dtype = r.dtype
+		self.f0 = np.empty(r.size, dtype = self.dtype)
+		self.f1 = np.empty(r.size, dtype = self.dtype)
+		self.r_all = r
+		self.b_all = b
+		self.r = r
+		self.b = b
+		self.x1 = np.full(r.size, x0, dtype = self.dtype)
+		self.x0 = self.x1.copy() if x_prev is None else np.full(r.size, x_prev, dtype = self.dtype)
+		self.hist = np.empty((HISTORY if track else 0, r.size), dtype = self.dtype)
+		self.lsum = lsum
+		self.w0 = None
+		self.w1 = None
+		self.w2 = None
+		self.alloc()
+
+	def restore(self, x0: np.array, x1: np.array, i: int):
+		"""
+		Задаёт состояние траекторий (например, из контрольной точки).
+
+		Args:
+			x0, x1 (np.array): Значения x[n-1] и x[n] для всех точек сетки
+				(NaN - траектория ушла в бесконечность)
+			i (int): Номер итерации, соответствующий состоянию
+		"""
+		self.x0 = x0.astype(self.dtype)
+		self.x1 = x1.astype(self.dtype)
+		self.i = i
+		bad = ~np.isfinite(self.x1)
+		if bad.any():
+			self.escaped[bad] = True
+			self.compact(~bad)
+
+	def alloc(self):
+		"""Выделяет вспомогательные массивы по числу активных точек."""
+		n = self.idx.size
+		self.x2 = np.empty(n, dtype = self.dtype)
+		self.s0 = np.empty(n, dtype = self.dtype)
+		self.s1 = np.empty(n, dtype = self.dtype)
+		self.tmp = np.empty(n, dtype = self.dtype)
+		self.ok = np.empty(n, dtype = bool)
+		self.work = [np.empty(n, dtype = self.dtype)
+			for _ in range(max(self.kernel_temps, self.tangent_temps))]
+		self.kernel_work = self.work[:self.kernel_temps]
+		self.tangent_work = self.work[:self.tangent_temps]
+		if self.w0 is not None:
+			self.w2 = np.empty(n, dtype = self.dtype)
+
+	def compact(self, keep: np.array):
+		"""
+		Исключает точки из расчёта.
+
+		Args:
+			keep (np.array): Маска оставшихся активных точек
+		"""
+		self.idx = self.idx[keep]
+		self.r = self.r[keep]
+		self.b = self.b[keep]
+		self.x0 = self.x0[keep]
+		self.x1 = self.x1[keep]
+		self.hist = self.hist[:, keep]
+		if self.w0 is not None:
+			self.w0 = self.w0[keep]
+			self.w1 = self.w1[keep]
+		self.is_full = False
+		self.alloc()
+
+	def advance(self, steps: int, record: int = 0):
+		"""
+		Выполняет несколько итераций без сохранения траектории.
+
+		Уход в бесконечность проверяется один раз в конце (значения
+		inf и nan сохраняются при дальнейших итерациях), а момент ухода
+		уточняется повторным расчётом блока только для ушедших точек.
+
+		Args:
+			steps (int): Количество итераций
+			record (int): Количество последних итераций, значения x[n]
+				которых сохраняются в hist (не больше HISTORY и steps)
+		"""
+		np.copyto(self.s0, self.x0)
+		np.copyto(self.s1, self.x1)
+		x0, x1, x2 = self.x0, self.x1, self.x2
+		first = steps - record
+		for k in range(steps):
+			self.kernel(x0, x1, self.r, self.b, x2, self.tmp, *self.kernel_work)
+			if k >= first:
+				np.copyto(self.hist[k - first], x2)
+			x0, x1, x2 = x1, x2, x0
+		self.x0, self.x1, self.x2 = x0, x1, x2
+		self.i += steps
+		np.isfinite(x1, out = self.ok)
+		if not self.ok.all():
+			self.trace(steps)
+			self.escaped[self.idx[~self.ok]] = True
+			self.compact(self.ok.copy())
+
+	def freeze(self, tol: float, end: int):
+		"""
+		Исключает из расчёта траектории, сошедшиеся к неподвижной точке
+		или циклу периода до MAX_CYCLE (по значениям в hist).
+
+		Сохраняется состояние, сдвинутое по циклу на (end - i) mod период
+		итераций, то есть то, которого траектория достигла бы к концу
+		этапа установления, поэтому строки траектории соответствуют номерам итераций.
+
+		Args:
+			tol (float): Допустимое отклонение значений за период
+			end (int): Номер итерации, на которой завершается этап установления
+		"""
+		# Предварительный отбор по последнему значению x[n]
+		conv = np.zeros(self.idx.size, dtype = bool)
+		for p in range(1, MAX_CYCLE + 1):
+			conv |= np.abs(self.hist[-1] - self.hist[-1 - p]) < tol
+		if not conv.any():
+			return
+		# Проверка периодичности на всей истории для отобранных точек
+		# (от больших периодов к меньшим, чтобы остался наименьший период)
+		hist = self.hist[:, conv]
+		period = np.zeros(hist.shape[1], dtype = int)
+		for p in range(MAX_CYCLE, 0, -1):
+			period[np.abs(hist[p:] - hist[:-p]).max(axis = 0) < tol] = p
+		periodic = period > 0
+		conv[conv] = periodic
+		if conv.any():
+			hist = hist[:, periodic]
+			period = period[periodic]
+			# Строка hist со значением x[n] на итерации end (hist[-1] - итерация i)
+			row = HISTORY - 1 - period + (end - self.i) % period
+			k = np.arange(period.size)
+			cols = self.idx[conv]
+			self.frozen[cols] = True
+			self.f0[cols] = hist[row - 1, k]
+			self.f1[cols] = hist[row, k]
+			self.compact(~conv)
+
+	def trace(self, steps: int):
+		"""
+		Повторяет последний блок итераций для ушедших точек
+		и записывает в лог момент ухода в бесконечность.
+
+		Args:
+			steps (int): Количество итераций в блоке
+		"""
+		bad = ~self.ok
+		x0 = self.s0[bad]
+		x1 = self.s1[bad]
+		r = self.r[bad]
+		b = self.b[bad]
+		x2 = np.empty_like(x0)
+		tmp = np.empty_like(x0)
+		work = [np.empty_like(x0) for _ in range(self.kernel_temps)]
+		i = np.zeros(x0.size, dtype = int)
+		last0 = np.empty_like(x0)
+		last1 = np.empty_like(x0)
+		alive = np.ones(x0.size, dtype = bool)
+		for k in range(steps):
+			self.kernel(x0, x1, r, b, x2, tmp, *work)
+			new = alive & ~np.isfinite(x2)
+			i[new] = self.i - steps + k
+			last0[new] = x0[new]
+			last1[new] = x1[new]
+			alive &= ~new
+			x0, x1, x2 = x1, x2, x0
+		self.log.add(self.name, i, self.idx[bad], last0, last1)
+
+	def start_draw(self, rows: np.array, start: int = 0):
+		"""
+		Записывает значения x[n-1] и x[n] в строки start и start + 1
+		таблицы траектории и возвращает сошедшиеся точки в расчёт.
+
+		Args:
+			rows (np.array): Таблица траектории (номер строки n, точка сетки)
+			start (int): Номер строки со значением x[n-1]
+		"""
+		if self.is_full:
+			rows[start] = self.x0
+			rows[start + 1] = self.x1
+			self.init_tangent()
+			return
+		rows[start:, self.escaped] = np.nan
+		rows[start, self.idx] = self.x0
+		rows[start + 1, self.idx] = self.x1
+		rows[start, self.frozen] = self.f0[self.frozen]
+		rows[start + 1, self.frozen] = self.f1[self.frozen]
+		self.frozen[:] = False
+		# Активны все точки, кроме ушедших в бесконечность
+		self.idx = np.flatnonzero(~self.escaped)
+		self.is_full = self.idx.size == self.escaped.size
+		self.r = self.r_all[self.idx]
+		self.b = self.b_all[self.idx]
+		self.x0 = rows[start, self.idx]
+		self.x1 = rows[start + 1, self.idx]
+		self.hist = np.empty((0, self.idx.size), dtype = self.dtype)
+		self.alloc()
+		self.init_tangent()
+
+	def init_tangent(self):
+		"""Задаёт начальное возмущение вдоль x[n] для активных точек."""
+		if self.lsum is None:
+			return
+		self.lsum[self.escaped] = np.nan
+		self.w0 = np.zeros(self.idx.size, dtype = self.dtype)
+		self.w1 = np.ones(self.idx.size, dtype = self.dtype)
+		self.w2 = np.empty(self.idx.size, dtype = self.dtype)
+
+	def renorm(self):
+		"""Нормирует вектор возмущения и накапливает логарифм его нормы."""
+		norm = self.tmp
+		np.hypot(self.w0, self.w1, out = norm)
+		# Возмущение может обнулиться (сверхустойчивый цикл)
+		np.maximum(norm, np.finfo(norm.dtype).tiny, out = norm)
+		np.divide(self.w0, norm, out = self.w0)
+		np.divide(self.w1, norm, out = self.w1)
+		np.log(norm, out = norm)
+		if self.is_full:
+			self.lsum += norm
+		else:
+			self.lsum[self.idx] += norm
+
+	def fill(self, rows: np.array, start: int, steps: int):
+		"""
+		Заполняет строки траектории, начиная со строки start + 2.
+
+		Пока активны все точки, значения записываются сразу в строки таблицы,
+		иначе - во вспомогательные массивы с переносом в активные столбцы.
+		Касательное отображение рассчитывается в том же проходе по сетке.
+
+		Args:
+			rows (np.array): Таблица траектории (номер строки n, точка сетки)
+			start (int): Номер строки со значением x[n-1]
+			steps (int): Количество итераций
+		"""
+		last = start + steps + 1
+		is_lyap = self.lsum is not None
+		w0, w1, w2 = self.w0, self.w1, self.w2
+		if self.is_full:
+			for k in range(start, start + steps):
+				self.kernel(rows[k], rows[k + 1], self.r, self.b, rows[k + 2], self.tmp, *self.kernel_work)
+				if is_lyap:
+					self.tangent(rows[k], rows[k + 1], self.r, self.b, w0, w1, w2, self.tmp, *self.tangent_work)
+					w0, w1, w2 = w1, w2, w0
+			self.x0, self.x1 = rows[last - 1], rows[last]
+		else:
+			x0, x1, x2 = self.x0, self.x1, self.x2
+			for k in range(start, start + steps):
+				self.kernel(x0, x1, self.r, self.b, x2, self.tmp, *self.kernel_work)
+				rows[k + 2, self.idx] = x2
+				if is_lyap:
+					self.tangent(x0, x1, self.r, self.b, w0, w1, w2, self.tmp, *self.tangent_work)
+					w0, w1, w2 = w1, w2, w0
+				x0, x1, x2 = x1, x2, x0
+			self.x0, self.x1, self.x2 = x0, x1, x2
+		if is_lyap:
+			self.w0, self.w1, self.w2 = w0, w1, w2
+			self.renorm()
+		self.i += steps
+		np.isfinite(self.x1, out = self.ok)
+		if not self.ok.all():
+			keep = self.ok.copy()
+			cols = self.idx[~keep]
+			# Первая строка блока с бесконечным значением
+			first = np.argmin(np.isfinite(rows[start + 2:last + 1, cols]), axis = 0)
+			self.log.add(self.name, self.i - steps + first, cols,
+				rows[start + first, cols], rows[start + first + 1, cols])
+			# Отметка ушедших точек до конца таблицы
+			mask = np.arange(rows.shape[0])[:, None] >= start + 2 + first
+			rows[:, cols] = np.where(mask, np.nan, rows[:, cols])
+			self.escaped[cols] = True
+			if is_lyap:
+				self.lsum[cols] = np.nan
+			self.compact(keep)
+
+
+class Result:
+	"""
+	Хранит результаты вычисления.
+
+	Траектории хранятся в одномерных массивах x[name] построчно:
+	строка k содержит значения x[n_iter + k] для всех точек сетки (r, b).
+
+	Attributes:
+		names (list): Имена рассчитанных функций
+		x (dict): Траектории для каждой функции
+		r, b (np.array): Коэффициенты для каждой точки сетки
+		shape (tuple): Размеры сетки (количество значений по каждой оси)
+		axes (dict): Значения по осям сетки (см. grid_axes)
+		arr_n (np.array): Номера n для каждой строки траекторий
+		Nbr (int): Количество точек сетки (r, b)
+		n_iter (int): Количество итераций для установления устойчивого режима
+		n_draw (int): Количество итераций для отрисовки графика
+		n_done (int): Количество рассчитанных итераций для отрисовки
+		is_cancelled (bool): Было ли вычисление прервано до расчёта точек
+		log (DivergenceLog): Лог ухода траекторий в бесконечность
+		lsum (dict): Суммы логарифмов растяжения возмущения для каждой
+			функции (пустой - показатель Ляпунова не рассчитывается)
+		storage (Storage): Хранилище буферов траекторий
+		dtype (np.dtype): Тип значений траекторий
+	"""
+
+	def __init__(self, names: list, r: np.array, b: np.array,
+			n_iter: int, n_draw: int, shape: tuple = None,
+			lyapunov: bool = False, storage: Storage = None,
+			dtype: np.dtype = np.float64, axes: dict = None):
+		"""
+		Резервирует место для траекторий.
+
+		Args:
+			names (list): Имена рассчитываемых функций
+			r, b (np.array): Коэффициенты для каждой точки сетки
+			n_iter (int): Количество итераций для установления устойчивого режима
+			n_draw (int): Количество итераций для отрисовки графика
+			shape (tuple): Размеры сетки (по умолчанию (количество точек, 1))
+			lyapunov (bool): Рассчитывать ли старший показатель Ляпунова?
+			storage (Storage): Хранилище буферов траекторий (по умолчанию - оперативная память)
+			dtype (np.dtype): Тип значений траекторий
+			axes (dict): Значения по осям сетки (по умолчанию - оси r и b по shape)
+		"""
+		self.names = names
+		self.r = r
+		self.b = b
+		self.Nbr = r.size
+		self.shape = shape if shape is not None else (self.Nbr, 1)
+		if axes is None:
+			# Сетка (r, b), как в прежних версиях
+			axes = {'r': r[::self.shape[1]], 'b': b[:self.shape[1]]}
+		self.axes = axes
+		self.n_iter = n_iter
+		self.n_draw = n_draw
+		self.arr_n = np.arange(n_iter + 1, n_iter + n_draw + 3)
+		self.storage = storage if storage is not None else Storage()
+		self.dtype = np.dtype(dtype)
+		self.x = {name: self.storage.zeros('x_' + name, (n_draw + 2) * self.Nbr, dtype)
+			for name in names}
+		self.n_done = 0
+		self.is_cancelled = False
+		self.log = DivergenceLog()
+		self.lsum = {name: np.zeros(self.Nbr) for name in names} if lyapunov else {}
+
+	def rows(self, name: str) -> np.array:
+		"""
+		Возвращает траекторию функции в виде таблицы.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			np.array: Таблица (номер строки n, точка сетки)
+		"""
+		return self.x[name].reshape(self.n_draw + 2, self.Nbr)
+
+	def arrays(self, name: str) -> tuple:
+		"""
+		Возвращает рассчитанные точки функции в виде плоских массивов.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			tuple: Массивы одинаковой длины (x[n], x[n+1], r, b, n)
+		"""
+		rows = self.rows(name)
+		k = self.n_done + 1
+		xn = rows[:k].ravel()
+		xn1 = rows[1:k + 1].ravel()
+		r = np.tile(self.r, k)
+		b = np.tile(self.b, k)
+		n = np.repeat(self.arr_n[:k], self.Nbr)
+		return xn, xn1, r, b, n
+
+	def escape_time(self, name: str) -> np.array:
+		"""
+		Возвращает номера итераций ухода в бесконечность для каждой точки сетки.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			np.array: Номера итераций (-1 - точка не ушла в бесконечность)
+		"""
+		return self.log.escape_time(name, self.Nbr)
+
+	def escape_map(self, name: str) -> np.array:
+		"""
+		Возвращает карту времени ухода в бесконечность для отрисовки.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			np.array: Таблица (значение r, значение b), NaN - точка не ушла
+		"""
+		res = self.escape_time(name).astype(float)
+		res[res < 0] = np.nan
+		return res.reshape(self.shape)
+
+	def plane(self, values: np.array) -> tuple:
+		"""
+		Возвращает срез значений по точкам сетки для карты (см. grid_plane).
+
+		Args:
+			values (np.array): Значения для каждой точки сетки
+
+		Returns:
+			tuple: (таблица, (подпись, значения) оси 1, (подпись, значения) оси 2)
+		"""
+		return grid_plane(values, self.axes)
+
+	def periods(self, name: str, max_period: int) -> np.array:
+		"""
+		Классифицирует точки сетки по периоду траектории (см. src.periods).
+
+		Args:
+			name (str): Имя функции
+			max_period (int): Наибольший проверяемый период
+
+		Returns:
+			np.array: Коды точек сетки (1..max_period - период,
+				0 - период не найден, -1 - уход в бесконечность)
+		"""
+		return detect_periods(self.rows(name)[:self.n_done + 2], max_period)
+
+	def period_map(self, name: str, max_period: int) -> np.array:
+		"""
+		Возвращает карту периодов для отрисовки.
+
+		Args:
+			name (str): Имя функции
+			max_period (int): Наибольший проверяемый период
+
+		Returns:
+			np.array: Таблица кодов (значение r, значение b)
+		"""
+		return self.periods(name, max_period).reshape(self.shape)
+
+	def lyapunov(self, name: str) -> np.array:
+		"""
+		Возвращает старший показатель Ляпунова для каждой точки сетки,
+		усреднённый по рассчитанным итерациям этапа отрисовки.
+
+		Args:
+			name (str): Имя функции
+
+		Returns:
+			np.array: Показатели Ляпунова (NaN - уход в бесконечность или не рассчитан)
+		"""
+		if name not in self.lsum or self.n_done == 0:
+			return np.full(self.Nbr, np.nan)
+		return self.lsum[name] / self.n_done
+
+	def save_log(self, fn: str):
+		"""
+		Сохраняет лог ухода траекторий в бесконечность.
+		Формат определяется расширением файла (.csv или .npz).
+
+		Args:
+			fn (str): Имя файла
+		"""
+		if fn.endswith('.npz'):
+			self.log.save_npz(fn, self.r, self.b)
+		else:
+			self.log.save_csv(fn, self.r, self.b)
+
+	def checkpoint(self) -> Checkpoint:
+		"""
+		Возвращает состояние траекторий после этапа установления
+		(строки x[n_iter] и x[n_iter + 1] и события ухода на этом этапе).
+
+		Returns:
+			Checkpoint: Состояние траекторий
+		"""
+		log = DivergenceLog()
+		events = self.log.events()
+		events = events[events['i'] <= self.n_iter]
+		if events.size > 0:
+			log.chunks.append(events)
+		return Checkpoint(self.n_iter, {name: self.rows(name)[0].copy() for name in self.names},
+			{name: self.rows(name)[1].copy() for name in self.names}, log)
+
+	def nbytes(self) -> int:
+		"""Возвращает объём памяти, занимаемый массивами результатов."""
+		arrays = [self.r, self.b, *self.x.values(), *self.lsum.values(), *self.log.chunks]
+		return sum(a.nbytes for a in arrays)
+
+	def save(self, fn: str):
+		"""
+		Сохраняет результаты вычисления в сжатый файл .npz.
+
+		Args:
+			fn (str): Имя файла
+		"""
+		arrays = {'names': np.array(self.names, dtype = str), 'r': self.r, 'b': self.b,
+			'shape': np.array(self.shape), 'n': np.array([self.n_iter, self.n_draw, self.n_done]),
+			'log': self.log.events(), 'axes': np.array(list(self.axes), dtype = str)}
+		for k, values in enumerate(self.axes.values()):
+			arrays[f'axis_{k}'] = values
+		for name in self.names:
+			arrays['x_' + name] = self.x[name]
+			if name in self.lsum:
+				arrays['lsum_' + name] = self.lsum[name]
+		np.savez_compressed(fn, **arrays)
+
+	@staticmethod
+	def load(fn: str) -> 'Result':
+		"""
+		Загружает результаты вычисления, сохранённые методом save.
+
+		Args:
+			fn (str): Имя файла
+
+		Returns:
+			Result: Результаты вычисления
+		"""
+		with np.load(fn) as f:
+			names = [str(name) for name in f['names']]
+			n_iter, n_draw, n_done = (int(v) for v in f['n'])
+			dtype = f['x_' + names[0]].dtype if names else np.float64
+			axes = None
+			if 'axes' in f:
+				axes = {str(label): f[f'axis_{k}'] for k, label in enumerate(f['axes'])}
+			res = Result(names, f['r'], f['b'], n_iter, n_draw,
+				tuple(int(v) for v in f['shape']), dtype = dtype, axes = axes)
+			res.n_done = n_done
+			for name in names:
+				res.x[name] = f['x_' + name]
+				if 'lsum_' + name in f:
+					res.lsum[name] = f['lsum_' + name]
+			if f['log'].size > 0:
+				res.log.chunks.append(f['log'])
+		return res
+
+
+class Engine:
+	"""
+	Выполняет вычисление значений отображения без привязки к UI.
+
+	Attributes:
+		params (Params): Параметры вычисления
+		arr_r, arr_b (np.array): Значения коэффициентов по осям сетки
+		axes (dict): Значения по осям сетки (см. grid_axes)
+		r, b (np.array): Коэффициенты для каждой точки сетки
+		x0, x_prev (np.array): Начальные значения x[0] и x[-1] для каждой точки сетки
+		Nbr (int): Количество точек сетки
+		shape (tuple): Размеры сетки (None - рассчитывается часть сетки)
+		checkpoint (Checkpoint): Состояние после этапа установления, с которого
+			продолжается расчёт (None - расчёт с начального значения x0)
+		on_draw (method): Вызывается с результатами после каждого блока итераций
+			отрисовки (для отображения точек по мере расчёта)
+		profiler (Profiler): Учёт времени этапов и ядер (None - без учёта)
+	"""
+
+	def __init__(self, params: Params, start: int = 0, stop: int = None,
+			checkpoint: Checkpoint = None):
+		"""
+		Подготавливает сетку коэффициентов.
+
+		Args:
+			params (Params): Параметры вычисления
+			start, stop (int): Диапазон точек сетки для расчёта (по умолчанию вся сетка)
+			checkpoint (Checkpoint): Состояние рассчитываемых точек сетки после
+				не более чем n_iter итераций установления
+		"""
+		self.params = params
+		self.checkpoint = checkpoint
+		self.on_draw = None
+		self.profiler = None
+		self.axes = grid_axes(params)
+		self.arr_r = self.axes['r']
+		self.arr_b = self.axes['b']
+		sizes = tuple(values.size for values in self.axes.values())
+		# Номера значений по осям для точек сетки start..stop
+		# r1 r1 r1 r2 r2 r2
+		# b1 b2 b3 b1 b2 b3
+		total = int(np.prod(sizes))
+		stop = total if stop is None else min(stop, total)
+		idx = np.unravel_index(np.arange(start, stop), sizes)
+		values = {label: self.axes[label][i] for label, i in zip(self.axes, idx)}
+		self.r = values['r']
+		self.b = values['b']
+		# Начальные значения, не заданные диапазоном, общие для всех точек
+		self.x0 = values['x[0]'] if 'x[0]' in values else np.full(self.r.size, params.x0)
+		if 'x[-1]' in values:
+			self.x_prev = values['x[-1]']
+		elif params.x_prev is not None:
+			self.x_prev = np.full(self.r.size, params.x_prev)
+		else:
+			self.x_prev = self.x0
+		self.Nbr = self.r.size
+		self.shape = sizes if start == 0 and stop == total else None
+
+	def run(self, progress = None, cancel = None) -> Result:
+		"""
+		Выполняет вычисление.
+
+		Args:
+			progress (method): Вызывается после каждого блока итераций
+				с аргументами (номер этапа, номер итерации, количество итераций)
+			cancel (method): Возвращает True для прекращения вычислений
+
+		Returns:
+			Result: Результаты вычисления
+		"""
+		# Уход в бесконечность обрабатывается исключением точек из расчёта
+		with np.errstate(over = 'ignore', invalid = 'ignore'):
+			return self.compute(progress, cancel)
+
+	def create_steppers(self, res: Result, track: bool = False) -> dict:
+		"""Создаёт объекты для расчёта шагов каждой функции."""
+		p = self.params
+		# Коэффициенты в типе вычисления, чтобы ядра не повышали точность
+		r = self.r.astype(p.dtype(), copy = False)
+		b = self.b.astype(p.dtype(), copy = False)
+		steppers = {name: Stepper(name, r, b, self.x0, res.log, track,
+			res.lsum.get(name), p.kernels(name), self.x_prev) for name in res.names}
+		# Учёт времени каждого шага ядер
+		if self.profiler is not None and self.profiler.kernels:
+			for name, stepper in steppers.items():
+				stepper.kernel = self.profiler.wrap('kernel_' + name, stepper.kernel)
+				stepper.tangent = self.profiler.wrap('tangent_' + name, stepper.tangent)
+		return steppers
+
+	def compute(self, progress, cancel) -> Result:
+		"""Выполняет вычисление (см. run)."""
+		p = self.params
+		names = p.names()
+		res = Result(names, self.r, self.b, p.n_iter, p.n_draw, self.shape,
+			p.lyapunov, Storage(p.storage_dir), p.dtype(),
+			self.axes if self.shape is not None else None)
+		track = p.tol > 0
+		steppers = self.create_steppers(res, track)
+		first = 0
+		if self.checkpoint is not None:
+			# Продолжение этапа установления с контрольной точки
+			cp = self.checkpoint
+			first = cp.n_iter + 1
+			for name in names:
+				steppers[name].restore(cp.x0[name], cp.x1[name], first)
+			res.log.merge(cp.log)
+		# Получение устойчивых предельных значений
+		total = p.n_iter + 1
+		t = time.perf_counter()
+		for i in range(first, total, BLOCK_SIZE):
+			if cancel is not None and cancel():
+				res.is_cancelled = True
+				return res
+			steps = min(BLOCK_SIZE, total - i)
+			# Проверка сходимости в блоке, пересекающем границу check_every
+			check = track and steps >= HISTORY and (i + steps) // p.check_every > i // p.check_every
+			for name in names:
+				steppers[name].advance(steps, HISTORY if check else 0)
+				if check:
+					steppers[name].freeze(p.tol, total)
+			if check and all(s.idx.size == 0 for s in steppers.values()):
+				# Все траектории сошлись или ушли в бесконечность
+				if progress is not None:
+					progress(PHASE_ITER, total - 1, total)
+				break
+			if progress is not None:
+				progress(PHASE_ITER, i + steps - 1, total)
+		if self.profiler is not None:
+			self.profiler.phase('phase_iter', time.perf_counter() - t, max(total - first, 0))
+		# Установка начальных значений x[n-1] и x[n]
+		rows = {name: res.rows(name) for name in names}
+		for name in names:
+			steppers[name].start_draw(rows[name])
+		self.draw(res, steppers, rows, 0, progress, cancel)
+		return res
+
+	def draw(self, res: Result, steppers: dict, rows: dict, first: int,
+			progress, cancel):
+		"""
+		Рассчитывает значения для вывода на график, начиная со строки first + 2.
+
+		Args:
+			res (Result): Результаты вычисления
+			steppers (dict): Объекты для расчёта шагов каждой функции
+			rows (dict): Таблицы траекторий каждой функции
+			first (int): Количество уже рассчитанных итераций отрисовки
+			progress, cancel (method): См. run
+		"""
+		t = time.perf_counter()
+		for i in range(first, res.n_draw, BLOCK_SIZE):
+			if cancel is not None and cancel():
+				break
+			steps = min(BLOCK_SIZE, res.n_draw - i)
+			for name in res.names:
+				steppers[name].fill(rows[name], i, steps)
+			res.n_done = i + steps
+			if progress is not None:
+				progress(PHASE_DRAW, i + steps - 1, res.n_draw)
+			if self.on_draw is not None:
+				self.on_draw(res)
+		if self.profiler is not None:
+			self.profiler.phase('phase_draw', time.perf_counter() - t, max(res.n_done - first, 0))
+
+	def extend(self, prev: Result, progress = None, cancel = None) -> Result:
+		"""
+		Продолжает рассчитанную траекторию до n_draw итераций отрисовки.
+		Рассчитываются только новые итерации.
+
+		Показатель Ляпунова продолжает накапливаться, но вектор возмущения
+		задаётся заново, поэтому он может немного отличаться от полного расчёта.
+
+		Args:
+			prev (Result): Результаты вычисления с теми же параметрами,
+				кроме меньшего n_draw
+			progress, cancel (method): См. run
+
+		Returns:
+			Result: Результаты вычисления
+		"""
+		p = self.params
+		res = Result(prev.names, prev.r, prev.b, prev.n_iter, p.n_draw, prev.shape,
+			bool(prev.lsum), Storage(p.storage_dir), prev.dtype, prev.axes)
+		first = prev.n_done
+		res.n_done = first
+		res.log.merge(prev.log)
+		rows = {name: res.rows(name) for name in res.names}
+		for name in res.names:
+			rows[name][:first + 2] = prev.rows(name)[:first + 2]
+			if name in res.lsum:
+				res.lsum[name][:] = prev.lsum[name]
+		steppers = self.create_steppers(res)
+		with np.errstate(over = 'ignore', invalid = 'ignore'):
+			for name in res.names:
+				steppers[name].restore(rows[name][first], rows[name][first + 1],
+					prev.n_iter + 1 + first)
+				steppers[name].start_draw(rows[name], first)
+			self.draw(res, steppers, rows, first, progress, cancel)
+		return res
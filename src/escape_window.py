@@ -0,0 +1,39 @@
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from src.engine import Result
+
+
+class EscapeMap(tk.Toplevel):
+	"""Окно с картой времени ухода траекторий в бесконечность."""
+	def __init__(self, parent, res: Result, fn: str, fontsize: int):
+		"""
+		Окно с картой времени ухода траекторий в бесконечность.
+
+		Attributes:
+			parent: Родительское окно
+			res (Result): Результаты вычисления
+			fn (str): Имя файла с сохранённым логом
+			fontsize (int): Размер заголовка и подписей на осях графика
+		"""
+		super().__init__(parent)
+		self.geometry('800x500')
+		self.title('Уход траекторий в бесконечность')
+		tk.Label(self, text = f'Лог сохранён: {fn}').pack(anchor = tk.W)
+		fig = Figure()
+		fig.subplots_adjust(left = 0.09, bottom = 0.1, right = 0.97, top = 0.9, wspace = 0.3)
+		for k, name in enumerate(res.names):
+			axis = fig.add_subplot(1, len(res.names), k + 1)
+			# Строки - значения второй оси сетки (b), столбцы - первой (r)
+			table, (xl, xv), (yl, yv) = res.plane(res.escape_map(name))
+			img = axis.imshow(table.T, origin = 'lower',
+				extent = [xv.min(), xv.max(), yv.min(), yv.max()], aspect = 'auto',
+				interpolation = 'nearest')
+			fig.colorbar(img, ax = axis)
+			axis.set_title(f'{name}: номер итерации ухода', fontsize = fontsize)
+			axis.set_xlabel(xl, fontsize = fontsize)
+			axis.set_ylabel(yl, fontsize = fontsize)
+		canvas = FigureCanvasTkAgg(fig, master = self)
+		canvas.draw()
+		canvas.get_tk_widget().pack(fill = tk.BOTH, expand = 1)
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+EVENT_POLL = 50
+"""Период проверки очереди событий в основном потоке, мс."""
+
+PROGRESS_INTERVAL = 0.1
+"""Наименьший интервал между событиями прогресса вычисления, с."""
+
+
+class EventChannel:
+	"""
+	Передаёт события из рабочих потоков в основной поток Tk.
+
+	Событие - это функция с аргументами: рабочий поток помещает её
+	в потокобезопасную очередь, а основной поток периодически (через after)
+	выполняет все накопленные события, поэтому элементы Tk изменяются
+	только из основного потока.
+
+	Attributes:
+		root (tk.Tk): Окно, в цикле событий которого выполняются обработчики
+		queue (queue.SimpleQueue): Очередь событий
+	"""
+
+	def __init__(self, root):
+		"""
+		Запускает периодическую проверку очереди.
+
+		Args:
+			root (tk.Tk): Окно, в цикле событий которого выполняются обработчики
+		"""
+		self.root = root
+		self.queue = queue.SimpleQueue()
+		self.root.after(EVENT_POLL, self.poll)
+
+	def post(self, func, *args):
+		"""
+		Помещает событие в очередь (можно вызывать из любого потока).
+
+		Args:
+			func (method): Обработчик события
+			args: Аргументы обработчика
+		"""
+		self.queue.put((func, args))
+
+	def poll(self):
+		"""Выполняет накопленные события (в основном потоке)."""
+		try:
+			while True:
+				try:
+					func, args = self.queue.get_nowait()
+				except queue.Empty:
+					break
+				func(*args)
+		finally:
+			self.root.after(EVENT_POLL, self.poll)
+
+
+class Flag:
+	"""
+	Потокобезопасный флаг с интерфейсом переменной Tk (get/set).
+
+	Attributes:
+		event (threading.Event): Состояние флага
+	"""
+
+	def __init__(self, value: bool = False):
+		"""
+		Создаёт флаг.
+
+		Args:
+			value (bool): Начальное значение
+		"""
+		self.event = threading.Event()
+		self.set(value)
+
+	def get(self) -> bool:
+		"""Возвращает значение флага."""
+		return self.event.is_set()
+
+	def set(self, value: bool):
+		"""Устанавливает значение флага."""
+		if value:
+			self.event.set()
+		else:
+			self.event.clear()
@@ -0,0 +1,481 @@
+import ast
+import numpy as np
+from functools import lru_cache
+
+FUNCTIONS = {
+	'abs': 'np.absolute',
+	'sqrt': 'np.sqrt',
+	'exp': 'np.exp',
+	'log': 'np.log',
+	'sin': 'np.sin',
+	'cos': 'np.cos',
+	'tanh': 'np.tanh',
+	'sign': 'np.sign'
+}
+"""Функции, допустимые в формулах, и соответствующие им ufunc."""
+
+OPERATORS = {
+	ast.Add: 'np.add',
+	ast.Sub: 'np.subtract',
+	ast.Mult: 'np.multiply',
+	ast.Div: 'np.divide'
+}
+"""Операторы, допустимые в формулах, и соответствующие им ufunc."""
+
+FORMULA_COLORS = [('m', 'purple'), ('g', 'darkgreen'), ('y', 'olive'),
+	('tab:brown', 'saddlebrown'), ('gray', 'k')]
+"""Цвета старых и новых точек пользовательских формул (по порядку в settings.json)."""
+
+
+class FormulaError(ValueError):
+	"""Ошибка в тексте пользовательской формулы."""
+
+
+def const(value: float) -> ast.Constant:
+	"""Возвращает узел числа."""
+	return ast.Constant(float(value))
+
+
+def is_const(node: ast.expr, value: float = None) -> bool:
+	"""Является ли узел числом (равным value, если оно задано)?"""
+	return isinstance(node, ast.Constant) and (value is None or node.value == value)
+
+
+def neg(a: ast.expr) -> ast.expr:
+	"""Возвращает -a (с упрощением)."""
+	if is_const(a):
+		return const(-a.value)
+	if isinstance(a, ast.UnaryOp):
+		return a.operand
+	return ast.UnaryOp(ast.USub(), a)
+
+
+def add(a: ast.expr, b: ast.expr) -> ast.expr:
+	"""Возвращает a + b (с упрощением)."""
+	if is_const(a) and is_const(b):
+		return const(a.value + b.value)
+	if is_const(a, 0):
+		return b
+	if is_const(b, 0):
+		return a
+	if isinstance(b, ast.UnaryOp):
+		return sub(a, b.operand)
+	if isinstance(a, ast.UnaryOp):
+		return sub(b, a.operand)
+	return ast.BinOp(a, ast.Add(), b)
+
+
+def sub(a: ast.expr, b: ast.expr) -> ast.expr:
+	"""Возвращает a - b (с упрощением)."""
+	if is_const(a) and is_const(b):
+		return const(a.value - b.value)
+	if is_const(b, 0):
+		return a
+	if is_const(a, 0):
+		return neg(b)
+	if isinstance(b, ast.UnaryOp):
+		return add(a, b.operand)
+	return ast.BinOp(a, ast.Sub(), b)
+
+
+def mul(a: ast.expr, b: ast.expr) -> ast.expr:
+	"""Возвращает a * b (с упрощением)."""
+	if is_const(a) and is_const(b):
+		return const(a.value * b.value)
+	if is_const(a, 0) or is_const(b, 0):
+		return const(0)
+	if is_const(a, 1):
+		return b
+	if is_const(b, 1):
+		return a
+	if is_const(a, -1):
+		return neg(b)
+	if is_const(b, -1):
+		return neg(a)
+	# Знак выносится за произведение (a - (-b)c = a + bc)
+	if isinstance(a, ast.UnaryOp):
+		return neg(mul(a.operand, b))
+	if isinstance(b, ast.UnaryOp):
+		return neg(mul(a, b.operand))
+	return ast.BinOp(a, ast.Mult(), b)
+
+
+def div(a: ast.expr, b: ast.expr) -> ast.expr:
+	"""Возвращает a / b (с упрощением)."""
+	if is_const(a) and is_const(b) and b.value != 0:
+		return const(a.value / b.value)
+	if is_const(a, 0):
+		return const(0)
+	if is_const(b, 1):
+		return a
+	return ast.BinOp(a, ast.Div(), b)
+
+
+def power(a: ast.expr, p: float) -> ast.expr:
+	"""Возвращает a ** p для числа p (с упрощением)."""
+	if is_const(a) and not (a.value < 0 and p != int(p)):
+		# 0 ** -1, 10.0 ** 400 и т.п.
+		try:
+			return const(a.value ** p)
+		except ArithmeticError as e:
+			raise FormulaError(f'Недопустимое возведение в степень {a.value:g} ** {p:g}: {e}') from None
+	if p == 0:
+		return const(1)
+	if p == 1:
+		return a
+	return ast.BinOp(a, ast.Pow(), const(p))
+
+
+def call(func: str, a: ast.expr) -> ast.expr:
+	"""Возвращает вызов функции из FUNCTIONS."""
+	return ast.Call(ast.Name(func, ast.Load()), [a], [])
+
+
+def parse(text: str, names: dict) -> ast.expr:
+	"""
+	Разбирает формулу и приводит её к дереву из чисел, переменных,
+	операторов OPERATORS, возведения в числовую степень и функций FUNCTIONS.
+
+	Args:
+		text (str): Текст формулы (x[n-1], x[n] или x, r, b, ...)
+		names (dict): Допустимые переменные (имя в формуле -> имя в ядре;
+			x[n] и x[n-1] записываются в names как 'x[n]' и 'x[n-1]')
+
+	Returns:
+		ast.expr: Дерево формулы
+	"""
+	try:
+		tree = ast.parse(text.strip(), mode = 'eval').body
+	except SyntaxError as e:
+		raise FormulaError(f'Синтаксическая ошибка в формуле "{text}": {e.msg}') from None
+	return normalize(tree, names, text)
+
+
+def normalize(node: ast.expr, names: dict, text: str) -> ast.expr:
+	"""Проверяет и упрощает узел формулы (см. parse)."""
+	if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+			and not isinstance(node.value, bool):
+		return const(node.value)
+	if isinstance(node, ast.Name):
+		if node.id in names:
+			return ast.Name(names[node.id], ast.Load())
+		raise FormulaError(f'Неизвестная переменная "{node.id}" в формуле "{text}"')
+	if isinstance(node, ast.Subscript):
+		# x[n] и x[n-1]
+		key = ast.unparse(node).replace(' ', '')
+		if key in names:
+			return ast.Name(names[key], ast.Load())
+		raise FormulaError(f'Недопустимое значение "{key}" в формуле "{text}"')
+	if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+		a = normalize(node.operand, names, text)
+		return neg(a) if isinstance(node.op, ast.USub) else a
+	if isinstance(node, ast.BinOp):
+		a = normalize(node.left, names, text)
+		b = normalize(node.right, names, text)
+		if isinstance(node.op, ast.Pow):
+			if not is_const(b):
+				raise FormulaError(f'Показатель степени должен быть числом в формуле "{text}"')
+			return power(a, b.value)
+		ops = {ast.Add: add, ast.Sub: sub, ast.Mult: mul, ast.Div: div}
+		if type(node.op) in ops:
+			return ops[type(node.op)](a, b)
+	if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+			and node.func.id in FUNCTIONS and len(node.args) == 1 and not node.keywords:
+		return call(node.func.id, normalize(node.args[0], names, text))
+	raise FormulaError(f'Недопустимое выражение "{ast.unparse(node)}" в формуле "{text}"')
+
+
+def substitute(node: ast.expr, name: str, value: ast.expr) -> ast.expr:
+	"""Заменяет переменную name в дереве формулы на дерево value."""
+	class Replace(ast.NodeTransformer):
+		def visit_Name(self, n):
+			return value if n.id == name else n
+	return Replace().visit(node)
+
+
+def derivative(node: ast.expr, var: str) -> ast.expr:
+	"""
+	Возвращает частную производную формулы по переменной (для касательного отображения).
+
+	Args:
+		node (ast.expr): Дерево формулы (см. parse)
+		var (str): Имя переменной в ядре
+
+	Returns:
+		ast.expr: Дерево производной
+	"""
+	if isinstance(node, ast.Constant):
+		return const(0)
+	if isinstance(node, ast.Name):
+		return const(1 if node.id == var else 0)
+	if isinstance(node, ast.UnaryOp):
+		return neg(derivative(node.operand, var))
+	if isinstance(node, ast.Call):
+		a = node.args[0]
+		da = derivative(a, var)
+		if is_const(da, 0):
+			return da
+		func = node.func.id
+		if func == 'abs':
+			return mul(call('sign', a), da)
+		if func == 'sqrt':
+			return div(da, mul(const(2), node))
+		if func == 'exp':
+			return mul(node, da)
+		if func == 'log':
+			return div(da, a)
+		if func == 'sin':
+			return mul(call('cos', a), da)
+		if func == 'cos':
+			return neg(mul(call('sin', a), da))
+		if func == 'tanh':
+			return mul(sub(const(1), power(node, 2)), da)
+		return const(0) # sign - кусочно-постоянная
+	a, b = node.left, node.right
+	da = derivative(a, var)
+	if isinstance(node.op, ast.Pow):
+		return mul(mul(const(b.value), power(a, b.value - 1)), da)
+	db = derivative(b, var)
+	if isinstance(node.op, ast.Add):
+		return add(da, db)
+	if isinstance(node.op, ast.Sub):
+		return sub(da, db)
+	if isinstance(node.op, ast.Mult):
+		return add(mul(da, b), mul(a, db))
+	# Деление
+	if is_const(db, 0):
+		return div(da, b)
+	return div(sub(mul(da, b), mul(a, db)), mul(b, b))
+
+
+class KernelBuilder:
+	"""
+	Формирует текст ядра, которое вычисляет формулу последовательностью
+	ufunc с параметром out, без создания временных массивов.
+
+	Промежуточные значения хранятся в массиве out, tmp и дополнительных
+	массивах work0, work1, ...: их количество - наименьшее необходимое
+	для формулы (порядок вычисления по числу Сети-Ульмана).
+
+	Attributes:
+		lines (list): Строки тела ядра
+		free (list): Свободные вспомогательные массивы
+		used (int): Количество использованных вспомогательных массивов (с tmp)
+	"""
+
+	def __init__(self):
+		"""Создаёт пустое ядро."""
+		self.lines = []
+		self.free = []
+		self.used = 0
+
+	def alloc(self) -> str:
+		"""Возвращает имя свободного вспомогательного массива."""
+		if self.free:
+			return self.free.pop()
+		name = 'tmp' if self.used == 0 else f'work{self.used - 1}'
+		self.used += 1
+		return name
+
+	@staticmethod
+	def is_leaf(node: ast.expr) -> bool:
+		"""Не требует ли узел вычисления (переменная или число)?"""
+		return isinstance(node, (ast.Name, ast.Constant))
+
+	@staticmethod
+	def operand(node: ast.expr) -> str:
+		"""Возвращает запись переменной или числа в тексте ядра."""
+		return node.id if isinstance(node, ast.Name) else repr(node.value)
+
+	def need(self, node: ast.expr) -> int:
+		"""Количество массивов для вычисления узла (число Сети-Ульмана)."""
+		if self.is_leaf(node):
+			return 0
+		if isinstance(node, ast.UnaryOp):
+			return max(1, self.need(node.operand))
+		if isinstance(node, ast.Call):
+			return max(1, self.need(node.args[0]))
+		a, b = self.need(node.left), self.need(node.right)
+		if a == 0 or b == 0:
+			return max(1, a, b)
+		return a + 1 if a == b else max(a, b)
+
+	def value(self, node: ast.expr, target: str) -> str:
+		"""Возвращает запись значения узла (вычисляя его в target, если это не переменная)."""
+		if self.is_leaf(node):
+			return self.operand(node)
+		self.emit(node, target)
+		return target
+
+	def emit(self, node: ast.expr, target: str):
+		"""Добавляет строки, записывающие значение узла в массив target."""
+		if self.is_leaf(node):
+			self.lines.append(f'np.copyto({target}, {self.operand(node)})')
+		elif isinstance(node, ast.UnaryOp):
+			a = self.value(node.operand, target)
+			self.lines.append(f'np.negative({a}, out = {target})')
+		elif isinstance(node, ast.Call):
+			a = self.value(node.args[0], target)
+			self.lines.append(f'{FUNCTIONS[node.func.id]}({a}, out = {target})')
+		elif isinstance(node.op, ast.Pow):
+			a = self.value(node.left, target)
+			p = node.right.value
+			if p == 2:
+				self.lines.append(f'np.square({a}, out = {target})')
+			elif p == 0.5:
+				self.lines.append(f'np.sqrt({a}, out = {target})')
+			else:
+				self.lines.append(f'np.power({a}, {p!r}, out = {target})')
+		else:
+			left, right = node.left, node.right
+			if self.is_leaf(left) or self.is_leaf(right):
+				a = self.value(left, target)
+				b = self.value(right, target)
+			else:
+				# Более сложный операнд вычисляется первым прямо в target
+				# (его вспомогательные массивы освобождаются до вычисления второго)
+				if self.need(left) >= self.need(right):
+					a = self.value(left, target)
+					other = self.alloc()
+					b = self.value(right, other)
+				else:
+					b = self.value(right, target)
+					other = self.alloc()
+					a = self.value(left, other)
+				self.free.append(other)
+			self.lines.append(f'{OPERATORS[type(node.op)]}({a}, {b}, out = {target})')
+
+	def build(self, name: str, args: list, node: ast.expr, doc: str):
+		"""
+		Создаёт функцию ядра.
+
+		Args:
+			name (str): Имя функции
+			args (list): Имена входных массивов (перед out, tmp)
+			node (ast.expr): Дерево формулы
+			doc (str): Описание ядра
+
+		Returns:
+			method: Ядро с атрибутами temps (количество массивов work) и source (текст)
+		"""
+		self.emit(node, 'out')
+		temps = max(self.used - 1, 0)
+		params = ', '.join(args + ['out', 'tmp'] + [f'work{k}' for k in range(temps)])
+		source = f'def {name}({params}):\n' + ''.join(f'\t{line}\n' for line in self.lines) + '\treturn out\n'
+		scope = {'np': np}
+		exec(compile(source, f'<{name}>', 'exec'), scope)
+		kernel = scope[name]
+		kernel.__doc__ = doc
+		kernel.temps = temps
+		kernel.source = source
+		return kernel
+
+
+@lru_cache(maxsize = None)
+def compile_formula(x: str, y: str = None) -> tuple:
+	"""
+	Разбирает и проверяет формулу, создаёт ядро расчёта шага
+	и ядро касательного отображения (результат кэшируется по тексту формулы).
+
+	Формула задаёт x[n+1] через x[n-1], x[n] (или x), r и b.
+	Двумерное отображение задаётся формулами x и y, где y[n+1] зависит только
+	от x[n], r и b: тогда y[n] выражается через x[n-1] и подставляется в формулу x.
+
+	Args:
+		x (str): Формула x[n+1]
+		y (str): Формула y[n+1] (None - формула x не использует y)
+
+	Returns:
+		tuple: (ядро шага, ядро касательного отображения) с сигнатурами
+			как у src.kernels.f1 и src.kernels.t1 и дополнительными массивами work
+	"""
+	names = {'x[n]': 'x1', 'x': 'x1', 'x[n-1]': 'x0', 'r': 'r', 'b': 'b'}
+	if y is not None:
+		gy = parse(y, {'x[n]': 'x1', 'x': 'x1', 'r': 'r', 'b': 'b'})
+		names['y'] = 'y'
+	node = parse(x, names)
+	if y is not None:
+		# y[n] = g(x[n-1], r, b)
+		node = substitute(node, 'y', substitute(gy, 'x1', ast.Name('x0', ast.Load())))
+	doc = f'x[n+1] = {x}' + ('' if y is None else f'; y[n+1] = {y}')
+	kernel = KernelBuilder().build('kernel', ['x0', 'x1', 'r', 'b'], node, doc)
+	# w[n+1] = df/dx[n] * w[n] + df/dx[n-1] * w[n-1]
+	w1 = ast.Name('w1', ast.Load())
+	w0 = ast.Name('w0', ast.Load())
+	tnode = add(mul(derivative(node, 'x1'), w1), mul(derivative(node, 'x0'), w0))
+	tangent = KernelBuilder().build('tangent', ['x0', 'x1', 'r', 'b', 'w0', 'w1'], tnode,
+		'Касательное отображение: ' + doc)
+	return kernel, tangent
+
+
+def load_formulas(definitions: list) -> tuple:
+	"""
+	Проверяет пользовательские формулы из раздела formulas файла settings.json.
+
+	Args:
+		definitions (list): Описания формул ({'name', 'label', 'x', 'y'})
+
+	Returns:
+		tuple: (формулы без ошибок, список текстов ошибок)
+	"""
+	valid = []
+	errors = []
+	for d in definitions:
+		name = d.get('name')
+		try:
+			if not name or name in ('f1', 'f2') or name in [v['name'] for v in valid]:
+				raise FormulaError(f'Имя формулы "{name}" не задано или уже занято')
+			compile_formula(d['x'], d.get('y'))
+			valid.append(d)
+		except (FormulaError, KeyError, ArithmeticError) as e:
+			errors.append(f'{name}: {e}')
+	return valid, errors
+
+
+def formula_specs(names: list, definitions: list) -> dict:
+	"""
+	Возвращает формулы для параметров вычисления по именам.
+
+	Args:
+		names (list): Имена включённых пользовательских формул
+		definitions (list): Описания формул из settings.json
+
+	Returns:
+		dict: Для каждого имени - формулы x и y (то, от чего зависит результат)
+	"""
+	by_name = {d['name']: d for d in definitions}
+	specs = {}
+	for name in names:
+		if name not in by_name:
+			raise FormulaError(f'Формула "{name}" не найдена в разделе formulas')
+		d = by_name[name]
+		specs[name] = {'x': d['x'], 'y': d.get('y')}
+	return specs
+
+
+def formula_style(settings: dict, name: str, definitions: list) -> dict:
+	"""
+	Возвращает настройки линий функции на графике: для f1 и f2 - из раздела
+	графика, для пользовательской формулы - по образцу f1 с её именем и цветами.
+
+	Args:
+		settings (dict): Настройки графика (раздел NX, XX или RX)
+		name (str): Имя функции
+		definitions (list): Описания формул из settings.json
+
+	Returns:
+		dict: Настройки labelN, colorN, markerN, markersizeN (N = 1, 2)
+	"""
+	if name in settings:
+		return settings[name]
+	names = [d['name'] for d in definitions]
+	k = names.index(name) if name in names else 0
+	d = definitions[k] if name in names else {}
+	colors = FORMULA_COLORS[k % len(FORMULA_COLORS)]
+	s = dict(settings['f1'])
+	for n in (1, 2):
+		# Подпись '1) x[n]' -> '<имя>) x[n]'
+		suffix = s[f'label{n}'].split(') ', 1)[-1]
+		s[f'label{n}'] = f'{name}) {suffix}'
+		s[f'color{n}'] = d.get(f'color{n}', colors[n - 1])
+	return s
@@ -7,18 +7,21 @@ HELP_PAGE1 = """
     В правой области расположены компоненты для установки параметров, определяющих поведение графиков (комбинации Ctrl+C, Ctrl+V работают только на английской раскладке).
 - сначала идёт выбор формул, по которым нужно рисовать;
 - параметры r и b задаются диапазонами. Для установки одного числа надо повторить значения. В качестве знака разделителя используется точка;
-- параметр х[0] задаёт начальные значения;
+- параметр х[0] задаёт начальное значение, а если задать его диапазоном, то траектории рассчитываются для каждого начального значения (на бифуркационной диаграмме видны сосуществующие аттракторы). Если отметить x[-1], то значение x[-1] (тоже число или диапазон) задаётся отдельно, иначе оно равно x[0];
 - далее указывается сколько итераций надо проделать без отрисовки и сколько с ней;
 - список значений по умолчанию зависит от содержимого параметра defaults в файле settings.json;
 - длина задержки отрисовки задается в миллисекундах;
 - последним выбирается тип графика, который надо отрисовать, также присутствует возможность вывести сочетания предыдущих графиков одновременно. 
     По нажатию кнопки «Отобразить» сначала пройдет вычисление всех точек (как без отрисовки, так и с ней). В этот момент текст кнопки сменится на «Завершить вычисление», а прогресс-бар будет показывать сколько всего итераций прошло (на установление устойчивости значений + подсчёт точек для отображения). Если прервать операцию на моменте установления устойчивости, процесс завершится сразу, иначе будут отображены те точки, которые успели вычислить.
-    При завершении вычисления может появиться сообщение о найденных исключениях, если ответить «Да», то отроется блокнот с файлом error.txt, который каждый раз перезаписывается (при ошибках). После закрытия блокнота продолжится выполнение программы (начнется отрисовка полученных точек). Во время отрисовки появится возможность «Завершить анимацию" или же поставить её на «Паузу», а затем «Продолжить».
+    Траектории, ушедшие в бесконечность, исключаются из расчёта и не отображаются на графиках. При завершении вычисления может появиться сообщение о таких траекториях: их лог (номер итерации, точка сетки, последние конечные значения) сохраняется в подкаталог logs (в файл, имя которого определяется параметрами вычисления), а если ответить «Да», то откроется окно с картой времени ухода по значениям r и b. После ответа продолжится выполнение программы (начнется отрисовка полученных точек). Во время отрисовки появится возможность «Завершить анимацию" или же поставить её на «Паузу», а затем «Продолжить».
+    Кнопка «Карта периодов» открывает окно с периодом траектории (по последним значениям этапа отрисовки) для каждой пары значений r и b: -1 - уход в бесконечность, 0 - период не найден (квазипериодический или хаотический режим).
+    Кнопка «Бассейны притяжения» рассчитывает по параметрам формы карту бассейнов: сетка начальных значений x[0] и x[-1] (и коэффициентов) делится на плитки, которые рассчитываются на всех ядрах; после установления по последним итерациям определяется цикл каждой траектории, и точки сетки окрашиваются по аттрактору (циклы одного периода с совпадающими значениями), уходу в бесконечность или отсутствию цикла. Карта строится по первым двум осям сетки с несколькими значениями. Повторное нажатие прекращает расчёт.
+    Кнопка «Очередь вычислений» открывает окно фоновых вычислений: в очередь можно добавить параметры с формы, любой шаблон или сразу все шаблоны. Задания с большим приоритетом запускаются раньше, одновременно выполняется не больше job_workers заданий, а форма при этом остаётся доступной. Выбранное задание можно отменить (рассчитанные точки сохраняются) или удалить из списка, а по кнопке «Открыть» (или двойному щелчку) его параметры переносятся на форму и результаты отрисовываются без повторного вычисления.
 """
 
 HELP_PAGE2 = """
-    Приложение сохраняет файлы settings.json и error.txt в каталоге, указанного в файле main.py.
-    В файле настроек settings.json сначала задан размер заголовка и подписей на осях графика(fontsize), а за ним можно указать длительность задержки отрисовки по умолчанию (delay_time). После чего идут настройки отображений для графиков:
+    Приложение сохраняет файл settings.json и подкаталоги с логами, кэшем и отчётами в каталоге, указанного в файле main.py.
+    В файле настроек settings.json сначала задан размер заголовка и подписей на осях графика(fontsize), а за ним можно указать длительность задержки отрисовки по умолчанию (delay_time) и количество процессов для вычисления (workers, 0 - по числу ядер) и объём кэша результатов в памяти (cache_size, МБ), а также режим пошаговой отрисовки (incremental: при true в каждом кадре рисуются только новые точки, а старые сохраняются в фоне графика; при изменении размера окна или масштаба все точки перерисовываются один раз) и целевую скорость анимации (fps, итераций в секунду: если кадр рисуется дольше 1/fps секунды, то в кадр объединяются несколько итераций по измеренному времени отрисовки; 0 - всегда одна итерация в кадре), а параметр pipeline (true/false) включает запуск анимации по первым рассчитанным итерациям, пока остальные ещё вычисляются (границы графиков оцениваются по первым итерациям и расширяются, если следующие точки выходят за них; при расчёте показателя Ляпунова и в нескольких процессах анимация запускается после вычисления). Параметр profile (true/false) включает учёт времени: для каждого запуска в подкаталог profiles сохраняется отчёт JSON (время этапов, обновления графиков, кадров и перерисовки, объём траекторий), а итоги выводятся в строку состояния; параметр profile_kernels (true/false) добавляет в отчёт время каждого шага ядер f1/f2 (замедляет вычисление на малых сетках); параметр tracemalloc (true/false) добавляет в отчёт пиковый объём памяти (замедляет вычисление). Параметр job_workers задаёт количество одновременно выполняемых заданий очереди вычислений, а basin_workers - количество процессов для расчёта карты бассейнов притяжения (0 - по числу ядер). Повторный запуск с теми же параметрами берёт результат из кэша и сразу переходит к отрисовке, а вытесненные из памяти результаты сохраняются в подкаталог cache. Если изменено только количество итераций для отрисовки (в большую сторону), то продолжается уже рассчитанная траектория. Состояние после этапа установления сохраняется в подкаталог checkpoints, поэтому при тех же функциях, сетке и x[0] этот этап не повторяется (а при большем количестве итераций - продолжается). После чего идут настройки отображений для графиков:
 - График зависимостей (NX);
 - Фазовый портрет (XX);
 - Бифуркационная диаграмма (RX).
@@ -29,8 +32,11 @@ HELP_PAGE2 = """
     * тип линии/маркера (markerN),
     * размер маркеров (markersizeN).
 N = 1, 2 номер графика (для фазового портрета и бифуркационной диаграммы 2 номер - это отображение новых точек).
+Для пользовательских формул (раздел formulas) можно добавить группу с именем формулы, иначе используются настройки f1 с подписью по имени формулы и цветами из её описания (color1, color2) или из встроенного набора.
 - коэффициенты coef_xlim и coef_ylim позволяют задать масштаб рисунка, путем регулирования сводного пространства между краевыми точками и границами графика (относительно размера графика: axis.set_plim(p_1-coef(p_2 - p_1), p_2+coef(p_2 - p_1)), где p - x, y, 1 - min, 2 - max)
 - последнее значение (legend_loc) задает положение легенды.
+- для фазового портрета и бифуркационной диаграммы параметр density (true/false) включает отображение накопленных точек изображением плотности (двумерная гистограмма по пикселям графика с логарифмической шкалой) вместо отдельных маркеров - это быстрее при большом количестве точек.
+- для бифуркационной диаграммы параметр refine (true/false) включает уточнение при масштабировании: после изменения границ графика (инструментами панели) видимый интервал r пересчитывается в отдельном потоке с шагом по ширине графика в пикселях, и новые точки добавляются по мере расчёта (если шаг исходной сетки уже меньше, пересчёт не выполняется).
     Если удалить файл settings.json, то при запуске приложения он появится с исходными параметрами.
 """
 
@@ -42,10 +48,19 @@ HELP_PAGE3 = """
     "f2": <true - если данные подходят для 2 формулы, false - наоборот>,
     "r": [<начало>, <конец>, <шаг>],
     "b": [<начало>, <конец>, <шаг>],
-    "x0": <начальное значение>,
+    "x0": <начальное значение или [<начало>, <конец>, <шаг>]>,
     "n_iter": <кол-во итераций для достижения устойчивого состояния>,
     "n_draw": <кол-во итераций для отрисовки графиков>
 }
+    Дополнительно можно указать необязательные параметры: "tol" - точность определения сходимости траектории к неподвижной точке или циклу (0 - не проверять) и "check_every" - через сколько итераций проводить проверку. Сошедшиеся траектории исключаются из расчёта до начала отрисовки, а если сошлись все, то этап установления устойчивости завершается досрочно. Параметр "max_period" задаёт наибольший период траектории для карты периодов (по умолчанию 16). Если указать "lyapunov": true, то на этапе отрисовки дополнительно рассчитывается старший показатель Ляпунова, который отображается на бифуркационной диаграмме по правой оси. Для сеток, не помещающихся в оперативную память, можно указать "memmap": true - тогда траектории хранятся в файлах подкаталога storage (файлы прошлого вычисления удаляются при следующем запуске, кроме ещё используемых заданиями очереди). Параметр "x_prev" задаёт начальное значение x[-1] (число или диапазон, по умолчанию равно x[0]). Параметр "precision" задаёт точность вычисления и хранения траекторий: "float64" (по умолчанию) или "float32" (вдвое меньше памяти, уход в бесконечность наступает раньше - при значениях порядка 1E38).
+    Раздел formulas задаёт пользовательские отображения, которые отображаются на форме вместе с формулами 1 и 2:
+{
+    "name": "<имя формулы (латиница, не f1 и f2)>",
+    "label": "<подпись на форме>",
+    "x": "<формула x[n+1]>",
+    "y": "<необязательная формула y[n+1]>"
+}
+    В формуле x можно использовать x[n] (или x), x[n-1], r, b и y (если задана формула y), числа, операции + - * / ** (показатель степени - число) и функции abs, sqrt, exp, log, sin, cos, tanh, sign. Формула y может зависеть только от x[n], r и b: тогда y[n] подставляется в формулу x через x[n-1] (например, x: "1 - r*x**2 + y", y: "b*x" - то же, что формула 2). Формулы проверяются при запуске приложения (формулы с ошибками не отображаются) и один раз преобразуются в векторное ядро расчёта, а для показателя Ляпунова производные вычисляются по формуле. В шаблоне defaults включённые формулы перечисляются списком имён: "formulas": ["lozi"].
     Если удалить файл settings.json, то при запуске приложения он появится с исходными значениями по умолчанию.
 """
 
@@ -0,0 +1,215 @@
+import time
+import itertools
+from threading import Thread
+
+from src.engine import PHASE_ITER, PHASE_DRAW, Params
+from src.calculations import Calculator
+from src.cache import ResultCache
+from src.events import EventChannel, Flag
+
+# Состояния заданий
+QUEUED = 'в очереди'
+RUNNING = 'вычисляется'
+DONE = 'готово'
+CANCELLED = 'отменено'
+FAILED = 'ошибка'
+
+JOB_WORKERS = 1
+"""Количество одновременно выполняемых фоновых вычислений по умолчанию."""
+
+
+class Job:
+	"""
+	Фоновое вычисление с параметрами шаблона или формы.
+
+	Attributes:
+		id (int): Номер задания (по порядку добавления)
+		name (str): Название (имя шаблона или диапазоны r и b)
+		params (Params): Параметры вычисления
+		priority (int): Приоритет (задания с большим приоритетом запускаются раньше)
+		state (str): Состояние (QUEUED, RUNNING, DONE, CANCELLED, FAILED)
+		is_calc (Flag): Флаг для преждевременного прекращения вычисления
+		calc (Calculator): Результаты вычисления (None - ещё не рассчитаны)
+		error (str): Текст ошибки вычисления
+		phase (int): Номер текущего этапа вычисления
+		fraction (float): Доля выполнения текущего этапа
+		submitted (float): Время добавления в очередь
+		started (float): Время запуска вычисления
+		finished (float): Время завершения вычисления
+	"""
+
+	def __init__(self, id: int, name: str, params: Params, priority: int = 0):
+		"""
+		Создаёт задание в очереди.
+
+		Args:
+			id (int): Номер задания
+			name (str): Название
+			params (Params): Параметры вычисления
+			priority (int): Приоритет
+		"""
+		self.id = id
+		self.name = name
+		self.params = params
+		self.priority = priority
+		self.state = QUEUED
+		self.is_calc = Flag(True)
+		self.calc = None
+		self.error = None
+		self.phase = 0
+		self.fraction = 0.0
+		self.submitted = time.time()
+		self.started = None
+		self.finished = None
+
+	def on_progress(self, phase: int, i: int, total: int):
+		"""Сохраняет прогресс вычисления (в потоке вычисления)."""
+		self.phase = phase
+		self.fraction = (i + 1) / total if total > 0 else 1.0
+
+	def progress(self) -> str:
+		"""Возвращает описание прогресса для списка заданий."""
+		if self.state == RUNNING:
+			if self.phase == PHASE_ITER:
+				return f'установление {self.fraction:.0%}'
+			if self.phase == PHASE_DRAW:
+				return f'расчёт {self.fraction:.0%}'
+			return ''
+		if self.finished is not None and self.started is not None:
+			return f'{self.finished - self.started:.1f} с'
+		return ''
+
+	def has_result(self) -> bool:
+		"""Есть ли рассчитанные точки для отрисовки?"""
+		return (self.calc is not None and hasattr(self.calc, 'result')
+			and not self.calc.result.is_cancelled)
+
+
+class JobQueue:
+	"""
+	Очередь фоновых вычислений.
+
+	Задания запускаются по убыванию приоритета (при равном - по порядку
+	добавления), одновременно выполняется не больше workers заданий.
+	Каждое задание вычисляется в отдельном потоке, а о завершении
+	сообщает в основной поток через канал событий, где запускается следующее.
+	Завершённые задания остаются в списке jobs до удаления (список результатов).
+
+	Attributes:
+		events (EventChannel): Канал событий для основного потока
+		save_dir (str): Каталог для сохранения файлов
+		cache (ResultCache): Кэш результатов вычисления
+		workers (int): Наибольшее количество одновременно выполняемых заданий
+		jobs (list): Все задания (по порядку добавления)
+		active (int): Количество потоков вычисления (отменённые задания
+			занимают место, пока их поток не завершится)
+		on_change (method): Функция оповещения об изменении состояния заданий
+		counter (itertools.count): Номера заданий
+	"""
+
+	def __init__(self, events: EventChannel, save_dir: str,
+			cache: ResultCache = None, workers: int = JOB_WORKERS):
+		"""
+		Создаёт пустую очередь.
+
+		Args:
+			events (EventChannel): Канал событий для основного потока
+			save_dir (str): Каталог для сохранения файлов
+			cache (ResultCache): Кэш результатов вычисления (None - без кэша)
+			workers (int): Наибольшее количество одновременно выполняемых заданий
+		"""
+		self.events = events
+		self.save_dir = save_dir
+		self.cache = cache
+		self.workers = max(int(workers), 1)
+		self.jobs = []
+		self.active = 0
+		self.on_change = None
+		self.counter = itertools.count(1)
+
+	def submit(self, name: str, params: Params, priority: int = 0) -> Job:
+		"""
+		Добавляет задание в очередь.
+
+		Args:
+			name (str): Название
+			params (Params): Параметры вычисления
+			priority (int): Приоритет
+
+		Returns:
+			Job: Задание
+		"""
+		job = Job(next(self.counter), name, params, priority)
+		self.jobs.append(job)
+		self.dispatch()
+		return job
+
+	def dispatch(self):
+		"""Запускает задания из очереди, пока есть свободные места."""
+		while self.active < self.workers:
+			queued = [job for job in self.jobs if job.state == QUEUED]
+			if not queued:
+				break
+			job = max(queued, key = lambda job: (job.priority, -job.id))
+			job.state = RUNNING
+			job.started = time.time()
+			self.active += 1
+			Thread(target = self.run, args = (job,), daemon = True).start()
+		self.changed()
+
+	def run(self, job: Job):
+		"""Выполняет вычисление задания (в отдельном потоке)."""
+		try:
+			job.calc = Calculator(job.params, self.save_dir, is_calc = job.is_calc,
+				cache = self.cache, progress_func = job.on_progress)
+		except Exception as e:
+			job.error = f'{type(e).__name__}: {e}'
+		finally:
+			self.events.post(self.finish, job)
+
+	def finish(self, job: Job):
+		"""Отмечает завершение задания и запускает следующие (в основном потоке)."""
+		self.active -= 1
+		job.finished = time.time()
+		if job.error is not None:
+			job.state = FAILED
+		elif job.state != CANCELLED:
+			job.state = DONE
+		self.dispatch()
+
+	def cancel(self, job: Job):
+		"""
+		Отменяет задание: из очереди оно удаляется сразу, а выполняемое
+		прекращается (рассчитанные точки остаются доступны для отрисовки).
+
+		Args:
+			job (Job): Задание
+		"""
+		if job.state == QUEUED:
+			job.state = CANCELLED
+			self.changed()
+		elif job.state == RUNNING:
+			job.state = CANCELLED
+			job.is_calc.set(False)
+			self.changed()
+
+	def set_priority(self, job: Job, priority: int):
+		"""Изменяет приоритет задания (учитывается при следующем запуске из очереди)."""
+		job.priority = priority
+		self.changed()
+
+	def remove(self, job: Job):
+		"""Удаляет завершённое задание из списка результатов."""
+		if job.state not in (QUEUED, RUNNING) and job in self.jobs:
+			self.jobs.remove(job)
+			self.changed()
+
+	def cancel_all(self):
+		"""Отменяет все задания (например, при закрытии приложения)."""
+		for job in self.jobs:
+			self.cancel(job)
+
+	def changed(self):
+		"""Оповещает об изменении состояния заданий."""
+		if self.on_change is not None:
+			self.on_change()
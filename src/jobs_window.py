@@ -0,0 +1,141 @@
+import tkinter as tk
+from tkinter.ttk import Combobox, Treeview, Scrollbar
+
+from src.jobs import QUEUED, RUNNING, Job, JobQueue
+
+JOBS_REFRESH = 500
+"""Период обновления прогресса в списке заданий, мс."""
+
+CURRENT = 'Текущие параметры формы'
+"""Пункт списка шаблонов для добавления параметров с формы."""
+
+
+class JobsWindow(tk.Toplevel):
+	"""Окно очереди фоновых вычислений и списка их результатов."""
+	def __init__(self, parent, jobs: JobQueue):
+		"""
+		Окно очереди фоновых вычислений и списка их результатов.
+
+		Attributes:
+			parent (App): Основное окно приложения (шаблоны, параметры формы и отрисовка)
+			jobs (JobQueue): Очередь фоновых вычислений
+		"""
+		super().__init__(parent)
+		self.geometry('800x400')
+		self.title('Очередь вычислений')
+		self.parent = parent
+		self.jobs = jobs
+		self.items = {} # Задания по идентификаторам строк списка
+		# Добавление задания
+		top = tk.Frame(self)
+		top.pack(fill = tk.X, padx = 3, pady = 3)
+		tk.Label(top, text = 'Параметры:').pack(side = tk.LEFT)
+		names = [CURRENT] + [d['name'] for d in parent.settings['defaults']]
+		self.preset = Combobox(top, values = names, state = 'readonly', width = 45)
+		self.preset.current(0)
+		self.preset.pack(side = tk.LEFT, padx = 3)
+		tk.Label(top, text = 'Приоритет:').pack(side = tk.LEFT)
+		self.priority = tk.IntVar(value = 0)
+		tk.Spinbox(top, from_ = -100, to = 100, textvariable = self.priority, width = 5).pack(side = tk.LEFT, padx = 3)
+		tk.Button(top, text = 'Добавить', command = self.add).pack(side = tk.LEFT, padx = 3)
+		tk.Button(top, text = 'Все шаблоны', command = self.add_all).pack(side = tk.LEFT)
+		# Список заданий
+		frame = tk.Frame(self)
+		frame.pack(fill = tk.BOTH, expand = 1, padx = 3)
+		columns = ('id', 'name', 'priority', 'state', 'progress')
+		self.tree = Treeview(frame, columns = columns, show = 'headings', selectmode = 'browse')
+		for column, text, width in zip(columns, ['№', 'Название', 'Приоритет', 'Состояние', 'Прогресс'],
+				[40, 380, 80, 100, 140]):
+			self.tree.heading(column, text = text)
+			self.tree.column(column, width = width, stretch = column == 'name')
+		vsb = Scrollbar(frame, command = self.tree.yview)
+		self.tree.configure(yscrollcommand = vsb.set)
+		self.tree.pack(side = tk.LEFT, fill = tk.BOTH, expand = 1)
+		vsb.pack(side = tk.LEFT, fill = tk.Y)
+		self.tree.bind('<Double-1>', lambda event: self.open())
+		# Действия с выбранным заданием
+		bottom = tk.Frame(self)
+		bottom.pack(fill = tk.X, padx = 3, pady = 3)
+		tk.Button(bottom, text = 'Приоритет +', command = lambda: self.change_priority(1)).pack(side = tk.LEFT)
+		tk.Button(bottom, text = 'Приоритет -', command = lambda: self.change_priority(-1)).pack(side = tk.LEFT, padx = 3)
+		tk.Button(bottom, text = 'Отменить', command = self.cancel).pack(side = tk.LEFT)
+		tk.Button(bottom, text = 'Удалить', command = self.remove).pack(side = tk.LEFT, padx = 3)
+		tk.Button(bottom, text = 'Открыть', command = self.open).pack(side = tk.RIGHT)
+		self.jobs.on_change = self.update_list
+		self.protocol('WM_DELETE_WINDOW', self.on_close)
+		self.update_list()
+		self.refresh()
+
+	def add(self):
+		"""Добавляет в очередь выбранный шаблон или параметры формы."""
+		k = self.preset.current()
+		if k == 0:
+			name, params = self.parent.get_job_params()
+		else:
+			name, params = self.parent.get_job_params(self.parent.settings['defaults'][k - 1])
+		self.jobs.submit(name, params, self.priority.get())
+
+	def add_all(self):
+		"""Добавляет в очередь все шаблоны."""
+		for d in self.parent.settings['defaults']:
+			name, params = self.parent.get_job_params(d)
+			self.jobs.submit(name, params, self.priority.get())
+
+	def selected(self) -> Job:
+		"""Возвращает выбранное задание (None - не выбрано)."""
+		selection = self.tree.selection()
+		return self.items.get(selection[0]) if selection else None
+
+	def change_priority(self, delta: int):
+		"""Изменяет приоритет выбранного задания."""
+		job = self.selected()
+		if job is not None:
+			self.jobs.set_priority(job, job.priority + delta)
+
+	def cancel(self):
+		"""Отменяет выбранное задание."""
+		job = self.selected()
+		if job is not None:
+			self.jobs.cancel(job)
+
+	def remove(self):
+		"""Удаляет выбранное завершённое задание из списка."""
+		job = self.selected()
+		if job is not None:
+			self.jobs.remove(job)
+
+	def open(self):
+		"""Отрисовывает результаты выбранного задания в основном окне."""
+		job = self.selected()
+		if job is not None and job.has_result():
+			self.parent.open_job(job)
+
+	def update_list(self):
+		"""Перестраивает список заданий."""
+		selected = self.selected()
+		self.tree.delete(*self.tree.get_children())
+		self.items = {}
+		for job in self.jobs.jobs:
+			item = self.tree.insert('', tk.END, values = self.values(job))
+			self.items[item] = job
+			if job is selected:
+				self.tree.selection_set(item)
+
+	def values(self, job: Job) -> tuple:
+		"""Возвращает значения строки списка для задания."""
+		state = job.state
+		if job.error is not None:
+			state += f' ({job.error})'
+		return (job.id, job.name, job.priority, state, job.progress())
+
+	def refresh(self):
+		"""Периодически обновляет прогресс выполняемых заданий."""
+		for item, job in self.items.items():
+			if job.state in (QUEUED, RUNNING):
+				self.tree.item(item, values = self.values(job))
+		self.after(JOBS_REFRESH, self.refresh)
+
+	def on_close(self):
+		"""Отключается от очереди и закрывает окно (задания продолжают выполняться)."""
+		self.jobs.on_change = None
+		self.destroy()
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+def f1(x0: np.array, x1: np.array, r: np.array, b: np.array,
+		out: np.array, tmp: np.array) -> np.array:
+	"""
+	Формула из методического указания:
+	x[n+1] = rx[n](1 - x[n]) - bx[n-1]
+
+	Вычисление выполняется без создания временных массивов.
+
+	Args:
+		x0 (np.array): Предыдущее значения x[n-1]
+		x1 (np.array): Текущее значения x[n]
+		r, b (np.array): Коэффициенты функции
+		out (np.array): Массив для записи x[n+1] (не должен совпадать с x0, x1)
+		tmp (np.array): Вспомогательный массив того же размера
+
+	Returns:
+		np.array: Новые значения x[n+1] (массив out)
+	"""
+	np.subtract(1, x1, out = tmp)
+	np.multiply(r, x1, out = out)
+	np.multiply(out, tmp, out = out)
+	np.multiply(b, x0, out = tmp)
+	np.subtract(out, tmp, out = out)
+	return out
+
+
+def f2(x0: np.array, x1: np.array, r: np.array, b: np.array,
+		out: np.array, tmp: np.array) -> np.array:
+	"""
+	Формула из стороннего источника:
+	x[n+1] = 1 - rx[n]^2 + y[n]
+	y[n+1] = bx[n]
+
+	Вычисление выполняется без создания временных массивов.
+
+	Args:
+		x0 (np.array): Предыдущее значения x[n-1]
+		x1 (np.array): Текущее значения x[n]
+		r, b (np.array): Коэффициенты функции
+		out (np.array): Массив для записи x[n+1] (не должен совпадать с x0, x1)
+		tmp (np.array): Вспомогательный массив того же размера
+
+	Returns:
+		np.array: Новые значения x[n+1] (массив out)
+	"""
+	np.multiply(x1, x1, out = tmp)
+	np.multiply(r, tmp, out = tmp)
+	np.subtract(1, tmp, out = out)
+	np.multiply(b, x0, out = tmp)
+	np.add(out, tmp, out = out)
+	return out
+
+
+def t1(x0: np.array, x1: np.array, r: np.array, b: np.array, w0: np.array,
+		w1: np.array, out: np.array, tmp: np.array) -> np.array:
+	"""
+	Касательное отображение функции №1 (матрица Якоби [[0, 1], [-b, r(1 - 2x[n])]]):
+	w[n+1] = r(1 - 2x[n])w[n] - bw[n-1]
+
+	Вычисление выполняется без создания временных массивов.
+
+	Args:
+		x0 (np.array): Предыдущее значения x[n-1] (матрица Якоби от него не зависит)
+		x1 (np.array): Текущее значения x[n]
+		r, b (np.array): Коэффициенты функции
+		w0 (np.array): Предыдущее значение возмущения w[n-1]
+		w1 (np.array): Текущее значение возмущения w[n]
+		out (np.array): Массив для записи w[n+1] (не должен совпадать с w0, w1)
+		tmp (np.array): Вспомогательный массив того же размера
+
+	Returns:
+		np.array: Новые значения w[n+1] (массив out)
+	"""
+	np.multiply(x1, -2, out = tmp)
+	np.add(tmp, 1, out = tmp)
+	np.multiply(r, tmp, out = tmp)
+	np.multiply(tmp, w1, out = out)
+	np.multiply(b, w0, out = tmp)
+	np.subtract(out, tmp, out = out)
+	return out
+
+
+def t2(x0: np.array, x1: np.array, r: np.array, b: np.array, w0: np.array,
+		w1: np.array, out: np.array, tmp: np.array) -> np.array:
+	"""
+	Касательное отображение функции №2 (матрица Якоби [[0, 1], [b, -2rx[n]]]):
+	w[n+1] = -2rx[n]w[n] + bw[n-1]
+
+	Вычисление выполняется без создания временных массивов.
+
+	Args:
+		x0 (np.array): Предыдущее значения x[n-1] (матрица Якоби от него не зависит)
+		x1 (np.array): Текущее значения x[n]
+		r, b (np.array): Коэффициенты функции
+		w0 (np.array): Предыдущее значение возмущения w[n-1]
+		w1 (np.array): Текущее значение возмущения w[n]
+		out (np.array): Массив для записи w[n+1] (не должен совпадать с w0, w1)
+		tmp (np.array): Вспомогательный массив того же размера
+
+	Returns:
+		np.array: Новые значения w[n+1] (массив out)
+	"""
+	np.multiply(x1, -2, out = tmp)
+	np.multiply(r, tmp, out = tmp)
+	np.multiply(tmp, w1, out = out)
+	np.multiply(b, w0, out = tmp)
+	np.add(out, tmp, out = out)
+	return out
+
+
+KERNELS = {'f1': f1, 'f2': f2}
+"""Ядра расчёта шага для каждой встроенной функции
+(ядра пользовательских формул создаются в src.formulas)."""
+
+TANGENTS = {'f1': t1, 'f2': t2}
+"""Ядра расчёта шага касательного отображения для каждой встроенной функции."""
@@ -0,0 +1,146 @@
+import os
+import copy
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.engine import PHASE_DRAW, Params, Result, Engine
+from src.storage import Storage
+from src.checkpoint import Checkpoint
+from src.profiler import Profiler
+
+SHARDS_PER_WORKER = 4
+"""Количество частей сетки на один процесс (для выравнивания нагрузки)."""
+
+MAX_SHARD_BYTES = 256 * 2**20
+"""Наибольший объём траекторий одной части сетки при хранении в файлах
+(части рассчитываются в памяти дочерних процессов)."""
+
+
+def cpu_count() -> int:
+	"""Возвращает количество доступных процессу ядер."""
+	if hasattr(os, 'sched_getaffinity'):
+		return len(os.sched_getaffinity(0))
+	return os.cpu_count() or 1
+
+
+def run_shard(params: Params, start: int, stop: int, checkpoint: Checkpoint = None,
+		kernels: bool = None) -> tuple:
+	"""
+	Выполняет вычисление для части сетки (в дочернем процессе).
+
+	Args:
+		params (Params): Параметры вычисления
+		start, stop (int): Диапазон точек сетки
+		checkpoint (Checkpoint): Состояние точек части сетки после этапа установления
+		kernels (bool): Учитывать ли время каждого шага ядер (None - без учёта времени)
+
+	Returns:
+		tuple: (start, stop, результаты вычисления части сетки,
+			участки отчёта о времени выполнения или None)
+	"""
+	engine = Engine(params, start, stop, checkpoint)
+	if kernels is not None:
+		engine.profiler = Profiler(kernels = kernels)
+	res = engine.run()
+	return start, stop, res, None if kernels is None else engine.profiler.sections
+
+
+class ParallelEngine(Engine):
+	"""
+	Выполняет вычисление, распределяя точки сетки по процессам.
+
+	Время этапов и ядер учитывается в каждом процессе и суммируется
+	по всем частям сетки (суммарное время процессов, а не общее время).
+
+	Attributes:
+		workers (int): Количество процессов
+	"""
+
+	def __init__(self, params: Params, checkpoint: Checkpoint = None):
+		"""
+		Подготавливает сетку коэффициентов.
+
+		Args:
+			params (Params): Параметры вычисления
+			checkpoint (Checkpoint): Состояние после этапа установления
+		"""
+		super().__init__(params, checkpoint = checkpoint)
+		self.workers = params.workers if params.workers > 0 else cpu_count()
+
+	def run(self, progress = None, cancel = None) -> Result:
+		"""
+		Выполняет вычисление.
+
+		Прогресс передаётся по мере завершения частей сетки.
+		При отмене нерассчитанные точки заполняются значением NaN.
+
+		Args:
+			progress (method): Вызывается после завершения каждой части сетки
+				с аргументами (номер этапа, номер части, количество частей)
+			cancel (method): Возвращает True для прекращения вычислений
+
+		Returns:
+			Result: Результаты вычисления
+		"""
+		p = self.params
+		res = Result(p.names(), self.r, self.b, p.n_iter, p.n_draw, self.shape,
+			p.lyapunov, Storage(p.storage_dir), p.dtype(), self.axes)
+		res.n_done = p.n_draw
+		shards = self.workers * SHARDS_PER_WORKER
+		if p.storage_dir is not None:
+			# Части сетки не должны превышать MAX_SHARD_BYTES
+			total_bytes = sum(x.nbytes for x in res.x.values())
+			shards = max(shards, -(-total_bytes // MAX_SHARD_BYTES))
+			# Дочерние процессы хранят свою часть в памяти
+			p = copy.copy(p)
+			p.storage_dir = None
+		bounds = np.linspace(0, self.Nbr, min(self.Nbr, shards) + 1).astype(int)
+		done = np.zeros(self.Nbr, dtype = bool)
+		kernels = None if self.profiler is None else self.profiler.kernels
+		with ProcessPoolExecutor(max_workers = self.workers) as pool:
+			pending = {pool.submit(run_shard, p, start, stop,
+					None if self.checkpoint is None else self.checkpoint.slice(start, stop), kernels)
+				for start, stop in zip(bounds[:-1], bounds[1:])}
+			total = len(pending)
+			while pending:
+				finished, pending = wait(pending, timeout = 0.1, return_when = FIRST_COMPLETED)
+				for future in finished:
+					start, stop, part, sections = future.result()
+					if sections is not None:
+						self.profiler.merge(sections)
+					# Склейка результатов в общую таблицу
+					for name in res.names:
+						res.rows(name)[:, start:stop] = part.rows(name)
+						if name in res.lsum:
+							res.lsum[name][start:stop] = part.lsum[name]
+					res.log.merge(part.log, start)
+					done[start:stop] = True
+					if progress is not None:
+						progress(PHASE_DRAW, total - len(pending) - 1, total)
+				if cancel is not None and cancel():
+					pool.shutdown(wait = False, cancel_futures = True)
+					break
+		if not done.all():
+			if not done.any():
+				res.is_cancelled = True
+			for name in res.names:
+				res.rows(name)[:, ~done] = np.nan
+				if name in res.lsum:
+					res.lsum[name][~done] = np.nan
+		return res
+
+
+def create_engine(params: Params, checkpoint: Checkpoint = None) -> Engine:
+	"""
+	Создаёт объект для вычисления в зависимости от количества процессов.
+
+	Args:
+		params (Params): Параметры вычисления
+		checkpoint (Checkpoint): Состояние после этапа установления
+
+	Returns:
+		Engine: Объект для вычисления
+	"""
+	if params.workers == 1:
+		return Engine(params, checkpoint = checkpoint)
+	return ParallelEngine(params, checkpoint)
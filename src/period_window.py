@@ -0,0 +1,49 @@
+import numpy as np
+import tkinter as tk
+from matplotlib import colormaps
+from matplotlib.colors import BoundaryNorm, ListedColormap
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from src.engine import Result
+from src.periods import PERIOD_CHAOS, PERIOD_ESCAPED
+
+
+class PeriodMap(tk.Toplevel):
+	"""Окно с картой периодов траекторий по значениям r и b (или начальным значениям)."""
+	def __init__(self, parent, res: Result, max_period: int, fontsize: int):
+		"""
+		Окно с картой периодов траекторий по значениям r и b (или начальным значениям).
+
+		Attributes:
+			parent: Родительское окно
+			res (Result): Результаты вычисления
+			max_period (int): Наибольший проверяемый период
+			fontsize (int): Размер заголовка и подписей на осях графика
+		"""
+		super().__init__(parent)
+		self.geometry('800x500')
+		self.title('Карта периодов')
+		tk.Label(self, text = f'{PERIOD_ESCAPED} - уход в бесконечность, '
+			f'{PERIOD_CHAOS} - период не найден (больше {max_period} или хаос)').pack(anchor = tk.W)
+		fig = Figure()
+		fig.subplots_adjust(left = 0.09, bottom = 0.1, right = 0.97, top = 0.9, wspace = 0.3)
+		# Отдельный цвет для каждого кода: уход, хаос, периоды 1..max_period
+		colors = colormaps['tab20'](np.arange(max_period) % 20)
+		cmap = ListedColormap(np.vstack([[[1, 1, 1, 1], [0, 0, 0, 1]], colors]))
+		bounds = np.arange(PERIOD_ESCAPED, max_period + 1) - 0.5
+		norm = BoundaryNorm(np.append(bounds, max_period + 0.5), cmap.N)
+		for k, name in enumerate(res.names):
+			axis = fig.add_subplot(1, len(res.names), k + 1)
+			# Строки - значения второй оси сетки (b), столбцы - первой (r)
+			table, (xl, xv), (yl, yv) = res.plane(res.periods(name, max_period))
+			img = axis.imshow(table.T, origin = 'lower',
+				extent = [xv.min(), xv.max(), yv.min(), yv.max()], aspect = 'auto',
+				interpolation = 'nearest', cmap = cmap, norm = norm)
+			fig.colorbar(img, ax = axis, ticks = np.arange(PERIOD_ESCAPED, max_period + 1))
+			axis.set_title(f'{name}: период траектории', fontsize = fontsize)
+			axis.set_xlabel(xl, fontsize = fontsize)
+			axis.set_ylabel(yl, fontsize = fontsize)
+		canvas = FigureCanvasTkAgg(fig, master = self)
+		canvas.draw()
+		canvas.get_tk_widget().pack(fill = tk.BOTH, expand = 1)
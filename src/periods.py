@@ -0,0 +1,46 @@
+import numpy as np
+
+PERIOD_CHAOS = 0
+"""Код точки сетки без найденного периода (квазипериодический или хаотический режим)."""
+
+PERIOD_ESCAPED = -1
+"""Код точки сетки, траектория которой ушла в бесконечность."""
+
+PERIOD_TOL = 1e-6
+"""Допустимое отклонение значений x[n] за период."""
+
+
+def detect_periods(rows: np.array, max_period: int, tol: float = PERIOD_TOL) -> np.array:
+	"""
+	Определяет период траектории для каждой точки сетки.
+
+	Проверяются последние 2 * max_period строк таблицы: для каждого
+	периода p значения x[n] и x[n-p] сравниваются построчно от конца окна
+	к началу, и на каждом шаге остаются только подходящие точки, поэтому
+	хаотические траектории отсеиваются после первых сравнений. Каждой точке
+	присваивается наименьший подходящий период.
+
+	Args:
+		rows (np.array): Таблица траектории (номер строки n, точка сетки)
+		max_period (int): Наибольший проверяемый период
+		tol (float): Допустимое отклонение значений за период
+
+	Returns:
+		np.array: Коды точек сетки: 1..max_period - период,
+			PERIOD_CHAOS - период не найден, PERIOD_ESCAPED - уход в бесконечность
+	"""
+	rows = rows[-min(rows.shape[0], 2 * max_period):]
+	last = rows[-1]
+	res = np.full(last.size, PERIOD_CHAOS, dtype = np.int16)
+	undecided = np.isfinite(last)
+	res[~undecided] = PERIOD_ESCAPED
+	for p in range(1, min(max_period, rows.shape[0] - 1) + 1):
+		cols = np.flatnonzero(undecided & (np.abs(last - rows[-1 - p]) < tol))
+		# Отсев точек по остальным строкам окна (от конца к началу)
+		for t in range(rows.shape[0] - 2, p - 1, -1):
+			if cols.size == 0:
+				break
+			cols = cols[np.abs(rows[t, cols] - rows[t - p, cols]) < tol]
+		res[cols] = p
+		undecided[cols] = False
+	return res
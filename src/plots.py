@@ -1,8 +1,14 @@
+import time
 from matplotlib.animation import TimedAnimation
 
 from src.controls import Data
 from src.settings import Settings
+from src.density import DensityImage
 from src.calculations import NX, RX, XX, XX_NX, Calculator
+from src.formulas import formula_style
+
+FRAME_DECAY = 0.5
+"""Вес предыдущих кадров при оценке времени отрисовки итерации (0 - только последний кадр)."""
 
 class Plot():
 	"""
@@ -13,9 +19,12 @@ class Plot():
 		data (Data): Исходные данные
 		res (Calculator): Объект выполнивший вычисление
 		key (str): Индекс, по которому можно получить доступ к настройкам
-		f1_lines (list): # Для хранения линий функции №1
-		f2_lines (list): # Для хранения линий функции №2
+		func_lines (dict): # Для хранения линий каждой функции
 		settings (Settings) # Глобальные настройки приложения
+		density (bool): Отображать ли накопленные точки изображением плотности?
+		images (dict): Изображения плотности для каждой функции
+		rebinning (bool): Накапливаются ли изображения плотности заново
+			(изменение границ изображением не должно повторно вызывать накопление)
 	"""
 	def __init__(self, axis, data: Data,
 			res: Calculator, key: str, settings: Settings):
@@ -33,9 +42,11 @@ class Plot():
 		self.data = data # Данные с формы
 		self.res = res # Результаты вычислений функции
 		self.key = key # Индекс, по которому можно получить доступ к настройкам
-		self.f1_lines = [] # Для хранения линий функции №1
-		self.f2_lines = [] # Для хранения линий функции №2
+		self.func_lines = {} # Для хранения линий каждой функции
 		self.settings = settings
+		self.density = settings[key].get('density', False)
+		self.images = {}
+		self.rebinning = False
 
 	def get_two_lines(self, s) -> list:
 		"""Получает линии для отрисовки."""
@@ -48,18 +59,44 @@ class Plot():
 		lines.append(line)
 		return lines
 	
+	def style(self, name: str) -> dict:
+		"""Настройки линий функции (для пользовательских формул - по образцу f1)."""
+		return formula_style(self.settings[self.key], name, self.settings.get('formulas', []))
+
 	def create_lines(self) -> list:
 		"""Формирование линий."""
 		lines = []
-		if self.data.is_f1.get():
-			self.f1_lines = self.get_two_lines(self.settings[self.key]['f1'])
-			lines.extend(self.f1_lines)
-		if self.data.is_f2.get():
-			self.f2_lines = self.get_two_lines(self.settings[self.key]['f2'])
-			lines.extend(self.f2_lines)
+		for name in self.res.names:
+			self.func_lines[name] = self.get_two_lines(self.style(name))
+			lines.extend(self.func_lines[name])
+		# Накопленные точки отображаются изображением, а линии остаются для легенды
+		if self.density:
+			for name in self.res.names:
+				self.images[name] = DensityImage(self.axis, self.style(name)['color1'])
+			lines.extend(image.image for image in self.images.values())
+			# Масштабирование, перемещение и расширение границ
+			self.axis.callbacks.connect('xlim_changed', self.on_lim)
+			self.axis.callbacks.connect('ylim_changed', self.on_lim)
 		# Настройка положения легенды
 		self.axis.legend(loc = self.settings[self.key]['legend_loc'])
 		return lines
+
+	def history_lines(self) -> list:
+		"""Линии старых точек (при пошаговой отрисовке остаются в фоне графика)."""
+		if self.density:
+			return []
+		return [lines[0] for lines in self.func_lines.values()]
+
+	def update_lines(self, full: bool = True):
+		"""
+		Обновление данных для отрисовки.
+
+		Args:
+			full (bool): Передать ли линиям старых точек все рассчитанные точки
+				(иначе - только точки текущего кадра)
+		"""
+		self.update_history(full)
+		self.update_frame()
 	
 	def set_lim(self, x_lim, y_lim, s):
 		"""Установка границ отображения"""
@@ -68,12 +105,31 @@ class Plot():
 		self.axis.set_xlim(x_lim[0] - kx, x_lim[1] + kx)
 		self.axis.set_ylim(y_lim[0] - ky, y_lim[1] + ky)
 
+	def rescale(self):
+		"""
+		Обновление границ отображения после их расширения: линиям старых точек
+		передаются все точки, а изображения плотности накапливаются заново.
+		"""
+		self.reset_lim() # Изображения плотности накапливаются заново в on_lim
+		self.update_history(True)
+
+	def on_lim(self, axis):
+		"""Накопление изображений плотности заново по новым границам графика."""
+		if self.rebinning:
+			return
+		self.rebinning = True
+		try:
+			for name, image in self.images.items():
+				if image.is_stale(self.axis):
+					image.reset(self.axis)
+					image.add(*self.density_points(name))
+		finally:
+			self.rebinning = False
+
 	def del_new_points(self):
 		"""Удаление точек, показывающих процесс отрисовки."""
-		if self.data.is_f1.get():
-			self.f1_lines[1].remove()
-		if self.data.is_f2.get():
-			self.f2_lines[1].remove()
+		for lines in self.func_lines.values():
+			lines[1].remove()
 		# Обновление легенды
 		self.axis.legend(loc = self.settings[self.key]['legend_loc'])
 
@@ -87,8 +143,7 @@ class PlotNX(Plot):
 		data (Data): Исходные данные
 		res (Calculator): Объект выполнивший вычисление
 		key (str): Индекс, по которому можно получить доступ к настройкам
-		f1_lines (list): # Для хранения линий функции №1
-		f2_lines (list): # Для хранения линий функции №2
+		func_lines (dict): # Для хранения линий каждой функции
 		settings (Settings) # Глобальные настройки приложения
 	"""
 
@@ -109,16 +164,38 @@ class PlotNX(Plot):
 		axis.set_xlabel('n', fontsize = self.settings['fontsize'])
 		axis.set_ylabel('x[n], x[n+1]', fontsize = self.settings['fontsize'])
 		# Установка границ
+		self.reset_lim()
+
+	def reset_lim(self):
+		"""Установка границ отображения по границам значений."""
+		res = self.res
 		self.set_lim(res.n_lim, res.x_lim, self.settings['NX'])
 
-	def update_lines(self):
-		"""Обновление данных для отрисовки."""
-		if self.data.is_f1.get():
-			self.f1_lines[0].set_data(self.res.get_n(), self.res.get_xn_f1())
-			self.f1_lines[1].set_data(self.res.get_n(), self.res.get_xn1_f1())
-		if self.data.is_f2.get():
-			self.f2_lines[0].set_data(self.res.get_n(), self.res.get_xn_f2())
-			self.f2_lines[1].set_data(self.res.get_n(), self.res.get_xn1_f2())
+	def density_points(self, name: str) -> tuple:
+		"""Все отрисованные точки функции name для изображения плотности."""
+		res = self.res
+		return res.get_n(), res.get_xn(name)
+
+	def history_lines(self) -> list:
+		"""Линии старых точек (все линии графика)."""
+		return [line for lines in self.func_lines.values() for line in lines]
+
+	def update_history(self, full: bool):
+		"""Обновление линий старых точек."""
+		res = self.res
+		# Новый фрагмент линии начинается с последней точки предыдущего
+		n = res.get_n() if full else res.new_n(1)
+		for name, lines in self.func_lines.items():
+			if full:
+				lines[0].set_data(n, res.get_xn(name))
+				lines[1].set_data(n, res.get_xn1(name))
+			else:
+				lines[0].set_data(n, res.new_xn(name, 1))
+				lines[1].set_data(n, res.new_xn1(name, 1))
+
+	def update_frame(self):
+		"""Обновление точек текущего кадра."""
+		pass # Нет демонстрационных точек (процесс отрисовки)
 
 	def del_new_points(self):
 		"""Удаление точек, показывающих процесс отрисовки."""
@@ -134,8 +211,7 @@ class PlotXX(Plot):
 		data (Data): Исходные данные
 		res (Calculator): Объект выполнивший вычисление
 		key (str): Индекс, по которому можно получить доступ к настройкам
-		f1_lines (list): # Для хранения линий функции №1
-		f2_lines (list): # Для хранения линий функции №2
+		func_lines (dict): # Для хранения линий каждой функции
 		settings (Settings) # Глобальные настройки приложения
 	"""
 
@@ -156,16 +232,36 @@ class PlotXX(Plot):
 		axis.set_xlabel('x[n]', fontsize = self.settings['fontsize'])
 		axis.set_ylabel('x[n+1]', fontsize = self.settings['fontsize'])
 		# Установка границ
+		self.reset_lim()
+
+	def reset_lim(self):
+		"""Установка границ отображения по границам значений."""
+		res = self.res
 		self.set_lim(res.x_lim, res.x_lim, self.settings['XX'])
 
-	def update_lines(self):
-		"""Обновление данных для отрисовки."""
-		if self.data.is_f1.get():
-			self.f1_lines[0].set_data(self.res.get_xn_f1(), self.res.get_xn1_f1())
-			self.f1_lines[1].set_data(self.res.last_xn_f1(), self.res.last_xn1_f1())
-		if self.data.is_f2.get():
-			self.f2_lines[0].set_data(self.res.get_xn_f2(), self.res.get_xn1_f2())
-			self.f2_lines[1].set_data(self.res.last_xn_f2(), self.res.last_xn1_f2())
+	def density_points(self, name: str) -> tuple:
+		"""Все отрисованные точки функции name для изображения плотности."""
+		res = self.res
+		return res.get_xn(name), res.get_xn1(name)
+
+	def update_history(self, full: bool):
+		"""Обновление линий старых точек."""
+		if self.density: # Накопленные точки хранит изображение плотности
+			return
+		res = self.res
+		for name, lines in self.func_lines.items():
+			if full:
+				lines[0].set_data(res.get_xn(name), res.get_xn1(name))
+			else:
+				lines[0].set_data(res.new_xn(name), res.new_xn1(name))
+
+	def update_frame(self):
+		"""Обновление точек текущего кадра."""
+		res = self.res
+		for name, lines in self.func_lines.items():
+			if self.density:
+				self.images[name].add(res.new_xn(name), res.new_xn1(name))
+			lines[1].set_data(res.last_xn(name), res.last_xn1(name))
 
 
 class PlotRX(Plot):
@@ -177,8 +273,7 @@ class PlotRX(Plot):
 		data (Data): Исходные данные
 		res (Calculator): Объект выполнивший вычисление
 		key (str): Индекс, по которому можно получить доступ к настройкам
-		f1_lines (list): # Для хранения линий функции №1
-		f2_lines (list): # Для хранения линий функции №2
+		func_lines (dict): # Для хранения линий каждой функции
 		settings (Settings) # Глобальные настройки приложения
 	"""
 
@@ -199,16 +294,46 @@ class PlotRX(Plot):
 		axis.set_xlabel('r', fontsize = self.settings['fontsize'])
 		axis.set_ylabel('x[n]', fontsize = self.settings['fontsize'])
 		# Установка границ
+		self.reset_lim()
+		# Показатель Ляпунова на дополнительной оси (по тем же значениям r)
+		if res.is_lyap:
+			self.plot_lyapunov()
+
+	def reset_lim(self):
+		"""Установка границ отображения по границам значений."""
+		res = self.res
 		self.set_lim(res.r_lim, res.x_lim, self.settings['RX'])
 
-	def update_lines(self):
-		"""Обновление данных для отрисовки."""
-		if self.data.is_f1.get():
-			self.f1_lines[0].set_data(self.res.get_r(), self.res.get_xn_f1())
-			self.f1_lines[1].set_data(self.res.last_r(), self.res.last_xn_f1())
-		if self.data.is_f2.get():
-			self.f2_lines[0].set_data(self.res.get_r(), self.res.get_xn_f2())
-			self.f2_lines[1].set_data(self.res.last_r(), self.res.last_xn_f2())
+	def density_points(self, name: str) -> tuple:
+		"""Все отрисованные точки функции name для изображения плотности."""
+		res = self.res
+		return res.get_r(), res.get_xn(name)
+
+	def plot_lyapunov(self):
+		"""Отображает старший показатель Ляпунова от r на дополнительной оси."""
+		lyap_axis = self.axis.twinx()
+		lyap_axis.set_ylabel('λ', fontsize = self.settings['fontsize'])
+		lyap_axis.axhline(0, color = 'gray', linewidth = 0.5)
+		for name in self.res.names:
+			lyap_axis.plot(self.res.r, self.res.lyap[name], '.', color = self.style(name)['color1'],
+				markersize = 1, alpha = 0.5)
+
+	def update_history(self, full: bool):
+		"""Обновление линий старых точек."""
+		if self.density: # Накопленные точки хранит изображение плотности
+			return
+		res = self.res
+		r = res.get_r() if full else res.new_r()
+		for name, lines in self.func_lines.items():
+			lines[0].set_data(r, res.get_xn(name) if full else res.new_xn(name))
+
+	def update_frame(self):
+		"""Обновление точек текущего кадра."""
+		res = self.res
+		for name, lines in self.func_lines.items():
+			if self.density:
+				self.images[name].add(res.new_r(), res.new_xn(name))
+			lines[1].set_data(res.last_r(), res.last_xn(name))
 
 
 class SubplotAnimation(TimedAnimation):
@@ -222,9 +347,17 @@ class SubplotAnimation(TimedAnimation):
 		pb (dict): Компоненты для отображения информации о прогрессе вычисления 
 		end_anim (method): Для оповещения о завершении анимации
 		settings (Settings): Глобальные настройки приложения
-		n_draw (int): Сколько кадров отрисовывать
+		n_draw (int): Сколько итераций отрисовывать (уменьшается, если вычисление прекращено)
 		self.axes (list): Список пространств для отрисовки
 		self.lines (list): Список линий для обновления
+		incremental (bool): Рисовать ли в каждом кадре только новые точки?
+		history (set): Линии старых точек, которые сохраняются в фоне графиков
+		fps (float): Целевое количество итераций в секунду (0 - одна итерация в кадре)
+		frame_time (float): Сглаженное время отрисовки кадра, с
+		overhead (float): Оценка постоянной части времени кадра (не зависящей от количества итераций), с
+		frame_stats (list): Взвешенные суммы (кадры, итерации, время, итерации^2, итерации * время)
+		step (int): Количество итераций в следующем кадре
+		count (int): Количество итераций в текущем кадре
 	"""
 
 	def __init__(self, fig, data: Data, res: Calculator,
@@ -246,6 +379,13 @@ class SubplotAnimation(TimedAnimation):
 		self.pb = pb 
 		self.end_anim = end_anim 
 		self.n_draw = data.f.n_draw.get()
+		self.incremental = settings.get('incremental', True)
+		self.fps = settings.get('fps', 0)
+		self.frame_time = None
+		self.overhead = None
+		self.frame_stats = [0.0] * 5
+		self.step = 1
+		self.count = 1
 		# Определение количества графиков
 		self.fig.clear()
 		g = data.charts_num.get()
@@ -272,30 +412,147 @@ class SubplotAnimation(TimedAnimation):
 			self.axes.append(PlotNX(axis3, data, self.res, settings))
 		# Получение списка линий
 		self.lines = []
+		self.history = set()
 		for axis in self.axes:
 			self.lines.extend(axis.create_lines())
+			self.history.update(axis.history_lines())
 			TimedAnimation.__init__(self, fig,
 				interval = data.delay.get(), repeat = False, blit = True)
 
+	def is_cached(self, axis) -> bool:
+		"""Сохранён ли фон графика для текущих границ и размера?"""
+		view, bg = self._blit_cache.get(axis, (None, None))
+		return bg is not None and view == axis._get_view()
+
 	def _draw_frame(self, i):
-		"""Обновление кадра (x[i] = x[n-1])."""
-		# Вызов обработки каждого графика
+		"""Обновление кадра (x[i] = x[n-1] - первая итерация кадра)."""
+		# Точки могут ещё рассчитываться (состояние вычисления проверяется
+		# до количества точек, чтобы не пропустить последние из них)
+		producing = self.res.producing
+		ready = self.res.ready()
+		self.count = min(self.step, ready - i)
+		if self.count <= 0:
+			self._drawn_artists = []
+			self.count = 0
+			if not producing: # Вычисление прекращено: отрисованы все рассчитанные точки
+				self.n_draw = i
+				self.end_anim()
+			return
+		# Обновление ссылок на данные (индексы указывают на последний отрисованный кадр)
+		self.res.set_frame(i, self.count)
+		# Вызов обработки каждого графика (все старые точки передаются,
+		# только если фон графика ещё не сохранён или устарел)
+		profiler = self.res.profiler
 		for axis in self.axes:
-			axis.update_lines()
+			t = time.perf_counter()
+			axis.update_lines(not self.incremental or not self.is_cached(axis.axis))
+			if profiler is not None:
+				profiler.add('update_lines_' + axis.key, time.perf_counter() - t, self.count)
+		# Границы, определённые по первым итерациям, расширяются,
+		# если точки кадра выходят за них (фон графиков рисуется заново)
+		if self.res.extend_lim(i, i + self.count + 1):
+			for axis in self.axes:
+				axis.rescale()
+			self.fig.canvas.draw()
 		self._drawn_artists = self.lines
-		# Обновление ссылок на данные
-		self.res.next_N()
 		#Обновление прогресс-бара
-		self.pb['value'].set(i)
+		last = i + self.count - 1
+		self.pb['value'].set(last)
 		# Сигнал о завершении анимации
-		if i == self.n_draw - 1:
+		if last == self.n_draw - 1 or (last == ready - 1 and not producing):
+			self.n_draw = last + 1
 			self.end_anim()
 
+	def _draw_next_frame(self, framedata, blit):
+		"""
+		Отрисовка кадра с измерением времени.
+
+		Если кадр рисуется дольше, чем 1 / fps секунд, то в следующий кадр
+		попадает больше итераций (см. update_step), чтобы анимация проходила
+		fps итераций в секунду; если время остаётся - по одной итерации в кадре.
+		"""
+		t = time.perf_counter()
+		super()._draw_next_frame(framedata, blit)
+		t = time.perf_counter() - t
+		if self.count <= 0:
+			return
+		if self.res.profiler is not None:
+			self.res.profiler.add('frame', t, self.count)
+		if self.fps > 0:
+			self.update_step(t)
+
+	def update_step(self, t: float):
+		"""
+		Выбирает количество итераций в следующем кадре.
+
+		Время кадра считается линейно зависящим от количества итераций:
+		overhead + count * cost. Оба слагаемых оцениваются методом наименьших
+		квадратов по последним кадрам; пока во всех кадрах одинаковое количество
+		итераций, сохраняется прежняя оценка overhead (сначала - всё время кадра).
+		Кадр из step итераций должен рисоваться за step / fps секунд, откуда
+		step = overhead / (1 / fps - cost). Если одна итерация рисуется дольше
+		1 / fps, то скорость fps недостижима и количество итераций не меняется.
+
+		Args:
+			t (float): Время отрисовки текущего кадра из count итераций, с
+		"""
+		n = self.count
+		self.frame_stats = [s * FRAME_DECAY + v for s, v in zip(self.frame_stats, (1, n, t, n * n, n * t))]
+		w, sn, st, snn, snt = self.frame_stats
+		var = w * snn - sn * sn
+		if var > 1e-6 * w * snn: # Количество итераций в кадрах различалось
+			cost = (w * snt - sn * st) / var
+			self.overhead = (st - cost * sn) / w
+		elif self.overhead is None:
+			self.overhead = st / w
+		self.frame_time = st / w
+		self.overhead = min(max(self.overhead, 0), self.frame_time)
+		# Прямая проходит через средние значения, поэтому время итерации
+		# - остаток среднего времени кадра после постоянной части
+		cost = (self.frame_time - self.overhead) / (sn / w)
+		budget = 1 / self.fps - cost
+		step = self.overhead / budget if budget > 0 else self.step
+		self.step = max(1, min(round(step), 2 * self.step))
+
+	def _blit_draw(self, artists):
+		"""
+		Отрисовка кадра на сохранённом фоне.
+
+		При пошаговой отрисовке старые точки рисуются на фоне графика,
+		после чего фон сохраняется заново, поэтому в следующих кадрах
+		они не перерисовываются и время кадра зависит только от количества новых точек.
+		"""
+		if not self.incremental:
+			return super()._blit_draw(artists)
+		canvas = self.fig.canvas
+		axes = {a.axes for a in artists}
+		# Сохранение чистого фона (после изменения размера или масштаба)
+		for ax in axes:
+			if not self.is_cached(ax):
+				self._blit_cache[ax] = (ax._get_view(), canvas.copy_from_bbox(ax.bbox))
+		# Добавление точек кадра к фону
+		for a in artists:
+			if a in self.history:
+				a.axes.draw_artist(a)
+		for ax in axes:
+			self._blit_cache[ax] = (ax._get_view(), canvas.copy_from_bbox(ax.bbox))
+		# Демонстрационные точки стираются в следующем кадре
+		for a in artists:
+			if a not in self.history:
+				a.axes.draw_artist(a)
+		for ax in axes:
+			canvas.blit(ax.bbox)
+
 	def new_frame_seq(self) -> iter:
-		"""Возвращает счетчик для определения количества кадров."""
-		return iter(range(self.n_draw))
+		"""Возвращает номера первых итераций кадров (количество итераций в кадре меняется)."""
+		i = 0
+		while i < self.n_draw:
+			yield i
+			i += self.count
 
 	def del_new_points(self):
 		"""Удаление точек, показывающих процесс отрисовки."""
 		for axis in self.axes:
+			# Для полной перерисовки линиям нужны все старые точки
+			axis.update_history(True)
 			axis.del_new_points()
\ No newline at end of file
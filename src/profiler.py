@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import platform
+import itertools
+import threading
+import tracemalloc
+import numpy as np
+from datetime import datetime
+
+try:
+	import resource
+except ImportError: # Нет в Windows
+	resource = None
+
+PROFILE_DIR = 'profiles'
+"""Подкаталог save_dir для отчётов о времени выполнения."""
+
+
+def peak_rss() -> int:
+	"""Возвращает пиковый объём памяти процесса, байт (None - недоступно)."""
+	if resource is None:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# В macOS значение в байтах, в Linux - в килобайтах
+	return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def machine_info() -> dict:
+	"""Возвращает описание системы (для сравнения запусков на разных машинах)."""
+	return {
+		'platform': platform.platform(),
+		'processor': platform.processor(),
+		'cpu_count': os.cpu_count(),
+		'python': sys.version.split()[0],
+		'numpy': np.__version__
+	}
+
+
+class Profiler:
+	"""
+	Собирает время выполнения и количество обработанных элементов
+	по участкам вычисления и отрисовки.
+
+	Участки обновляются под блокировкой: этапы и ядра записываются
+	потоком вычисления, кадры и графики - основным потоком,
+	а границы графиков (x_lim) - обоими.
+
+	Attributes:
+		sections (dict): Для каждого участка - время, количество вызовов и элементов
+		values (dict): Дополнительные значения (объём памяти и т.п.)
+		trace_memory (bool): Отслеживается ли пиковый объём памяти (tracemalloc)?
+		kernels (bool): Учитывать ли время каждого шага ядер?
+		started (float): Время создания
+		lock (Lock): Блокировка изменения участков и значений
+	"""
+
+	def __init__(self, trace_memory: bool = False, kernels: bool = False):
+		"""
+		Создаёт пустой отчёт.
+
+		Args:
+			trace_memory (bool): Отслеживать ли пиковый объём памяти через tracemalloc
+				(замедляет выделение памяти)
+			kernels (bool): Учитывать ли время каждого шага ядер
+				(замедляет вычисление на малых сетках, поэтому по умолчанию выключено)
+		"""
+		self.sections = {}
+		self.values = {}
+		self.trace_memory = trace_memory
+		self.kernels = kernels
+		self.started = time.perf_counter()
+		self.lock = threading.Lock()
+		if trace_memory:
+			tracemalloc.start()
+
+	def add(self, name: str, seconds: float, items: int = 0, calls: int = 1):
+		"""
+		Добавляет время выполнения участка.
+
+		Args:
+			name (str): Имя участка
+			seconds (float): Время выполнения, с
+			items (int): Количество обработанных элементов (итераций, точек)
+			calls (int): Количество вызовов
+		"""
+		with self.lock:
+			s = self.sections.get(name)
+			if s is None:
+				s = self.sections[name] = {'time': 0.0, 'calls': 0, 'items': 0}
+			s['time'] += seconds
+			s['calls'] += calls
+			s['items'] += int(items)
+
+	def phase(self, name: str, seconds: float, items: int = 0):
+		"""
+		Добавляет время этапа вычисления и объём памяти на момент его завершения:
+		пиковый объём памяти процесса и (при отслеживании) пиковый объём
+		выделенной памяти с завершения предыдущего этапа.
+
+		Args:
+			name (str): Имя этапа
+			seconds (float): Время выполнения, с
+			items (int): Количество итераций
+		"""
+		self.add(name, seconds, items)
+		with self.lock:
+			s = self.sections[name]
+			s['peak_rss'] = peak_rss()
+			if self.trace_memory and tracemalloc.is_tracing():
+				s['allocated_peak'] = tracemalloc.get_traced_memory()[1]
+				tracemalloc.reset_peak()
+
+	def set(self, name: str, value):
+		"""Сохраняет дополнительное значение."""
+		with self.lock:
+			self.values[name] = value
+
+	def merge(self, sections: dict):
+		"""
+		Добавляет участки другого отчёта (например, части сетки,
+		рассчитанной в дочернем процессе): время, вызовы и элементы
+		суммируются, объём памяти - наибольший.
+
+		Args:
+			sections (dict): Участки другого отчёта (см. sections)
+		"""
+		for name, other in sections.items():
+			self.add(name, other['time'], other['items'], other['calls'])
+			with self.lock:
+				s = self.sections[name]
+				for key in ('peak_rss', 'allocated_peak'):
+					if other.get(key) is not None:
+						s[key] = max(s.get(key) or 0, other[key])
+
+	def wrap(self, name: str, kernel):
+		"""
+		Возвращает ядро расчёта шага, которое учитывает время каждого вызова
+		(элементы - количество рассчитанных точек, размер массива out).
+
+		Args:
+			name (str): Имя участка
+			kernel (method): Ядро (см. src.kernels)
+
+		Returns:
+			method: Ядро с учётом времени
+		"""
+		def timed(*args, **kwargs):
+			t = time.perf_counter()
+			out = kernel(*args, **kwargs)
+			self.add(name, time.perf_counter() - t, out.size)
+			return out
+		return timed
+
+	def stop_memory(self):
+		"""Сохраняет пиковый объём памяти и прекращает его отслеживание."""
+		if self.trace_memory and tracemalloc.is_tracing():
+			self.values['tracemalloc_peak'] = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+
+	def report(self, params = None) -> dict:
+		"""
+		Формирует отчёт.
+
+		Args:
+			params (Params): Параметры вычисления (для сравнения запусков)
+
+		Returns:
+			dict: Отчёт (участки со временем на элемент, значения, параметры, система)
+		"""
+		sections = {}
+		with self.lock:
+			items = [(name, dict(s)) for name, s in self.sections.items()]
+		for name, s in items:
+			if s['items'] > 0:
+				s['ns_per_item'] = s['time'] / s['items'] * 1e9
+			sections[name] = s
+		return {
+			'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+			'total': time.perf_counter() - self.started,
+			'params': None if params is None else vars(params),
+			'sections': sections,
+			'values': dict(self.values, peak_rss = peak_rss()),
+			'machine': machine_info()
+		}
+
+	def save(self, save_dir: str, params = None) -> str:
+		"""
+		Сохраняет отчёт в файл JSON в подкаталоге PROFILE_DIR.
+
+		Args:
+			save_dir (str): Каталог для сохранения файлов
+			params (Params): Параметры вычисления
+
+		Returns:
+			str: Имя файла
+		"""
+		self.stop_memory()
+		path = os.path.join(save_dir, PROFILE_DIR)
+		os.makedirs(path, exist_ok = True)
+		# Время с микросекундами и номер, если такой файл уже есть,
+		# чтобы отчёты одновременных запусков не перезаписывали друг друга
+		stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+		for k in itertools.count():
+			fn = os.path.join(path, stamp + (f'_{k}' if k > 0 else '') + '.json')
+			try:
+				f = open(fn, 'x', encoding = 'utf-8')
+			except FileExistsError:
+				continue
+			with f:
+				json.dump(self.report(params), f, ensure_ascii = False, indent = 2)
+			return fn
+
+	def summary(self) -> str:
+		"""Возвращает краткий отчёт для строки состояния."""
+		names = {'phase_iter': 'установление', 'phase_draw': 'расчёт',
+			'compute': 'вычисление', 'frame': 'анимация', 'canvas_draw': 'перерисовка'}
+		parts = [f'{label} {self.sections[name]["time"]:.2f} с'
+			for name, label in names.items() if name in self.sections]
+		return '\n'.join(parts)
@@ -4,6 +4,16 @@ import os, json
 SETTINGS = {
    'fontsize': 9,
    'delay_time': 1,
+   'workers': 1,
+   'cache_size': 256,
+   'incremental': True,
+   'fps': 0,
+   'pipeline': True,
+   'profile': True,
+   'tracemalloc': False,
+   'profile_kernels': False,
+   'job_workers': 1,
+   'basin_workers': 0,
    'NX': {
 	  'f1': {
 		 'label1': '1) x[n]',
@@ -52,7 +62,8 @@ SETTINGS = {
 	  },
 	  'coef_xlim': 0.05,
 	  'coef_ylim': 0.05,
-	  'legend_loc': 'upper left'
+	  'legend_loc': 'upper left',
+	  'density': False
    },
    'RX': {
 	  'f1': {
@@ -77,8 +88,28 @@ SETTINGS = {
 	  },
 	  'coef_xlim': 0.05,
 	  'coef_ylim': 0.05,
-	  'legend_loc': 'lower left'
+	  'legend_loc': 'lower left',
+	  'density': False,
+	  'refine': True
    },
+   'formulas': [
+	  {
+		 'name': 'lozi',
+		 'label': 'Лози: x[n+1]=1-r|x[n]|+bx[n-1]',
+		 'x': '1 - r*abs(x[n]) + b*x[n-1]'
+	  },
+	  {
+		 'name': 'logistic',
+		 'label': 'Логистическое: x[n+1]=rx[n](1-x[n])',
+		 'x': 'r*x[n]*(1 - x[n])'
+	  },
+	  {
+		 'name': 'henon2d',
+		 'label': 'Эно (x, y): x[n+1]=1-rx[n]^2+y[n]\ny[n+1]=bx[n]',
+		 'x': '1 - r*x**2 + y',
+		 'y': 'b*x'
+	  }
+   ],
    'defaults': [
 	  {
 		 'name': 'r = 1.4; b = 0.3',
@@ -179,6 +210,50 @@ SETTINGS = {
 		 'x0': 0.4,
 		 'n_iter': 800,
 		 'n_draw': 300
+	  },
+	  {
+		 'name': 'Лози: r = 0..1.8; b = 0.5',
+		 'f1': False,
+		 'f2': False,
+		 'formulas': ['lozi'],
+		 'r': [0, 1.8, 0.01],
+		 'b': [0.5, 0.5, 0.1],
+		 'x0': 0,
+		 'n_iter': 800,
+		 'n_draw': 300
+	  },
+	  {
+		 'name': 'Логистическое: x[0] = 0.4; r = 2.5..4',
+		 'f1': False,
+		 'f2': False,
+		 'formulas': ['logistic'],
+		 'r': [2.5, 4, 0.01],
+		 'b': [0, 0, 0.1],
+		 'x0': 0.4,
+		 'n_iter': 800,
+		 'n_draw': 300
+	  },
+	  {
+		 'name': 'x[0] = -1..1; r = 0.8..1.1; b = 0.3',
+		 'f1': False,
+		 'f2': True,
+		 'r': [0.8, 1.1, 0.005],
+		 'b': [0.3, 0.3, 0.1],
+		 'x0': [-1, 1, 0.25],
+		 'n_iter': 800,
+		 'n_draw': 100
+	  },
+	  {
+		 'name': 'Бассейны: r = 1.05; b = 0.3; x[0], x[-1] = -1.5..1.5',
+		 'f1': True,
+		 'f2': True,
+		 'r': [1.05, 1.05, 0.1],
+		 'b': [0.3, 0.3, 0.1],
+		 'x0': [-1.5, 1.5, 0.003],
+		 'x_prev': [-1.5, 1.5, 0.003],
+		 'n_iter': 5000,
+		 'n_draw': 10,
+		 'tol': 1e-9
 	  }
    ]
 }
@@ -208,4 +283,9 @@ class Settings:
 
 	def __getitem__(self, item: str) -> dict:
 		"""Возвращает фрагмент словаря настроек."""
-		return self.__data[item]
\ No newline at end of file
+		return self.__data[item]
+
+	def get(self, item: str, default = None):
+		"""Возвращает фрагмент словаря настроек или значение по умолчанию,
+		если его нет в файле (например, созданном старой версией)."""
+		return self.__data.get(item, default)
\ No newline at end of file
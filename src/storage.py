@@ -0,0 +1,130 @@
+import os
+import shutil
+import weakref
+import tempfile
+import numpy as np
+
+STORAGE_DIR = 'storage'
+"""Подкаталог save_dir для файлов с траекториями."""
+
+RUN_PREFIX = 'run_'
+"""Начало имени подкаталога вычисления (за ним - номер процесса-владельца)."""
+
+
+def pid_alive(pid: int) -> bool:
+	"""
+	Проверяет, выполняется ли процесс.
+
+	Args:
+		pid (int): Номер процесса
+
+	Returns:
+		bool: Выполняется ли процесс с номером pid?
+	"""
+	if os.name == 'nt':
+		# В Windows os.kill завершает процесс, поэтому состояние запрашивается через WinAPI
+		import ctypes
+		kernel32 = ctypes.windll.kernel32
+		handle = kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+		if not handle:
+			return False
+		code = ctypes.c_ulong()
+		ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+		kernel32.CloseHandle(handle)
+		return bool(ok) and code.value == 259 # STILL_ACTIVE
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except PermissionError: # Процесс другого пользователя
+		return True
+	return True
+
+
+def owner_pid(name: str) -> int:
+	"""
+	Возвращает номер процесса-владельца подкаталога вычисления.
+
+	Args:
+		name (str): Имя подкаталога (run_<pid>_...)
+
+	Returns:
+		int: Номер процесса (None - имя другого формата, например, прежних версий)
+	"""
+	parts = name.split('_')
+	if len(parts) < 3 or parts[0] + '_' != RUN_PREFIX or not parts[1].isdigit():
+		return None
+	return int(parts[1])
+
+
+class Storage:
+	"""
+	Выделяет буферы для траекторий в оперативной памяти
+	или в файлах np.memmap (для сеток, не помещающихся в память).
+
+	Буферы в файлах имеют тот же интерфейс, что и обычные массивы,
+	а подкачкой страниц управляет операционная система.
+
+	Attributes:
+		path (str): Каталог с файлами буферов (None - оперативная память)
+	"""
+
+	active = set()
+	"""Каталоги хранилищ этого процесса, которые ещё используются (не удаляются)."""
+
+	def __init__(self, storage_dir: str = None):
+		"""
+		Создаёт хранилище. Файлы каждого вычисления размещаются
+		в отдельном подкаталоге storage_dir, в имени которого указан номер
+		процесса. Удаляются подкаталоги завершившихся процессов и освобождённые
+		подкаталоги этого процесса, а подкаталоги других выполняющихся процессов
+		(например, второго batch.py) и ещё используемые хранилища остаются.
+
+		Args:
+			storage_dir (str): Каталог для файлов (None - оперативная память)
+		"""
+		self.path = None
+		if storage_dir is None:
+			return
+		os.makedirs(storage_dir, exist_ok = True)
+		pid = os.getpid()
+		for name in os.listdir(storage_dir):
+			path = os.path.join(storage_dir, name)
+			owner = owner_pid(name)
+			if path in Storage.active or (owner is not None and owner != pid and pid_alive(owner)):
+				continue
+			# В Windows открытые файлы не удаляются (остаются до следующего запуска)
+			shutil.rmtree(path, ignore_errors = True)
+		self.path = tempfile.mkdtemp(prefix = f'{RUN_PREFIX}{pid}_', dir = storage_dir)
+		Storage.active.add(self.path)
+		# Каталог удаляется вместе с хранилищем (и результатами, которые его используют)
+		weakref.finalize(self, Storage.release, self.path)
+
+	@staticmethod
+	def release(path: str):
+		"""
+		Удаляет подкаталог освобождённого хранилища.
+
+		Args:
+			path (str): Каталог с файлами буферов
+		"""
+		Storage.active.discard(path)
+		shutil.rmtree(path, ignore_errors = True)
+
+	def zeros(self, name: str, size: int, dtype = np.float64) -> np.array:
+		"""
+		Выделяет одномерный буфер, заполненный нулями.
+
+		Args:
+			name (str): Имя буфера (имя файла без расширения)
+			size (int): Количество элементов
+			dtype: Тип элементов
+
+		Returns:
+			np.array: Буфер (np.memmap при хранении в файлах)
+		"""
+		if self.path is None:
+			return np.zeros(size, dtype = dtype)
+		# Новый файл заполняется нулями при создании
+		return np.memmap(os.path.join(self.path, name + '.dat'), dtype = dtype,
+			mode = 'w+', shape = (max(size, 1),))[:size]
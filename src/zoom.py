@@ -0,0 +1,165 @@
+import copy
+import numpy as np
+from threading import Thread, Lock
+
+from src.engine import Params, Engine
+from src.formulas import formula_style
+
+ZOOM_CHUNK = 64
+"""Количество значений r, рассчитываемых за один шаг уточнения."""
+
+ZOOM_DELAY = 300
+"""Задержка запуска уточнения после изменения границ графика, мс."""
+
+ZOOM_POLL = 50
+"""Период добавления рассчитанных точек на график, мс."""
+
+
+class ZoomRefiner:
+	"""
+	Пересчитывает бифуркационную диаграмму для видимого интервала r
+	после изменения границ графика (масштабирование, перемещение).
+
+	Шаг r подбирается по ширине графика в пикселях, расчёт выполняется
+	в отдельном потоке частями по ZOOM_CHUNK значений r, а точки каждой
+	части (только попавшие в видимый интервал x) сразу добавляются на график.
+
+	Attributes:
+		root (tk.Tk): Окно приложения (для отложенных вызовов)
+		axis (matplotlib.pyplot.Axis): Пространство бифуркационной диаграммы
+		params (Params): Параметры исходного вычисления
+		lines (dict): Линии уточнённых точек для каждой функции
+		images (dict): Изображения плотности графика для каждой функции
+			(уточнённые точки добавляются в них вместо линий)
+		generation (int): Номер текущего уточнения (прежние прекращаются)
+		chunks (list): Рассчитанные, но ещё не добавленные на график точки
+		done (bool): Завершён ли расчёт текущего уточнения?
+		lock (Lock): Блокировка для передачи точек между потоками
+		pending (str): Идентификатор отложенного запуска уточнения
+		cids (list): Идентификаторы обработчиков изменения границ
+	"""
+
+	def __init__(self, root, axis, params: Params, settings: dict, formulas: list = None,
+			images: dict = None):
+		"""
+		Подключается к изменению границ графика.
+
+		Args:
+			root (tk.Tk): Окно приложения (для отложенных вызовов)
+			axis (matplotlib.pyplot.Axis): Пространство бифуркационной диаграммы
+			params (Params): Параметры исходного вычисления
+			settings (dict): Настройки графика (раздел RX)
+			formulas (list): Описания пользовательских формул (для цветов их линий)
+			images (dict): Изображения плотности графика (None - точки отображаются линиями)
+		"""
+		self.root = root
+		self.axis = axis
+		self.params = params
+		self.images = images or {}
+		self.lines = {}
+		for name in params.names():
+			s = formula_style(settings, name, formulas or [])
+			self.lines[name], = axis.plot([], [], s['marker1'], color = s['color1'],
+				markersize = s['markersize1'])
+		self.generation = 0
+		self.chunks = []
+		self.done = True
+		self.lock = Lock()
+		self.pending = None
+		self.cids = [axis.callbacks.connect('xlim_changed', self.on_lim),
+			axis.callbacks.connect('ylim_changed', self.on_lim)]
+
+	def on_lim(self, axis):
+		"""Откладывает уточнение, пока границы меняются (масштабирование задаёт x и y по очереди)."""
+		# Точки прежних границ больше не добавляются
+		self.generation += 1
+		if self.pending is not None:
+			self.root.after_cancel(self.pending)
+		self.pending = self.root.after(ZOOM_DELAY, self.start)
+
+	def start(self):
+		"""Запускает уточнение для текущих границ графика."""
+		self.pending = None
+		self.generation += 1
+		with self.lock:
+			self.chunks = []
+		for line in self.lines.values():
+			line.set_data([], [])
+		r_lim = sorted(self.axis.get_xlim())
+		x_lim = sorted(self.axis.get_ylim())
+		width = max(int(self.axis.get_window_extent().width), 1)
+		step = (r_lim[1] - r_lim[0]) / width
+		# Исходная сетка уже не менее подробная
+		if step <= 0 or step >= self.params.r[2]:
+			self.done = True
+			self.axis.figure.canvas.draw_idle()
+			return
+		params = copy.copy(self.params)
+		params.r = [r_lim[0], r_lim[1], step]
+		params.workers = 1
+		params.lyapunov = False
+		params.storage_dir = None
+		self.done = False
+		Thread(target = self.compute, args = (self.generation, params, x_lim), daemon = True).start()
+		self.root.after(ZOOM_POLL, self.poll, self.generation)
+
+	def compute(self, generation: int, params: Params, x_lim: list):
+		"""
+		Рассчитывает точки частями (в отдельном потоке).
+
+		Args:
+			generation (int): Номер уточнения
+			params (Params): Параметры вычисления для видимого интервала r
+			x_lim (list): Видимый интервал x
+		"""
+		cancel = lambda: self.generation != generation
+		engine = Engine(params)
+		# Точки сетки одного значения r (b и начальные значения) идут подряд
+		chunk = ZOOM_CHUNK * (engine.Nbr // engine.arr_r.size)
+		for start in range(0, engine.Nbr, chunk):
+			res = Engine(params, start, min(start + chunk, engine.Nbr)).run(cancel = cancel)
+			if res.is_cancelled or cancel():
+				return
+			points = []
+			for name in res.names:
+				x = res.rows(name)[:params.n_draw]
+				r = np.broadcast_to(res.r, x.shape)
+				# Ушедшие в бесконечность (NaN) и невидимые точки не добавляются
+				mask = (x >= x_lim[0]) & (x <= x_lim[1])
+				points.append((name, r[mask], x[mask]))
+			with self.lock:
+				if cancel():
+					return
+				self.chunks.extend(points)
+		with self.lock:
+			if not cancel():
+				self.done = True
+
+	def poll(self, generation: int):
+		"""Добавляет рассчитанные точки на график (в основном потоке)."""
+		if generation != self.generation:
+			return
+		with self.lock:
+			chunks, self.chunks = self.chunks, []
+			done = self.done
+		if chunks:
+			for name, r, x in chunks:
+				# Изображение накоплено заново по новым границам до запуска уточнения
+				if name in self.images:
+					self.images[name].add(r, x)
+					continue
+				line = self.lines[name]
+				line.set_data(np.concatenate([line.get_xdata(), r]),
+					np.concatenate([line.get_ydata(), x]))
+			self.axis.figure.canvas.draw_idle()
+		if not done:
+			self.root.after(ZOOM_POLL, self.poll, generation)
+
+	def disconnect(self):
+		"""Прекращает уточнение и отключается от графика."""
+		self.generation += 1
+		if self.pending is not None:
+			self.root.after_cancel(self.pending)
+			self.pending = None
+		for cid in self.cids:
+			self.axis.callbacks.disconnect(cid)
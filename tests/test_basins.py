@@ -0,0 +1,22 @@
+import numpy as np
+
+from src.engine import Params
+from src.basins import minimal_periods, label_attractors, compute_basins
+
+
+def test_minimal_periods():
+	# Цикл периода 8, ещё не установившийся с точностью detect_periods
+	cycle = np.sin(np.arange(8))
+	rows = np.tile(cycle, 4)[:, None] + 1e-6 * np.arange(32)[::-1, None] * [0, 1]
+	codes = minimal_periods(rows, np.array([8, 16], dtype = np.int16))
+	assert codes.tolist() == [8, 8]
+	labels, attractors = label_attractors(codes, rows[-8:].min(axis = 0))
+	assert labels.tolist() == [1, 1] and len(attractors) == 1
+
+
+def test_one_label_per_cycle():
+	# При r = 1.05, b = 0.3 отображение Хенона имеет один цикл периода 8
+	p = Params(False, True, [1.05, 1.05, 0.1], [0.3, 0.3, 0.1], [-1.5, 1.5, 0.1], 500, 10,
+		tol = 1e-9, x_prev = [-1.5, 1.5, 0.1])
+	res = compute_basins(p)
+	assert [a[0] for a in res.attractors['f2']] == [8]
@@ -0,0 +1,50 @@
+import os
+import copy
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from src.engine import Params, Engine
+from src.cache import ResultCache, CheckpointStore
+
+
+def test_concurrent_checkpoints():
+	# Одновременные задания с одинаковыми параметрами пишут одну контрольную точку
+	p = Params(True, True, [0, 1.4, 0.01], [0.3, 0.3, 0.1], 0.1, 100, 5)
+	cp = Engine(p).run().checkpoint()
+	with tempfile.TemporaryDirectory() as save_dir:
+		store = CheckpointStore(save_dir)
+		with ThreadPoolExecutor(8) as pool:
+			list(pool.map(lambda k: store.put(p, cp), range(32)))
+		assert os.listdir(store.path) == [os.path.basename(store.file_name(p))]
+		assert store.get(p).n_iter == cp.n_iter
+
+
+def test_find_shorter_on_disk():
+	p = Params(True, True, [0, 1.4, 0.1], [0.3, 0.3, 0.1], 0.1, 100, 10)
+	res = Engine(p).run()
+	longer = copy.copy(p)
+	longer.n_draw = 30
+	with tempfile.TemporaryDirectory() as save_dir:
+		# Нулевой объём памяти: результат сразу вытесняется в файл
+		cache = ResultCache(save_dir, 0)
+		cache.put(p, res)
+		assert not cache.items
+		# Новый экземпляр находит результат по указателю файлов
+		found = ResultCache(save_dir, 2**30).find_shorter(longer)
+		assert found is not None and found.n_draw == p.n_draw
+		for name in res.names:
+			assert np.array_equal(found.rows(name), res.rows(name), equal_nan = True)
+		# Результат с таким же n_draw не считается более коротким
+		assert ResultCache(save_dir, 2**30).find_shorter(p) is None
+
+
+def test_checkpoint_keeps_longest():
+	p = Params(True, True, [0, 1.4, 0.1], [0.3, 0.3, 0.1], 0.1, 200, 5)
+	short = copy.copy(p)
+	short.n_iter = 100
+	with tempfile.TemporaryDirectory() as save_dir:
+		store = CheckpointStore(save_dir)
+		store.put(p, Engine(p).run().checkpoint())
+		store.put(short, Engine(short).run().checkpoint())
+		assert store.get(p).n_iter == 200
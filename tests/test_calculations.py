@@ -0,0 +1,35 @@
+import os
+import tempfile
+import numpy as np
+
+from src.engine import Params
+from src.calculations import STREAM_ROWS, Calculator
+
+
+def test_stream_extends_x_lim():
+	# Анимация запускается по первым STREAM_ROWS итерациям, а границы
+	# расширяются по строкам траектории следующих кадров
+	p = Params(True, False, [3.5, 4, 0.1], [0.3, 0.3, 0.1], 0.1, 0, 4 * STREAM_ROWS)
+	with tempfile.TemporaryDirectory() as save_dir:
+		frames = []
+		calc = Calculator(p, save_dir, frames.append, stream = True)
+	assert frames == [calc] and calc.streamed
+	x = np.concatenate([calc.result.rows(name) for name in calc.names], axis = 1)
+	calc.x_lim = [0.4, 0.6]
+	assert calc.extend_lim(0, STREAM_ROWS)
+	assert not calc.extend_lim(0, STREAM_ROWS)
+	for start in range(0, p.n_draw + 2, 10):
+		calc.extend_lim(start, start + 10)
+	assert calc.x_lim == [float(np.nanmin(x)), float(np.nanmax(x))]
+
+
+def test_divergence_log_per_params():
+	# Логи разных вычислений в одном каталоге не перезаписывают друг друга
+	p1 = Params(True, False, [3.5, 5, 0.5], [0.3, 0.3, 0.1], 0.1, 100, 10)
+	p2 = Params(True, False, [3.5, 6, 0.5], [0.3, 0.3, 0.1], 0.1, 100, 10)
+	with tempfile.TemporaryDirectory() as save_dir:
+		logs = []
+		for p in (p1, p2):
+			Calculator(p, save_dir, error_func = lambda res, fn: logs.append(fn))
+		assert len(logs) == 2 and logs[0] != logs[1]
+		assert sorted(os.listdir(os.path.dirname(logs[0]))) == sorted(os.path.basename(fn) for fn in logs)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import numpy as np
+
+from src.engine import Params, Engine
+from src.checkpoint import Checkpoint
+
+ARGS = (True, True, [0, 1.6, 0.05], [0, 0.4, 0.1], 0.1)
+"""Сетка, часть траекторий которой уходит в бесконечность."""
+
+
+def assert_same(res, exact):
+	"""Проверяет совпадение траекторий и лога ухода в бесконечность."""
+	for name in exact.names:
+		assert np.array_equal(res.rows(name), exact.rows(name), equal_nan = True)
+		assert np.array_equal(res.escape_time(name), exact.escape_time(name))
+
+
+def test_resume_from_checkpoint():
+	cp = Engine(Params(*ARGS, 100, 10)).run().checkpoint()
+	with tempfile.TemporaryDirectory() as save_dir:
+		fn = os.path.join(save_dir, 'cp.npz')
+		cp.save(fn)
+		cp = Checkpoint.load(fn)
+	assert cp.n_iter == 100
+	p = Params(*ARGS, 300, 40)
+	engine = Engine(p)
+	engine.checkpoint = cp
+	assert_same(engine.run(), Engine(p).run())
+
+
+def test_extend_trajectory():
+	prev = Engine(Params(*ARGS, 100, 20)).run()
+	p = Params(*ARGS, 100, 50)
+	res = Engine(p).extend(prev)
+	assert res.n_done == 50
+	assert_same(res, Engine(p).run())
@@ -0,0 +1,28 @@
+import pytest
+import numpy as np
+
+from src.coords import GridCoords
+
+
+def test_grid_coords_match_materialized():
+	arr_n = np.arange(11, 18)
+	r = np.linspace(0, 1.4, 5)
+	b = np.linspace(0.1, 0.3, 5)
+	coords = GridCoords(arr_n, r, b)
+	# Прежние массивы координат: строка - номер n, столбец - точка сетки
+	n_full = np.repeat(arr_n, r.size)
+	r_full = np.tile(r, arr_n.size)
+	b_full = np.tile(b, arr_n.size)
+	for axis, full in ((coords.n, n_full), (coords.r, r_full), (coords.b, b_full)):
+		assert len(axis) == full.size
+		# Последовательные срезы (как при анимации), срезы с шагом и индексы
+		for stop in (3, 4, 12, 35):
+			assert np.array_equal(axis[:stop], full[:stop])
+		assert np.array_equal(axis[5:20], full[5:20])
+		assert np.array_equal(axis[::3], full[::3])
+		assert np.array_equal(axis[[0, 7, 34]], full[[0, 7, 34]])
+		assert axis[-1] == full[-1]
+		with pytest.raises(IndexError):
+			axis[full.size]
+	# Буфер растёт не больше, чем до размера таблицы
+	assert coords.r.buffer.size <= r_full.size
@@ -0,0 +1,44 @@
+import copy
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from src.settings import SETTINGS
+from src.plots import PlotXX
+
+
+class Points:
+	"""Отрисованные точки фазового портрета (вместо Calculator)."""
+
+	def __init__(self, x):
+		self.names = ['f1']
+		self.x = x
+		self.x_lim = [float(x.min()), float(x.max())]
+
+	def get_xn(self, name):
+		return self.x[:-1]
+
+	def get_xn1(self, name):
+		return self.x[1:]
+
+
+def test_density_rebinned_on_zoom():
+	x = np.random.default_rng(0).uniform(0, 1, 10001)
+	settings = copy.deepcopy(SETTINGS)
+	settings['XX']['density'] = True
+	fig = plt.figure()
+	plot = PlotXX(fig.add_subplot(1, 1, 1), None, Points(x), settings)
+	plot.create_lines()
+	image = plot.images['f1']
+	image.add(*plot.density_points('f1'))
+	total = image.counts.sum()
+	assert total == x.size - 1
+	# Приближение: точки перераспределяются по пикселям новой области
+	plot.axis.set_xlim(0, 0.5)
+	plot.axis.set_ylim(0, 0.5)
+	assert image.x_lim == (0, 0.5) and image.y_lim == (0, 0.5)
+	inside = ((x[:-1] < 0.5) & (x[1:] < 0.5)).sum()
+	assert image.counts.sum() == inside
+	assert not image.is_stale(plot.axis)
+	plt.close(fig)
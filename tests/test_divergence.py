@@ -0,0 +1,32 @@
+import os
+import tempfile
+import numpy as np
+
+from src.engine import Params, Engine
+
+
+def test_log_matches_plain_loop():
+	# Уход в бесконечность на этапе установления и при отрисовке
+	p = Params(True, False, [3.8, 6, 0.1], [0, 0.2, 0.1], 0.1, 20, 30)
+	res = Engine(p).run()
+	with np.errstate(over = 'ignore', invalid = 'ignore'):
+		x = [np.full(res.Nbr, p.x0)] * 2 # x[-1], x[0]
+		for n in range(60):
+			x.append(res.r * x[-1] * (1 - x[-1]) - res.b * x[-2])
+	x = np.array(x)
+	# Номер итерации n, на которой x[n+1] впервые не конечно (x[n] - строка n + 1)
+	bad = ~np.isfinite(x)
+	expected = np.where(bad.any(axis = 0), np.argmax(bad, axis = 0) - 2, -1)
+	assert np.array_equal(res.escape_time('f1'), expected)
+	assert (expected > p.n_iter).any() and ((expected >= 0) & (expected <= p.n_iter)).any()
+	# Последние конечные значения x[n-1] и x[n]
+	events = res.log.events()
+	assert np.array_equal(events['x0'], x[events['i'], events['idx']])
+	assert np.array_equal(events['x1'], x[events['i'] + 1, events['idx']])
+	escape = res.escape_map('f1')
+	assert escape.shape == res.shape and np.isnan(escape).sum() == (expected < 0).sum()
+	with tempfile.TemporaryDirectory() as save_dir:
+		fn = os.path.join(save_dir, 'log.csv')
+		res.save_log(fn)
+		with open(fn, encoding = 'utf-8') as f:
+			assert len(f.readlines()) == len(events) + 1
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+
+from src.engine import Params, Engine
+
+FORMULAS = {
+	'f1': lambda x0, x1, r, b: r * x1 * (1 - x1) - b * x0,
+	'f2': lambda x0, x1, r, b: 1 - r * (x1 * x1) + b * x0
+}
+"""Встроенные функции в виде формул numpy (в том же порядке операций, что и ядра)."""
+
+
+def naive(res, name: str, x0: float) -> np.array:
+	"""
+	Рассчитывает таблицу траектории простым циклом по формуле
+	(строка k - значение x[n_iter + k], как в Result.rows).
+	"""
+	f = FORMULAS[name]
+	prev = np.full(res.Nbr, x0)
+	cur = prev.copy()
+	rows = []
+	for n in range(res.n_iter + res.n_draw + 1):
+		prev, cur = cur, f(prev, cur, res.r, res.b)
+		if n >= res.n_iter - 1:
+			rows.append(cur)
+	return np.array(rows)
+
+
+def test_part_past_end_of_grid():
+	# Последняя часть сетки может выходить за её конец (см. src.zoom)
+	p = Params(True, False, [0, 1.4, 0.01], [0.3, 0.3, 0.1], 0, 10, 5)
+	assert Engine(p).Nbr == 141
+	part = Engine(p, 128, 192)
+	assert part.Nbr == 13 and part.shape is None
+	assert part.run().rows('f1').shape == (7, 13)
+
+
+def test_frozen_rows_match_iterations():
+	# Сошедшиеся траектории исключаются из расчёта, но строки траектории
+	# совпадают с расчётом без проверки сходимости (в той же фазе цикла)
+	args = (True, True, [0.2, 1.1, 0.01], [0.3, 0.3, 0.1], 0.1, 1001, 50)
+	exact = Engine(Params(*args)).run()
+	frozen = Engine(Params(*args, tol = 1e-9)).run()
+	for name in exact.names:
+		assert np.allclose(frozen.rows(name), exact.rows(name), atol = 1e-6, equal_nan = True)
+
+
+def test_matches_naive_loop():
+	p = Params(True, True, [0.2, 1.2, 0.1], [0, 0.3, 0.1], 0.1, 300, 40)
+	res = Engine(p).run()
+	for name in res.names:
+		assert np.array_equal(res.rows(name), naive(res, name, p.x0))
+
+
+def test_escaped_trajectories_dropped():
+	# Траектории уходят в бесконечность и на этапе установления, и при отрисовке
+	p = Params(True, False, [3.8, 6, 0.1], [0, 0.2, 0.1], 0.1, 20, 30)
+	with np.errstate(over = 'ignore', invalid = 'ignore'):
+		res = Engine(p).run()
+		exact = naive(res, 'f1', p.x0)
+	rows = res.rows('f1')
+	finite = np.isfinite(exact)
+	# Этап установления рассчитывает строки 0 и 1: ушедшие на нём
+	# точки не отображаются совсем, остальные - до момента ухода
+	assert not finite[:2].all() and not finite[:, finite[:2].all(axis = 0)].all()
+	finite[:, ~finite[:2].all(axis = 0)] = False
+	assert np.array_equal(np.isfinite(rows), finite)
+	assert np.array_equal(rows[finite], exact[finite])
+
+
+def test_float32_precision():
+	args = (True, True, [0.2, 1, 0.1], [0, 0.3, 0.1], 0.1, 300, 40)
+	single = Engine(Params(*args, precision = 'float32')).run()
+	double = Engine(Params(*args)).run()
+	for name in double.names:
+		assert single.rows(name).dtype == np.float32
+		# На устойчивых циклах погрешность float32 не накапливается
+		assert np.allclose(single.rows(name), double.rows(name), atol = 1e-4)
+	with pytest.raises(ValueError):
+		Params(*args, precision = 'float16')
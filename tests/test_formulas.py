@@ -0,0 +1,87 @@
+import os
+import tempfile
+import pytest
+import numpy as np
+
+from src.engine import Params, Engine
+from src.settings import SETTINGS
+from src.formulas import FormulaError, compile_formula, load_formulas
+
+FORMULA = 'sin(x)*cos(x[n-1]) + r*exp(x*b)'
+"""Формула, касательному ядру которой нужно больше массивов work, чем ядру шага."""
+
+
+def run(lyapunov: bool):
+	"""Рассчитывает пользовательскую формулу FORMULA на небольшой сетке."""
+	p = Params(False, False, [0, 0.5, 0.1], [0.3, 0.3, 0.1], 0, 100, 50,
+		lyapunov = lyapunov, formulas = {'q': {'x': FORMULA}})
+	return Engine(p).run()
+
+
+def test_tangent_needs_more_work_arrays():
+	kernel, tangent = compile_formula(FORMULA)
+	assert tangent.temps > kernel.temps
+
+
+def test_run_without_lyapunov():
+	res = run(False)
+	assert np.isfinite(res.rows('q')[-1]).all()
+
+
+def test_run_with_lyapunov():
+	res = run(True)
+	assert np.isfinite(res.lyapunov('q')).all()
+	# Касательное ядро не влияет на траекторию
+	assert np.array_equal(res.rows('q'), run(False).rows('q'))
+
+
+def test_constant_arithmetic_errors():
+	valid, errors = load_formulas([{'name': 'a', 'x': '0**-1'},
+		{'name': 'b', 'x': '10.0**400'}, {'name': 'c', 'x': 'r*x*(1 - x)'}])
+	assert [f['name'] for f in valid] == ['c']
+	assert len(errors) == 2
+
+
+EXPECTED = {
+	'lozi': (lambda x0, x1, r, b: 1 - r * np.abs(x1) + b * x0,
+		lambda x0, x1, r, b, w0, w1: -r * np.sign(x1) * w1 + b * w0),
+	'logistic': (lambda x0, x1, r, b: r * x1 * (1 - x1),
+		lambda x0, x1, r, b, w0, w1: r * (1 - 2 * x1) * w1),
+	'henon2d': (lambda x0, x1, r, b: 1 - r * x1 ** 2 + b * x0,
+		lambda x0, x1, r, b, w0, w1: -2 * r * x1 * w1 + b * w0)
+}
+"""Формулы из settings.json и их касательные отображения в виде выражений numpy."""
+
+
+def test_compiled_kernels_match_numpy():
+	rng = np.random.default_rng(0)
+	x0, x1, w0, w1 = rng.uniform(-1, 1, (4, 1000))
+	r, b = rng.uniform(0, 4, 1000), rng.uniform(-0.5, 0.5, 1000)
+	for d in SETTINGS['formulas']:
+		f, t = EXPECTED[d['name']]
+		kernel, tangent = compile_formula(d['x'], d.get('y'))
+		work = [np.empty_like(x0) for _ in range(max(kernel.temps, tangent.temps))]
+		out = np.empty_like(x0)
+		assert kernel(x0, x1, r, b, out, np.empty_like(x0), *work[:kernel.temps]) is out
+		assert np.allclose(out, f(x0, x1, r, b), rtol = 1e-12, atol = 1e-12)
+		tangent(x0, x1, r, b, w0, w1, out, np.empty_like(x0), *work[:tangent.temps])
+		assert np.allclose(out, t(x0, x1, r, b, w0, w1), rtol = 1e-12, atol = 1e-12)
+
+
+@pytest.mark.parametrize('text', ['1 +', 'x[n-2]', 'x[n+1]', 'z * r', 'r ** x', 'sin(x, 1)',
+	'max(x, r)', 'x.real', 'x if r else b', 'lambda: x', '[x]', '"x"', 'True * x', 'y'])
+def test_invalid_formulas_rejected(text):
+	with pytest.raises(FormulaError):
+		compile_formula(text)
+
+
+def test_code_in_formula_not_executed():
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, 'created')
+		for text in [f'__import__("os").mkdir({path!r})', f'x + __import__("os").mkdir({path!r})',
+				'(lambda: __import__("os"))()']:
+			with pytest.raises(FormulaError):
+				compile_formula(text)
+		valid, errors = load_formulas([{'name': 'evil', 'x': f'__import__("os").mkdir({path!r})'}])
+		assert valid == [] and len(errors) == 1
+		assert not os.path.exists(path)
@@ -0,0 +1,43 @@
+import time
+import tempfile
+
+from src.engine import Params
+from src.events import EventChannel
+from src.jobs import RUNNING, DONE, CANCELLED, QUEUED, JobQueue
+
+
+class Root:
+	"""Заменяет окно Tk: события канала выполняются вызовом pump."""
+
+	def after(self, ms: int, func):
+		pass
+
+
+def pump(events: EventChannel, condition, timeout: float = 30):
+	"""Выполняет события основного потока, пока не выполнится условие."""
+	end = time.time() + timeout
+	while not condition():
+		assert time.time() < end
+		events.poll()
+		time.sleep(0.01)
+
+
+def test_cancel_jobs():
+	events = EventChannel(Root())
+	small = Params(True, True, [0, 1.4, 0.1], [0.3, 0.3, 0.1], 0.1, 100, 10)
+	# Вычисление, которое не успеет завершиться до отмены
+	long = Params(True, True, [0, 1.4, 0.01], [0.3, 0.3, 0.1], 0.1, 10**8, 10)
+	with tempfile.TemporaryDirectory() as save_dir:
+		jobs = JobQueue(events, save_dir)
+		a = jobs.submit('a', long)
+		b = jobs.submit('b', small)
+		c = jobs.submit('c', small, priority = 1)
+		assert (a.state, b.state, c.state) == (RUNNING, QUEUED, QUEUED)
+		# Задание из очереди не запускается, выполняемое прекращается
+		jobs.cancel(b)
+		pump(events, lambda: a.fraction > 0)
+		jobs.cancel(a)
+		pump(events, lambda: c.state == DONE)
+		assert (a.state, b.state) == (CANCELLED, CANCELLED)
+		assert b.calc is None and a.fraction < 1 and not a.has_result()
+		assert c.has_result() and jobs.active == 0
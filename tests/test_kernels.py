@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.kernels import KERNELS, TANGENTS
+
+FORMULAS = {
+	'f1': lambda x0, x1, r, b: r * x1 * (1 - x1) - b * x0,
+	'f2': lambda x0, x1, r, b: 1 - r * x1 ** 2 + b * x0
+}
+"""Встроенные функции в виде формул numpy."""
+
+
+def sample(size: int = 1000) -> tuple:
+	"""Возвращает случайные значения x[n-1], x[n], r, b."""
+	rng = np.random.default_rng(0)
+	return rng.uniform(-1, 1, size), rng.uniform(-1, 1, size), rng.uniform(0, 4, size), rng.uniform(-0.5, 0.5, size)
+
+
+def test_kernels_match_formulas():
+	x0, x1, r, b = sample()
+	for name, kernel in KERNELS.items():
+		out = np.empty_like(x0)
+		tmp = np.empty_like(x0)
+		args = [a.copy() for a in (x0, x1, r, b)]
+		# Результат записывается в out, а аргументы не меняются
+		assert kernel(*args, out, tmp) is out
+		assert np.allclose(out, FORMULAS[name](x0, x1, r, b), rtol = 1e-12, atol = 1e-12)
+		assert all(np.array_equal(a, c) for a, c in zip(args, (x0, x1, r, b)))
+
+
+def test_tangents_match_finite_differences():
+	x0, x1, r, b = sample()
+	rng = np.random.default_rng(1)
+	w0, w1 = rng.uniform(-1, 1, x0.size), rng.uniform(-1, 1, x0.size)
+	eps = 1e-7
+	for name, tangent in TANGENTS.items():
+		f = FORMULAS[name]
+		out = np.empty_like(x0)
+		tangent(x0, x1, r, b, w0, w1, out, np.empty_like(x0))
+		diff = (f(x0 + eps * w0, x1 + eps * w1, r, b) - f(x0, x1, r, b)) / eps
+		assert np.allclose(out, diff, atol = 1e-5)
@@ -0,0 +1,20 @@
+import numpy as np
+
+from src.engine import Params, Engine
+
+
+def test_logistic_lyapunov():
+	# При b = 0 функция №1 - логистическое отображение: при r = 4 показатель равен ln 2,
+	# на устойчивом цикле (r = 3.2) отрицателен
+	p = Params(True, False, [3.2, 4, 0.8], [0, 0, 0.1], 0.3, 1000, 20000, lyapunov = True)
+	res = Engine(p).run()
+	lyap = res.lyapunov('f1')
+	assert lyap[0] < 0
+	assert abs(lyap[1] - np.log(2)) < 0.01
+
+
+def test_henon_lyapunov():
+	# Функция №2 - отображение Хенона: при r = 1.4, b = 0.3 показатель около 0.42
+	p = Params(False, True, [1.4, 1.4, 0.1], [0.3, 0.3, 0.1], 0.1, 1000, 20000, lyapunov = True)
+	lyap = Engine(p).run().lyapunov('f2')
+	assert abs(lyap[0] - 0.42) < 0.01
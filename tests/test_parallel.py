@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.engine import Params, Engine
+from src.parallel import ParallelEngine, create_engine
+from src.profiler import Profiler
+
+
+def test_parallel_matches_serial():
+	# Часть траекторий уходит в бесконечность (лог собирается из частей сетки)
+	p = Params(True, True, [0, 1.6, 0.02], [0, 0.4, 0.1], 0.1, 200, 30, workers = 2, lyapunov = True)
+	engine = create_engine(p)
+	assert isinstance(engine, ParallelEngine)
+	res = engine.run()
+	exact = Engine(p).run()
+	for name in exact.names:
+		assert np.array_equal(res.rows(name), exact.rows(name), equal_nan = True)
+		assert np.array_equal(res.escape_time(name), exact.escape_time(name))
+		assert np.allclose(res.lyapunov(name), exact.lyapunov(name), equal_nan = True)
+	assert (exact.escape_time('f2') >= 0).any()
+
+
+def test_parallel_phase_timings():
+	p = Params(True, False, [0, 1.6, 0.1], [0, 0.4, 0.1], 0.1, 100, 20, workers = 2)
+	engine = create_engine(p)
+	engine.profiler = Profiler(kernels = True)
+	engine.run()
+	sections = engine.profiler.sections
+	shards = sections['phase_iter']['calls']
+	assert shards > 1 and sections['phase_draw']['calls'] == shards
+	assert sections['phase_iter']['items'] == shards * (p.n_iter + 1)
+	assert sections['phase_draw']['items'] == shards * p.n_draw
+	assert sections['kernel_f1']['calls'] > 0
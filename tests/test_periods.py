@@ -0,0 +1,27 @@
+import numpy as np
+
+from src.engine import Params, Engine
+from src.periods import PERIOD_CHAOS, PERIOD_ESCAPED, detect_periods
+
+
+def test_detect_periods():
+	n = np.arange(40)[:, None]
+	rows = np.hstack([
+		np.full((40, 1), 0.5),	# Неподвижная точка
+		np.sin(n * np.pi / 3),	# Период 6
+		np.cos(n * np.pi),	# Период 2
+		np.sin(n * 1.0),	# Непериодическая траектория
+		np.where(n < 30, 0.3, np.nan),	# Уход в бесконечность
+		np.where(n % 20 == 0, 1.0, 0.0)	# Период 20 больше max_period
+	])
+	codes = detect_periods(rows, 16)
+	assert codes.tolist() == [1, 6, 2, PERIOD_CHAOS, PERIOD_ESCAPED, PERIOD_CHAOS]
+
+
+def test_logistic_periods():
+	# При b = 0 функция №1 - логистическое отображение
+	p = Params(True, False, [2.9, 3.83, 0.31], [0, 0, 0.1], 0.4, 3000, 64)
+	res = Engine(p).run()
+	assert res.r.round(2).tolist() == [2.9, 3.21, 3.52, 3.83]
+	assert res.periods('f1', 16).tolist() == [1, 2, 4, 3]
+	assert res.period_map('f1', 16).shape == res.shape
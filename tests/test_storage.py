@@ -0,0 +1,24 @@
+import os
+import gc
+import tempfile
+import subprocess
+import sys
+
+from src.storage import Storage
+
+
+def test_cleanup_keeps_running_owners():
+	dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+	dead.wait()
+	with tempfile.TemporaryDirectory() as storage_dir:
+		# Подкаталоги выполняющегося процесса, завершившегося процесса и прежнего формата
+		names = [f'run_{os.getppid()}_a', f'run_{dead.pid}_b', 'run_c']
+		for name in names:
+			os.makedirs(os.path.join(storage_dir, name))
+		s = Storage(storage_dir)
+		x = s.zeros('x', 10)
+		assert sorted(os.listdir(storage_dir)) == sorted([names[0], os.path.basename(s.path)])
+		# Подкаталог удаляется вместе с хранилищем
+		del s, x
+		gc.collect()
+		assert os.listdir(storage_dir) == [names[0]]